@@ -0,0 +1 @@
+"""Micro-benchmarks for briefy.ws."""
@@ -0,0 +1,78 @@
+"""Micro-benchmark for permission checks in BaseFactory.
+
+Usage::
+
+    python -m benchmarks.bench_acl
+
+"""
+from briefy.ws.resources import factory as factory_module
+from briefy.ws.resources.factory import BaseFactory
+from pyramid.testing import DummyRequest
+
+import timeit
+
+
+ROLES = [f'g:role_{i}' for i in range(20)]
+PERMISSIONS = ('create', 'list', 'view', 'edit', 'delete', 'add_comment', 'upload')
+
+
+class User:
+    """Authenticated user."""
+
+    id = 'fbda5789-2e32-44c4-b9dc-d0d217454a2a'
+    groups = ['g:role_18', 'g:role_19']
+
+
+class Model:
+    """Model with a realistic raw acl."""
+
+    __raw_acl__ = tuple([(permission, tuple(ROLES)) for permission in PERMISSIONS])
+
+    @classmethod
+    def __acl__(cls) -> tuple:
+        """Return a tuple of pyramid ACLs based on __raw_acl__ attribute."""
+        result = dict()
+        for permission, roles in cls.__raw_acl__:
+            for role_id in roles:
+                result.setdefault(role_id, []).append(permission)
+        return tuple(result.items())
+
+
+def _factory() -> BaseFactory:
+    """Return a factory for a collection route."""
+    request = DummyRequest()
+    request.user = User()
+    request.matchdict = {}
+    factory = BaseFactory(request)
+    factory.model = Model
+    return factory
+
+
+def bench_has_global_permissions(number: int) -> float:
+    """Time has_global_permissions for the last permission in the raw acl."""
+    factory = _factory()
+    return timeit.timeit(
+        lambda: factory.has_global_permissions('upload', User.groups), number=number
+    )
+
+
+def bench_acl(number: int) -> float:
+    """Time 5 reads of __acl__, as done by the authorization policy, on new factories."""
+    def run():
+        factory = _factory()
+        for i in range(5):
+            factory.__acl__
+    return timeit.timeit(run, number=number)
+
+
+def main(number: int=20000):
+    """Run all benchmarks."""
+    for name, func in (('has_global_permissions', bench_has_global_permissions),
+                       ('__acl__', bench_acl)):
+        factory_module._model_acls.clear()
+        elapsed = func(number)
+        print(f'{name:<24} {elapsed / number * 1e6:8.2f} us/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark of response compression on listing payloads.
+
+Shows the time spent compressing and the size of typical collection_get payloads for
+each content coding and level.
+
+Usage::
+
+    python -m benchmarks.bench_compression
+
+"""
+from briefy.ws.tweens.compression import ENCODERS
+from datetime import datetime
+from datetime import timedelta
+
+import json
+import timeit
+import uuid
+
+
+STATES = ('created', 'pending', 'published', 'scheduled', 'completed')
+
+
+def listing_payload(items: int) -> bytes:
+    """Return a JSON listing, as returned by collection_get, with this number of items."""
+    now = datetime(2017, 11, 1)
+    data = []
+    for i in range(items):
+        data.append({
+            'id': str(uuid.uuid4()),
+            'title': f'Photo shoot in Berlin number {i}',
+            'description': 'Interior and exterior photos of an apartment for rental.',
+            'state': STATES[i % len(STATES)],
+            'created_at': (now - timedelta(days=i)).isoformat(),
+            'updated_at': (now - timedelta(hours=i)).isoformat(),
+            'customer': {'id': str(uuid.uuid4()), 'title': 'Briefy Customer'},
+            'price': 12000 + i,
+            'currency': 'EUR',
+            'tags': ['interior', 'exterior', 'apartment'],
+        })
+    payload = {
+        'data': data,
+        'pagination': {'page': 1, 'page_count': 4, 'items_per_page': items, 'total': items * 4},
+        'total': items * 4,
+    }
+    return json.dumps(payload).encode('utf-8')
+
+
+def main(number: int=200):
+    """Run all benchmarks."""
+    for items in (10, 25, 100):
+        body = listing_payload(items)
+        print(f'{items} items, {len(body)} bytes')
+        for encoding, encoder in ENCODERS.items():
+            for level in (1, 6, 9):
+                elapsed = timeit.timeit(lambda: encoder(body, level), number=number)
+                size = len(encoder(body, level))
+                print(
+                    f'  {encoding:<8} level {level} {elapsed / number * 1e6:10.2f} us/call '
+                    f'{size:8d} bytes ({size / len(body):.1%})'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark loading model instances with the workflow context listeners.
+
+Compares the previous load listener, executed for every loaded row, with the current
+registration that resolves the request lazily.
+
+Usage::
+
+    python -m benchmarks.bench_listeners
+
+"""
+from briefy.ws import listeners
+from pyramid import testing
+from pyramid.threadlocal import get_current_request
+from sqlalchemy import create_engine
+from sqlalchemy import event as sa_event
+from sqlalchemy import orm
+from sqlalchemy.ext.declarative import declarative_base
+
+import sqlalchemy as sa
+import timeit
+
+
+BenchBase = declarative_base()
+
+
+class Before(BenchBase):
+    """Model using the previous load listener."""
+
+    __tablename__ = 'before'
+
+    request = None
+    workflow_context = None
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    title = sa.Column(sa.String)
+
+
+class After(BenchBase):
+    """Model using the current listeners."""
+
+    __tablename__ = 'after'
+
+    request = None
+    workflow_context = None
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    title = sa.Column(sa.String)
+
+
+def previous_load_listener(target, context):
+    """Load listener as implemented before the lazy workflow context."""
+    request = get_current_request()
+    if request:
+        if 'request' in target.__dir__() and not getattr(target, 'request', None):
+            target.request = request
+        auth_user = request.user
+        set_user = hasattr(target, 'workflow_context') and not target.workflow_context
+        if auth_user and set_user:
+            target.workflow_context = auth_user
+
+
+def main(rows: int=500, number: int=50):
+    """Run the benchmark."""
+    sa_event.listen(Before, 'load', previous_load_listener)
+    listeners.register_workflow_context_listeners([After])
+
+    engine = create_engine('sqlite://')
+    BenchBase.metadata.create_all(engine)
+    session = orm.sessionmaker(bind=engine)()
+    for klass in (Before, After):
+        session.add_all([klass(id=i, title=f'Item {i}') for i in range(rows)])
+    session.commit()
+
+    request = testing.DummyRequest()
+    request.user = object()
+    testing.setUp(request=request)
+    try:
+        for klass in (Before, After):
+            def load():
+                session.expunge_all()
+                session.query(klass).all()
+            elapsed = timeit.timeit(load, number=number)
+            print(f'{klass.__name__:<8} {rows} rows: {elapsed / number * 1000:8.2f} ms/query')
+    finally:
+        testing.tearDown()
+
+
+if __name__ == '__main__':
+    main()
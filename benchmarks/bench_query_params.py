@@ -0,0 +1,59 @@
+"""Micro-benchmark of query string parsing for listings.
+
+Compares the separate filter, sorting and pagination functions, each iterating the query
+parameters, with the single pass parse_query_params.
+
+Usage::
+
+    python -m benchmarks.bench_query_params
+
+"""
+from briefy.ws.utils import filter
+from briefy.ws.utils import paginate
+from urllib.parse import parse_qsl
+
+import timeit
+
+
+ALLOWED_FIELDS = [
+    'id', 'title', 'description', 'state', 'price', 'country', 'project_id', 'customer_id',
+    'professional_id', 'created_at', 'updated_at', 'scheduled_datetime', 'deliver_date',
+    'number_required_assets', 'category', 'slug', 'project.title', 'customer.title',
+]
+
+QUERY_STRINGS = (
+    '_page=2&_items_per_page=50',
+    'state=published&_sort=-updated_at',
+    'in_state=created,pending,scheduled&country=DE&_sort=-created_at,title&_page=3',
+    'min_price=100&max_price=500&ilike_title=berlin&project.title=Shoot&_items_per_page=100',
+    'exclude_state=deleted,cancelled&gt_number_required_assets=10&_since=1509494400'
+    '&startswith_slug=photo&between_deliver_date=2017-11-01,2017-11-30&_sort=deliver_date',
+)
+"""Query strings of typical listing requests."""
+
+
+def separate(query_params: dict) -> tuple:
+    """Parse filters, sorting and pagination with one function each."""
+    return (
+        filter.create_filter_from_query_params(query_params, ALLOWED_FIELDS),
+        filter.create_sorting_from_query_params(query_params, ALLOWED_FIELDS, 'updated_at', 1),
+        paginate.extract_pagination_from_query_params(query_params),
+    )
+
+
+def single_pass(query_params: dict) -> filter.QueryParams:
+    """Parse filters, sorting and pagination in a single pass."""
+    return filter.parse_query_params(query_params, ALLOWED_FIELDS, 'updated_at', 1)
+
+
+def main(number: int=20000):
+    """Run all benchmarks."""
+    queries = [dict(parse_qsl(query_string)) for query_string in QUERY_STRINGS]
+    for name, func in (('separate', separate), ('parse_query_params', single_pass)):
+        elapsed = timeit.timeit(lambda: [func(query) for query in queries], number=number)
+        per_query = elapsed / (number * len(queries)) * 1e6
+        print(f'{name:<24} {per_query:8.2f} us/query')
+
+
+if __name__ == '__main__':
+    main()
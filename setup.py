@@ -51,5 +51,13 @@ setup(
     test_suite='tests',
     tests_require=test_requirements,
     install_requires=requires,
-    entry_points="""""",
+    extras_require={
+        'brotli': ['brotli'],
+        'msgpack': ['msgpack'],
+        'newrelic': ['newrelic'],
+    },
+    entry_points="""
+    [console_scripts]
+    briefy-ws-index-advisor = briefy.ws.db.indexes:main
+    """,
 )
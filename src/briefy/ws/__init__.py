@@ -3,10 +3,18 @@ from .initialization import initialize  # noqa
 from .renderer import JSONRenderer
 from briefy.ws.auth import groupfinder
 from briefy.ws.auth import user_factory
+from briefy.ws.auth.policy import set_jwt_authentication_policy
+from briefy.ws.config import COMPRESSION_ENABLED
+from briefy.ws.config import DATABASE_REPLICA_URL
 from briefy.ws.config import JWT_EXPIRATION
 from briefy.ws.config import JWT_SECRET
+from briefy.ws.config import METRICS_ENABLED
+from briefy.ws.config import PROFILING_ENABLED
+from briefy.ws.config import SLOW_QUERY_LOG_ENABLED
+from briefy.ws.config import SQL_STATS_ENABLED
 from pyramid.authorization import ACLAuthorizationPolicy
 from pyramid.config import Configurator
+from pyramid.settings import asbool
 
 import logging
 import os
@@ -44,7 +52,8 @@ def includeme(config: Configurator):
     # config jwt
     config.set_authorization_policy(ACLAuthorizationPolicy())
     config.include('pyramid_jwt')
-    config.set_jwt_authentication_policy(
+    set_jwt_authentication_policy(
+        config,
         private_key=JWT_SECRET,
         expiration=int(JWT_EXPIRATION),
         callback=groupfinder,
@@ -53,5 +62,32 @@ def includeme(config: Configurator):
     # add authenticated user map as request attribute
     config.add_request_method(user_factory, 'user', reify=True)
 
+    # SQL statements statistics per request
+    if asbool(SQL_STATS_ENABLED):
+        config.add_tween('briefy.ws.tweens.sqlstats.sqlstats_tween_factory')
+
+    # Request latency and statements metrics
+    if asbool(METRICS_ENABLED):
+        config.add_tween('briefy.ws.tweens.metrics.metrics_tween_factory')
+
+    # Profile requests on demand
+    if asbool(PROFILING_ENABLED):
+        config.add_tween('briefy.ws.tweens.profiler.profiler_tween_factory')
+
+    # Response compression
+    if asbool(COMPRESSION_ENABLED):
+        config.add_tween('briefy.ws.tweens.compression.compression_tween_factory')
+
+    # Slow statements executed by resource listings
+    if asbool(SLOW_QUERY_LOG_ENABLED):
+        from briefy.ws.db import slowlog
+        slowlog.install()
+
+    # Read replica for safe requests
+    if DATABASE_REPLICA_URL:
+        from briefy.ws.db import routing
+        from briefy.ws.db.engine import create_engine_from_config
+        routing.install(create_engine_from_config(DATABASE_REPLICA_URL, name='replica'))
+
     # Scan views.
     config.scan('briefy.ws.views')
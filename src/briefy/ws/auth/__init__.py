@@ -1,12 +1,12 @@
 """Briefy WS default authentication helpers."""
 from briefy.common.types import BaseUser
 from briefy.common.utils.transformers import to_serializable
+from briefy.ws.utils import instrumentation
 from pyramid.httpexceptions import HTTPUnauthorized as BaseHTTPUnauthorized
 from pyramid.request import Request
 from webob import Response
 
 import json
-import newrelic.agent
 import typing as t
 
 
@@ -48,11 +48,9 @@ def user_factory(request: Request) -> UserOrNone:
     authenticated_user = None
     if user_id:
         data = request.jwt_claims
-        # add all user data to the newrelic custom attributes
-        newrelic.agent.add_custom_parameter('user_id', user_id)
-        for key, value in data.items():
-            newrelic.agent.add_custom_parameter(key, str(value))
-            authenticated_user = AuthenticatedUser(user_id, data)
+        authenticated_user = AuthenticatedUser(user_id, data)
+        # add user data to the newrelic custom attributes
+        instrumentation.record_user(user_id, data)
     return authenticated_user
 
 
@@ -69,6 +67,8 @@ def groupfinder(userid: str, request: Request) -> t.Sequence[str]:
 def validate_jwt_token(request: Request, **kwargs) -> UserOrNone:
     """Use pyramid JWT to validate if the user is authenticated.
 
+    The user is the one already created for this request by :func:`user_factory`.
+
     :param request: Pyramid request object.
     :param kwargs: Additional keyword arguments.
     :return: The AuthenticatedUser, if exists, or None (representing an AnonymousUser).
@@ -76,4 +76,4 @@ def validate_jwt_token(request: Request, **kwargs) -> UserOrNone:
     user_id = request.authenticated_userid
     if user_id is None:
         raise HTTPUnauthorized
-    return user_factory(request)
+    return request.user
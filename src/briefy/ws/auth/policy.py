@@ -0,0 +1,84 @@
+"""JWT authentication policy with a cache of verified claims."""
+from briefy.ws.config import JWT_CLAIMS_CACHE_SIZE
+from briefy.ws.config import JWT_CLAIMS_CACHE_TTL
+from briefy.ws.utils.cache import TimeoutLRUCache
+from pyramid.config import Configurator
+from pyramid.request import Request
+from pyramid_jwt import create_jwt_authentication_policy
+from pyramid_jwt.policy import JWTAuthenticationPolicy
+
+import typing as t
+
+
+def get_token(policy: JWTAuthenticationPolicy, request: Request) -> t.Optional[str]:
+    """Return the JWT token sent in the request, if any.
+
+    :param policy: JWT authentication policy.
+    :param request: pyramid request object.
+    :return: the encoded token.
+    """
+    if policy.http_header == 'Authorization':
+        try:
+            authorization = request.authorization
+        except ValueError:  # Invalid Authorization header
+            return None
+        if authorization is None:
+            return None
+        auth_type, token = authorization
+        if auth_type != policy.auth_type:
+            return None
+    else:
+        token = request.headers.get(policy.http_header)
+    return token or None
+
+
+def get_claims(
+        policy: JWTAuthenticationPolicy,
+        claims_cache: TimeoutLRUCache,
+        request: Request
+) -> dict:
+    """Return the claims of the JWT token, verifying each token only once.
+
+    Verified claims are cached until the token expires, so only a token that was already
+    successfully verified is served from the cache.
+
+    :param policy: JWT authentication policy.
+    :param claims_cache: Cache of verified claims, per token.
+    :param request: pyramid request object.
+    :return: dictionary with claims, empty if the token is missing or invalid.
+    """
+    token = get_token(policy, request)
+    if not token:
+        return {}
+    claims = claims_cache.get(token)
+    if claims is None:
+        claims = policy.get_claims(request)
+        if not claims:
+            return claims
+        claims_cache.set(token, claims, expires_at=claims.get('exp'))
+    return dict(claims)
+
+
+def set_jwt_authentication_policy(config: Configurator, **kwargs):
+    """Set the pyramid_jwt authentication policy using a cache of verified claims.
+
+    Replacement for the ``set_jwt_authentication_policy`` directive of pyramid_jwt, it
+    accepts the same arguments and also reads the ``jwt.*`` settings.
+
+    :param config: Pyramid configuration
+    :param kwargs: Arguments for the pyramid_jwt authentication policy.
+    """
+    policy = create_jwt_authentication_policy(config, **kwargs)
+    policy.claims_cache = TimeoutLRUCache(
+        int(JWT_CLAIMS_CACHE_SIZE), float(JWT_CLAIMS_CACHE_TTL), name='jwt_claims'
+    )
+
+    def request_create_token(request: Request, principal: str, expiration=None, **claims):
+        return policy.create_token(principal, expiration, **claims)
+
+    def request_claims(request: Request) -> dict:
+        return get_claims(policy, policy.claims_cache, request)
+
+    config.set_authentication_policy(policy)
+    config.add_request_method(request_create_token, 'create_jwt_token')
+    config.add_request_method(request_claims, 'jwt_claims', reify=True)
@@ -5,6 +5,88 @@ from prettyconf import config
 # JWT
 JWT_EXPIRATION = config('JWT_EXPIRATION', default='84600')
 JWT_SECRET = config('JWT_SECRET', default='e68d4ffb-d621-4d17-a33e-00183e9553e1')
+JWT_CLAIMS_CACHE_SIZE = config('JWT_CLAIMS_CACHE_SIZE', default='1024')
+JWT_CLAIMS_CACHE_TTL = config('JWT_CLAIMS_CACHE_TTL', default='300')
+
+
+# DATABASE
+# Connection pool of engines created by briefy.ws.db.engine.create_engine_from_config.
+DATABASE_POOL_SIZE = config('DATABASE_POOL_SIZE', default='5')
+DATABASE_MAX_OVERFLOW = config('DATABASE_MAX_OVERFLOW', default='10')
+# Seconds to wait for a connection, and to recycle a connection.
+DATABASE_POOL_TIMEOUT = config('DATABASE_POOL_TIMEOUT', default='30')
+DATABASE_POOL_RECYCLE = config('DATABASE_POOL_RECYCLE', default='3600')
+# Test connections before using them.
+DATABASE_POOL_PRE_PING = config('DATABASE_POOL_PRE_PING', default='true')
+# Maximum duration of a statement in ms (PostgreSQL only), 0 to disable.
+DATABASE_STATEMENT_TIMEOUT = config('DATABASE_STATEMENT_TIMEOUT', default='0')
+# Default maximum duration in ms of listing statements of resources, 0 to disable.
+LISTING_STATEMENT_TIMEOUT = config('LISTING_STATEMENT_TIMEOUT', default='0')
+# Maximum number of values in a single in_ or exclude_ filter.
+FILTER_MAX_VALUES = config('FILTER_MAX_VALUES', default='1000')
+# Read replica used by GET and HEAD requests, empty to use only the primary.
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+# Seconds a client reads from the primary after a write, carried in a cookie.
+DATABASE_REPLICA_STICKINESS = config('DATABASE_REPLICA_STICKINESS', default='10')
+
+
+# NEW RELIC
+# Instrumentation level: off, minimal (only user id) or full (user id and claims below).
+NEWRELIC_INSTRUMENTATION = config('NEWRELIC_INSTRUMENTATION', default='minimal')
+# Comma separated list of JWT claims recorded in full level, use * to record all claims.
+NEWRELIC_USER_CLAIMS = config('NEWRELIC_USER_CLAIMS', default='email,groups,locale')
+
+
+# SQL STATISTICS
+SQL_STATS_ENABLED = config('SQL_STATS_ENABLED', default='false')
+# Requests with more statements than this, or slower than this (in ms), are logged.
+SQL_STATS_QUERY_BUDGET = config('SQL_STATS_QUERY_BUDGET', default='50')
+SQL_STATS_TIME_BUDGET = config('SQL_STATS_TIME_BUDGET', default='1000')
+
+
+# SLOW QUERIES
+SLOW_QUERY_LOG_ENABLED = config('SLOW_QUERY_LOG_ENABLED', default='false')
+# Minimum duration, in ms, for a listing statement to be recorded.
+SLOW_QUERY_THRESHOLD = config('SLOW_QUERY_THRESHOLD', default='500')
+SLOW_QUERY_BUFFER_SIZE = config('SLOW_QUERY_BUFFER_SIZE', default='100')
+SLOW_QUERY_EXPLAIN = config('SLOW_QUERY_EXPLAIN', default='false')
+
+
+# PROFILING
+# Profile requests from briefy admins sent with the X-Briefy-Profile header.
+PROFILING_ENABLED = config('PROFILING_ENABLED', default='false')
+PROFILING_BUFFER_SIZE = config('PROFILING_BUFFER_SIZE', default='20')
+PROFILING_STATS_LIMIT = config('PROFILING_STATS_LIMIT', default='50')
+
+
+# METRICS
+# Record latency of requests, per resource and method, and duration of their statements.
+METRICS_ENABLED = config('METRICS_ENABLED', default='false')
+# Token Prometheus must send as 'Authorization: Bearer <token>' to read /__metrics__.
+# Empty to expose metrics without authentication, restricted at the network or ingress.
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+
+# COMPRESSION
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default='false')
+# Compression level from 1 (fastest) to 9 (smallest).
+COMPRESSION_LEVEL = config('COMPRESSION_LEVEL', default='6')
+# Responses smaller than this, in bytes, are not compressed.
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default='1024')
+# Comma separated list of content types to be compressed.
+COMPRESSION_TYPES = config(
+    'COMPRESSION_TYPES',
+    default='application/json,text/plain,text/html'
+)
+
+
+# HEARTBEAT
+# Seconds the result of the health checks is reused.
+HEARTBEAT_CACHE_TTL = config('HEARTBEAT_CACHE_TTL', default='5')
+# Seconds to wait for the database check.
+HEARTBEAT_DB_TIMEOUT = config('HEARTBEAT_DB_TIMEOUT', default='2')
+# Connection pool utilization, from 0 to 1, considered degraded.
+HEARTBEAT_POOL_THRESHOLD = config('HEARTBEAT_POOL_THRESHOLD', default='1')
 
 
 # USER SERVICE
@@ -16,3 +98,6 @@ USER_SERVICE_TIMEOUT = config(
     'USER_SERVICE_TIMEOUT',
     default=24 * 60  # 24 hours
 )
+# Consecutive failures to stop calling the user service, and seconds to wait before retrying.
+USER_SERVICE_CIRCUIT_THRESHOLD = config('USER_SERVICE_CIRCUIT_THRESHOLD', default='5')
+USER_SERVICE_CIRCUIT_RESET = config('USER_SERVICE_CIRCUIT_RESET', default='30')
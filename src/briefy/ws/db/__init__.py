@@ -0,0 +1 @@
+"""Database helpers for briefy.ws."""
@@ -0,0 +1,77 @@
+"""Create database engines from the briefy.ws configuration."""
+from briefy.ws.config import DATABASE_MAX_OVERFLOW
+from briefy.ws.config import DATABASE_POOL_PRE_PING
+from briefy.ws.config import DATABASE_POOL_RECYCLE
+from briefy.ws.config import DATABASE_POOL_SIZE
+from briefy.ws.config import DATABASE_POOL_TIMEOUT
+from briefy.ws.config import DATABASE_STATEMENT_TIMEOUT
+from briefy.ws.utils import instrumentation
+from briefy.ws.utils import metrics
+from pyramid.settings import asbool
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+
+import time
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool recording how long each connection checkout waited."""
+
+    metrics_name = 'default'
+    """Value of the pool label in metrics."""
+
+    def _do_get(self):
+        """Check out a connection, recording the wait time."""
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - start_time
+            metrics.DB_POOL_WAIT.observe(wait, pool=self.metrics_name)
+            metrics.DB_POOL_CHECKED_OUT.set(self.checkedout(), pool=self.metrics_name)
+            instrumentation.record_custom_metric('Custom/Database/PoolWait', wait)
+
+    def _do_return_conn(self, conn):
+        """Return a connection to the pool."""
+        super()._do_return_conn(conn)
+        metrics.DB_POOL_CHECKED_OUT.set(self.checkedout(), pool=self.metrics_name)
+
+    def recreate(self) -> 'InstrumentedQueuePool':
+        """Return a new pool with the same configuration and name."""
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def create_engine_from_config(url: str, name: str='default', **kwargs) -> Engine:
+    """Create an engine using the DATABASE_* pool settings.
+
+    Pool settings are not used for SQLite, which does not use a QueuePool. The statement
+    timeout is only set for PostgreSQL.
+
+    :param url: database url.
+    :param name: name of the engine in the pool metrics.
+    :param kwargs: arguments to create_engine, overriding the configuration.
+    :return: database engine.
+    """
+    backend = make_url(url).get_backend_name()
+    options = {}
+    if backend != 'sqlite':
+        options.update({
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': int(DATABASE_POOL_SIZE),
+            'max_overflow': int(DATABASE_MAX_OVERFLOW),
+            'pool_timeout': float(DATABASE_POOL_TIMEOUT),
+            'pool_recycle': int(DATABASE_POOL_RECYCLE),
+            'pool_pre_ping': asbool(DATABASE_POOL_PRE_PING),
+        })
+    statement_timeout = int(DATABASE_STATEMENT_TIMEOUT)
+    if backend == 'postgresql' and statement_timeout > 0:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    options.update(kwargs)
+    engine = create_engine(url, **options)
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics_name = name
+    return engine
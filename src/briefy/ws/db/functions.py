@@ -0,0 +1,200 @@
+"""SQL functions compiled per database dialect."""
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+import re
+import sqlalchemy as sa
+import typing as t
+
+
+DATE_BUCKETS = ('day', 'week', 'month', 'year')
+"""Precisions supported by date_bucket."""
+
+LIKE_ESCAPE = '\\'
+"""Escape character of LIKE patterns built by escape_like."""
+
+_SQLITE_FORMATS = {
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m',
+    'year': '%Y',
+}
+
+
+def escape_like(value: str, escape: str=LIKE_ESCAPE) -> str:
+    """Escape the LIKE wildcards, and the escape character, in a value.
+
+    :param value: value to be matched literally.
+    :param escape: escape character, to be passed to like(..., escape=escape).
+    :return: escaped value.
+    """
+    value = value.replace(escape, escape * 2)
+    return value.replace('%', f'{escape}%').replace('_', f'{escape}_')
+
+
+def _regconfig(config: str) -> sa.sql.ColumnElement:
+    """Return a text search configuration as a literal, so expression indexes are used."""
+    return sa.literal_column(f'\'{config}\'::regconfig')
+
+
+class _text_search_function(FunctionElement):
+    """Base class for full-text search functions over a column."""
+
+    def __init__(self, column: sa.Column, terms: str, config: str='simple'):
+        """Initialize the function.
+
+        :param column: text column.
+        :param terms: search terms, all of them must match.
+        :param config: PostgreSQL text search configuration.
+        """
+        if not re.match(r'^\w+$', config):
+            raise ValueError(f'Invalid text search configuration \'{config}\'')
+        self.column = column
+        self.terms = terms
+        self.config = config
+        super().__init__(column)
+
+    def vector(self) -> sa.sql.ColumnElement:
+        """Return the tsvector of the column."""
+        return sa.func.to_tsvector(_regconfig(self.config), self.column)
+
+    def query(self) -> sa.sql.ColumnElement:
+        """Return the tsquery of the search terms."""
+        return sa.func.plainto_tsquery(_regconfig(self.config), self.terms)
+
+
+class text_search(_text_search_function):
+    """Full-text match of a column against search terms.
+
+    PostgreSQL compares ``to_tsvector(config, column)`` with ``plainto_tsquery``, which can
+    use an expression index::
+
+        CREATE INDEX ix_title_search ON table USING gin (to_tsvector('simple', title));
+
+    Other databases match each term with a case-insensitive LIKE.
+    """
+
+    name = 'text_search'
+    type = sa.Boolean()
+
+
+class text_rank(_text_search_function):
+    """Relevance of a column for search terms, ts_rank on PostgreSQL and 0 otherwise."""
+
+    name = 'text_rank'
+    type = sa.Float()
+
+
+@compiles(text_search, 'postgresql')
+def _text_search_postgresql(element: text_search, compiler, **kwargs) -> str:
+    """Compile text_search as a tsvector @@ tsquery match."""
+    return compiler.process(element.vector().op('@@')(element.query()), **kwargs)
+
+
+@compiles(text_search)
+def _text_search_default(element: text_search, compiler, **kwargs) -> str:
+    """Compile text_search as a LIKE match for each term."""
+    column = sa.func.lower(element.column)
+    clauses = [
+        column.like(f'%{escape_like(term.lower())}%', escape=LIKE_ESCAPE)
+        for term in element.terms.split()
+    ]
+    return compiler.process(sa.and_(*clauses), **kwargs)
+
+
+@compiles(text_rank, 'postgresql')
+def _text_rank_postgresql(element: text_rank, compiler, **kwargs) -> str:
+    """Compile text_rank as ts_rank."""
+    return compiler.process(sa.func.ts_rank(element.vector(), element.query()), **kwargs)
+
+
+@compiles(text_rank)
+def _text_rank_default(element: text_rank, compiler, **kwargs) -> str:
+    """Compile text_rank as a constant, other databases have no relevance."""
+    return '0'
+
+
+class in_values(FunctionElement):
+    """Match a column against a list of values bound as a single parameter.
+
+    PostgreSQL uses ``column = ANY(CAST(:values AS type[]))`` (or ``!= ALL`` when negated),
+    other databases an expanding ``IN`` parameter. The statement text does not depend on the
+    number of values, so it is not rebuilt, nor re-parsed by the database, for each list.
+    """
+
+    name = 'in_values'
+    type = sa.Boolean()
+
+    def __init__(self, column: sa.Column, values: t.Iterable, negate: bool=False):
+        """Initialize the function.
+
+        :param column: column, or model attribute, to be matched.
+        :param values: values to match.
+        :param negate: match columns with none of the values.
+        """
+        clause = getattr(column, '__clause_element__', None)
+        self.column = clause() if clause else column
+        self.values = list(values)
+        self.negate = negate
+        super().__init__(self.column)
+
+
+@compiles(in_values, 'postgresql')
+def _in_values_postgresql(element: in_values, compiler, **kwargs) -> str:
+    """Compile in_values as = ANY(array) or != ALL(array)."""
+    column = element.column
+    array_type = ARRAY(column.type)
+    values = sa.cast(
+        sa.bindparam('in_values', element.values, type_=array_type, unique=True),
+        array_type
+    )
+    if element.negate:
+        clause = column != sa.all_(values)
+    else:
+        clause = column == sa.any_(values)
+    return compiler.process(clause, **kwargs)
+
+
+@compiles(in_values)
+def _in_values_default(element: in_values, compiler, **kwargs) -> str:
+    """Compile in_values as an expanding IN parameter."""
+    column = element.column
+    values = sa.bindparam('in_values', element.values, expanding=True, unique=True)
+    clause = column.notin_(values) if element.negate else column.in_(values)
+    return compiler.process(clause, **kwargs)
+
+
+class date_bucket(FunctionElement):
+    """Truncate a date or datetime column to a day, week, month or year.
+
+    PostgreSQL uses ``date_trunc``, SQLite returns the bucket formatted by ``strftime``.
+    Usage: ``date_bucket(Model.created_at, 'month')``.
+    """
+
+    name = 'date_bucket'
+
+    def __init__(self, column: sa.Column, bucket: str):
+        """Initialize the function.
+
+        :param column: date or datetime column.
+        :param bucket: one of DATE_BUCKETS.
+        """
+        if bucket not in DATE_BUCKETS:
+            raise ValueError(f'Unknown date bucket \'{bucket}\'')
+        self.bucket = bucket
+        super().__init__(column)
+
+
+@compiles(date_bucket)
+def _date_bucket_default(element: date_bucket, compiler, **kwargs) -> str:
+    """Compile date_bucket as date_trunc."""
+    column = compiler.process(element.clauses, **kwargs)
+    return f'date_trunc(\'{element.bucket}\', {column})'
+
+
+@compiles(date_bucket, 'sqlite')
+def _date_bucket_sqlite(element: date_bucket, compiler, **kwargs) -> str:
+    """Compile date_bucket as strftime."""
+    column = compiler.process(element.clauses, **kwargs)
+    return f'strftime(\'{_SQLITE_FORMATS[element.bucket]}\', {column})'
@@ -0,0 +1,245 @@
+"""Index advisor for fields used to filter and sort resource listings.
+
+Usage of filter and sort fields is recorded by :class:`briefy.ws.resources.BaseResource`
+and cross-checked with the indexes of each model table.
+
+Usage is counted in memory, per process. The command line runs in a new process, so it
+reads the usage observed by a running web head from the ``usage`` key of the
+``/__indexes__`` response, saved to a file::
+
+    curl -H "Authorization: JWT ..." https://api/__indexes__ > indexes.json
+    briefy-ws-index-advisor --usage indexes.json briefy.leica.views briefy.leica.views.order
+
+Without ``--usage`` the report only checks the schema: allowed fields, existing indexes and
+the index for ``default_order_by``.
+"""
+from collections import Counter
+from sqlalchemy import UniqueConstraint
+
+import argparse
+import importlib
+import json
+import threading
+import typing as t
+
+
+FILTER = 'filter'
+SORT = 'sort'
+
+
+def _model_name(model: type) -> str:
+    """Return the dotted name of a model class."""
+    return f'{model.__module__}.{model.__name__}'
+
+
+class FieldUsage:
+    """Thread safe counter of fields used in filters and sorting, per model."""
+
+    def __init__(self):
+        """Initialize the counter."""
+        self._counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, model: type, kind: str, field: str):
+        """Record the usage of a field.
+
+        :param model: model class.
+        :param kind: FILTER or SORT.
+        :param field: field name.
+        """
+        with self._lock:
+            self._counter[(model, kind, field)] += 1
+
+    def get(self, model: type, kind: str) -> t.Dict[str, int]:
+        """Return usage count of each field of a model.
+
+        :param model: model class.
+        :param kind: FILTER or SORT.
+        :return: dictionary with field names and usage count.
+        """
+        with self._lock:
+            return {
+                field: count for (klass, kind_, field), count in self._counter.items()
+                if klass is model and kind_ == kind
+            }
+
+    def dump(self) -> t.List[dict]:
+        """Return all counters, with models identified by their dotted name.
+
+        :return: list of dictionaries with model, kind, field and count.
+        """
+        with self._lock:
+            items = list(self._counter.items())
+        return [
+            {'model': _model_name(model), 'kind': kind, 'field': field, 'count': count}
+            for (model, kind, field), count in items
+        ]
+
+    def load(self, items: t.Sequence[dict], models: t.Iterable[type]):
+        """Add counters returned by dump, possibly from another process.
+
+        :param items: list of dictionaries with model, kind, field and count.
+        :param models: model classes the dotted names are resolved to, others are ignored.
+        """
+        by_name = {_model_name(model): model for model in models}
+        with self._lock:
+            for item in items:
+                model = by_name.get(item['model'])
+                if model is not None:
+                    self._counter[(model, item['kind'], item['field'])] += int(item['count'])
+
+    def clear(self):
+        """Reset all counters."""
+        with self._lock:
+            self._counter.clear()
+
+
+field_usage = FieldUsage()
+"""Field usage for this process."""
+
+
+def _get_column(table, field: str):
+    """Return the table column for a field, also trying the name starting with underscore."""
+    column = table.c.get(field)
+    if column is None:
+        column = table.c.get(f'_{field}')
+    return column
+
+
+def _indexes(table) -> t.List[t.Tuple[str, ...]]:
+    """Return column names of all indexes, primary key and unique constraints of a table."""
+    indexes = [tuple([c.name for c in table.primary_key.columns])]
+    indexes.extend([tuple([c.name for c in index.columns]) for index in table.indexes])
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            indexes.append(tuple([c.name for c in constraint.columns]))
+    return [index for index in indexes if index]
+
+
+def _allowed_fields(resource: type) -> t.Sequence[str]:
+    """Return the fields a resource allows in filters and sorting."""
+    try:
+        instance = resource.__new__(resource)
+        fields = list(instance.filter_allowed_fields)
+    except (AttributeError, TypeError):
+        # filter_allowed_fields may depend on the request, not set on this instance
+        table = resource.model.__table__
+        fields = [column.name.lstrip('_') for column in table.columns]
+        fields += ['state'] + list(resource.filter_related_fields)
+    return list(dict.fromkeys(fields))
+
+
+def resource_report(resource: type) -> t.Optional[dict]:
+    """Return index information and suggestions for a resource.
+
+    :param resource: BaseResource subclass.
+    :return: dictionary with the report or None if the resource has no model table.
+    """
+    model = resource.model
+    table = getattr(model, '__table__', None)
+    if table is None:
+        return None
+
+    indexes = _indexes(table)
+    leading = {index[0] for index in indexes}
+    filters = field_usage.get(model, FILTER)
+    sorts = field_usage.get(model, SORT)
+
+    fields = []
+    for field in _allowed_fields(resource):
+        column = _get_column(table, field)
+        fields.append({
+            'field': field,
+            'column': column.name if column is not None else None,
+            'indexed': column is not None and column.name in leading,
+            'filters': filters.get(field, 0),
+            'sorts': sorts.get(field, 0),
+        })
+
+    order_by = _get_column(table, resource.default_order_by or '')
+    suggestions = []
+    if order_by is not None and order_by.name not in leading:
+        suggestions.append((order_by.name, ))
+    used = sorted(
+        [item for item in fields if item['filters'] and item['column'] and not item['indexed']],
+        key=lambda item: item['filters'],
+        reverse=True
+    )
+    for item in used:
+        columns = (item['column'], )
+        if order_by is not None and order_by.name != item['column']:
+            columns = (item['column'], order_by.name)
+        if columns not in indexes:
+            suggestions.append(columns)
+
+    return {
+        'resource': f'{resource.__module__}.{resource.__name__}',
+        'model': model.__name__,
+        'table': table.name,
+        'default_order_by': resource.default_order_by,
+        'indexes': indexes,
+        'fields': fields,
+        'suggestions': [
+            f'CREATE INDEX ix_{table.name}_{"_".join(columns)} '
+            f'ON {table.name} ({", ".join(columns)})'
+            for columns in suggestions
+        ],
+    }
+
+
+def report(resources: t.Optional[t.Sequence[type]]=None) -> t.List[dict]:
+    """Return the index report of all registered resources.
+
+    :param resources: resource classes, default to all BaseResource subclasses with a model.
+    :return: list of reports, one for each resource.
+    """
+    if resources is None:
+        from briefy.ws.resources.base import BaseResource
+        resources = BaseResource.registered_resources()
+    reports = [resource_report(resource) for resource in resources if resource.model]
+    return [item for item in reports if item]
+
+
+def format_report(reports: t.Sequence[dict]) -> str:
+    """Format reports as text.
+
+    :param reports: list of resource reports.
+    :return: text report.
+    """
+    lines = []
+    for item in reports:
+        lines.append(f'{item["resource"]} ({item["table"]})')
+        for field in item['fields']:
+            status = 'indexed' if field['indexed'] else 'NOT INDEXED'
+            if field['column'] is None:
+                status = 'related'
+            lines.append(
+                f'  {field["field"]:<30} {status:<12} '
+                f'filters: {field["filters"]:<6} sorts: {field["sorts"]}'
+            )
+        for suggestion in item['suggestions']:
+            lines.append(f'  suggestion: {suggestion};')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def main(argv: t.Optional[t.Sequence[str]]=None):
+    """Print the index report for resources defined in the given modules."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('modules', nargs='+', help='modules defining the resources')
+    parser.add_argument(
+        '--usage',
+        help='JSON file with the /__indexes__ response, or its usage list, of a web head'
+    )
+    args = parser.parse_args(argv)
+    for module in args.modules:
+        importlib.import_module(module)
+    if args.usage:
+        from briefy.ws.resources.base import BaseResource
+        with open(args.usage) as fh:
+            usage = json.load(fh)
+        if isinstance(usage, dict):
+            usage = usage.get('usage', [])
+        models = [resource.model for resource in BaseResource.registered_resources()]
+        field_usage.load(usage, [model for model in models if model])
+    print(format_report(report()))
@@ -0,0 +1,142 @@
+"""Route reads of safe requests to a read replica.
+
+Applications opt in by creating their session factory with :class:`RoutingSession`::
+
+    DBSession = orm.scoped_session(
+        orm.sessionmaker(class_=RoutingSession, extension=ZopeTransactionExtension())
+    )
+
+and setting ``DATABASE_REPLICA_URL``. Resources enable the replica for GET and HEAD
+requests (see ``BaseResource.use_read_replica``), all other statements use the primary.
+
+After a write, the response carries the write time in the ``briefy_ws_last_write`` cookie
+and the ``X-Briefy-Last-Write`` header. Requests sending either of them back, to any
+process or web head, read from the primary for ``DATABASE_REPLICA_STICKINESS`` seconds,
+so the client reads its own writes. Clients not keeping cookies can echo the header.
+
+Writes are detected on ORM flushes, ``query.update()`` / ``query.delete()`` and
+insert, update and delete statements executed with ``session.execute``. Writes in textual
+SQL are not detected: call :func:`mark_write` after them.
+"""
+from briefy.ws.config import DATABASE_REPLICA_STICKINESS
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.threadlocal import get_current_request
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import UpdateBase
+
+import time
+import typing as t
+
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+LAST_WRITE_COOKIE = 'briefy_ws_last_write'
+"""Cookie with the time, in seconds since the epoch, of the last write of the client."""
+
+LAST_WRITE_HEADER = 'X-Briefy-Last-Write'
+"""Header with the time, in seconds since the epoch, of the last write of the client."""
+
+_REQUEST_ATTR = '_briefy_read_replica'
+_WRITE_ATTR = '_briefy_last_write'
+
+
+def last_write(request: Request) -> t.Optional[float]:
+    """Return the time of the last write sent by the client, if any."""
+    value = request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(LAST_WRITE_HEADER)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def use_read_replica(request: Request, enabled: bool=True):
+    """Route reads of this request to the read replica.
+
+    Only safe requests of clients without recent writes use the replica.
+
+    :param request: pyramid request object.
+    :param enabled: False to use the primary.
+    """
+    if enabled and request.method in SAFE_METHODS:
+        written_at = last_write(request)
+        stickiness = float(DATABASE_REPLICA_STICKINESS)
+        enabled = written_at is None or time.time() - written_at >= stickiness
+    else:
+        enabled = False
+    setattr(request, _REQUEST_ATTR, enabled)
+
+
+def reads_from_replica(request: t.Optional[Request]) -> bool:
+    """Check if reads of the request go to the read replica."""
+    return bool(request is not None and getattr(request, _REQUEST_ATTR, False))
+
+
+def mark_write(request: t.Optional[Request]):
+    """Send the rest of the request, and the next requests of the client, to the primary.
+
+    :param request: pyramid request object, nothing is done outside a request.
+    """
+    if request is None:
+        return
+    setattr(request, _REQUEST_ATTR, False)
+    if getattr(request, _WRITE_ATTR, None):
+        return
+    written_at = f'{time.time():.3f}'
+    setattr(request, _WRITE_ATTR, written_at)
+
+    def set_last_write(request: Request, response: Response):
+        max_age = int(float(DATABASE_REPLICA_STICKINESS))
+        response.set_cookie(LAST_WRITE_COOKIE, written_at, max_age=max_age, httponly=True)
+        response.headers[LAST_WRITE_HEADER] = written_at
+
+    request.add_response_callback(set_last_write)
+
+
+class RoutingSession(Session):
+    """Session using the read replica for reads of requests enabled by use_read_replica.
+
+    Flushes and insert, update and delete statements always go to the primary.
+    """
+
+    replica_bind = None
+    """Engine of the read replica, set by install."""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """Return the read replica engine for reads of replica enabled requests."""
+        replica = self.replica_bind
+        if replica is not None and not self._flushing:
+            request = get_current_request()
+            if isinstance(clause, UpdateBase):
+                mark_write(request)
+            elif reads_from_replica(request):
+                return replica
+        return super().get_bind(mapper, clause, **kwargs)
+
+
+def after_flush(session: Session, flush_context):
+    """Send the current request and client to the primary after a write."""
+    mark_write(get_current_request())
+
+
+def after_bulk_write(context):
+    """Send the current request and client to the primary after query.update or delete."""
+    mark_write(get_current_request())
+
+
+def install(engine: t.Optional[Engine]):
+    """Set the read replica engine of all routing sessions.
+
+    :param engine: read replica engine, None to disable the replica.
+    """
+    RoutingSession.replica_bind = engine
+    listeners = (
+        ('after_flush', after_flush),
+        ('after_bulk_update', after_bulk_write),
+        ('after_bulk_delete', after_bulk_write),
+    )
+    for name, listener in listeners:
+        if not sa_event.contains(RoutingSession, name, listener):
+            sa_event.listen(RoutingSession, name, listener)
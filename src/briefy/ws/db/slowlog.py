@@ -0,0 +1,148 @@
+"""Capture of slow statements executed by resource listings."""
+from briefy.ws import logger
+from briefy.ws.config import SLOW_QUERY_BUFFER_SIZE
+from briefy.ws.config import SLOW_QUERY_EXPLAIN
+from briefy.ws.config import SLOW_QUERY_THRESHOLD
+from briefy.ws.db import stats
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from pyramid.settings import asbool
+
+import re
+import threading
+import typing as t
+
+
+_local = threading.local()
+
+_whitespace = re.compile(r'\s+')
+_placeholder = r'(?:\?|%s|%\(\w+\)s|:\w+)'
+_placeholder_list = re.compile(rf'\(\s*{_placeholder}(?:\s*,\s*{_placeholder})+\s*\)')
+
+
+def normalize(statement: str) -> str:
+    """Return the shape of a statement, so similar statements can be grouped.
+
+    :param statement: SQL statement, with placeholders for parameters.
+    :return: statement with collapsed whitespace and lists of placeholders.
+    """
+    statement = _whitespace.sub(' ', statement).strip()
+    return _placeholder_list.sub('(...)', statement)
+
+
+def explain(conn, statement: str, parameters: t.Any) -> t.Optional[str]:
+    """Return the query plan of a statement using the DBAPI connection.
+
+    The plan is computed inside a savepoint so a failure does not abort the transaction.
+
+    :param conn: SQLAlchemy connection that executed the statement.
+    :param statement: SQL statement.
+    :param parameters: parameters used to execute the statement.
+    :return: query plan, one line per row.
+    """
+    is_sqlite = conn.dialect.name == 'sqlite'
+    prefix = 'EXPLAIN QUERY PLAN ' if is_sqlite else 'EXPLAIN '
+    cursor = conn.connection.cursor()
+    try:
+        if not is_sqlite:
+            cursor.execute('SAVEPOINT briefy_explain')
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception as exc:
+            logger.warning(f'Could not explain slow query. Exception: {exc}')
+            if not is_sqlite:
+                cursor.execute('ROLLBACK TO SAVEPOINT briefy_explain')
+            return None
+        if not is_sqlite:
+            cursor.execute('RELEASE SAVEPOINT briefy_explain')
+    finally:
+        cursor.close()
+    return '\n'.join([' '.join([str(value) for value in row]) for row in rows])
+
+
+class SlowQueryLog:
+    """Bounded ring buffer with the latest slow statements."""
+
+    def __init__(self, maxlen: int, threshold: float, explain: bool=False):
+        """Initialize the log.
+
+        :param maxlen: maximum number of entries kept.
+        :param threshold: minimum duration, in milliseconds, of a statement to be recorded.
+        :param explain: record the query plan of slow statements.
+        """
+        self.threshold = threshold
+        self.explain = explain
+        self._entries = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of entries in the log."""
+        return len(self._entries)
+
+    def record(self, entry: dict):
+        """Add an entry to the log.
+
+        :param entry: slow statement information.
+        """
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> t.List[dict]:
+        """Return all entries, the most recent first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def observe(self, conn, statement: str, parameters: t.Any, executemany: bool, duration: float):
+        """Statement observer recording slow statements executed inside a capture block."""
+        captured = getattr(_local, 'capture', None)
+        duration = duration * 1000
+        if captured is None or duration < self.threshold:
+            return
+        resource, params = captured
+        entry = {
+            'resource': resource,
+            'statement': normalize(statement),
+            'params': params,
+            'duration': round(duration, 2),
+            'timestamp': datetime.now(timezone.utc),
+            'plan': None,
+        }
+        if self.explain and not executemany and statement.lstrip()[:6].upper() == 'SELECT':
+            entry['plan'] = explain(conn, statement, parameters)
+        self.record(entry)
+
+
+slow_queries = SlowQueryLog(
+    int(SLOW_QUERY_BUFFER_SIZE), float(SLOW_QUERY_THRESHOLD), asbool(SLOW_QUERY_EXPLAIN)
+)
+"""Log of slow statements for this process."""
+
+
+@contextmanager
+def capture(resource: str, params: dict):
+    """Record slow statements executed inside this block.
+
+    :param resource: name of the resource executing the statements.
+    :param params: request parameters used to build the statements.
+    """
+    previous = getattr(_local, 'capture', None)
+    _local.capture = (resource, params)
+    try:
+        yield
+    finally:
+        _local.capture = previous
+
+
+def install():
+    """Register the slow query log as an observer of all statements, only once."""
+    stats.install()
+    if slow_queries.observe not in stats.statement_observers:
+        stats.statement_observers.append(slow_queries.observe)
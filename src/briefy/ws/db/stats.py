@@ -0,0 +1,102 @@
+"""Statistics of SQL statements executed during a request."""
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+
+import threading
+import time
+import typing as t
+
+
+_local = threading.local()
+
+
+statement_observers = []
+"""Callables receiving (conn, statement, parameters, executemany, duration) for statements."""
+
+
+class SQLStats:
+    """Number of statements, rows and time spent in the database."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.statements = 0
+        self.rows = 0
+        self.duration = 0.0
+
+    def add(self, duration: float, rows: int):
+        """Account for an executed statement.
+
+        :param duration: execution time in seconds.
+        :param rows: number of rows returned or affected, negative if unknown.
+        """
+        self.statements += 1
+        self.duration += duration
+        if rows > 0:
+            self.rows += rows
+
+    def server_timing(self) -> str:
+        """Return the value for a Server-Timing header."""
+        desc = f'{self.statements} statements, {self.rows} rows'
+        return f'db;dur={self.duration * 1000:.2f};desc="{desc}"'
+
+
+def start() -> SQLStats:
+    """Start collecting statistics in the current thread.
+
+    :return: SQLStats updated by all statements executed in this thread until stop is called.
+    """
+    stats = _local.stats = SQLStats()
+    return stats
+
+
+def stop() -> t.Optional[SQLStats]:
+    """Stop collecting statistics in the current thread.
+
+    :return: collected statistics.
+    """
+    stats = current()
+    _local.stats = None
+    return stats
+
+
+def current() -> t.Optional[SQLStats]:
+    """Return statistics being collected in the current thread, if any."""
+    return getattr(_local, 'stats', None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Engine listener to keep the time a statement started."""
+    conn.info.setdefault('briefy_query_start', []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Engine listener to account for a statement in the current statistics."""
+    starts = conn.info.get('briefy_query_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    stats = current()
+    if stats is not None:
+        stats.add(duration, cursor.rowcount)
+    for observer in statement_observers:
+        observer(conn, statement, parameters, executemany, duration)
+
+
+def handle_error(exception_context):
+    """Engine listener to discard the start time of a failed statement."""
+    conn = exception_context.connection
+    starts = conn.info.get('briefy_query_start') if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def install():
+    """Register the engine listeners for all engines, only once."""
+    listeners = (
+        ('before_cursor_execute', before_cursor_execute),
+        ('after_cursor_execute', after_cursor_execute),
+        ('handle_error', handle_error),
+    )
+    for name, listener in listeners:
+        if not sa_event.contains(Engine, name, listener):
+            sa_event.listen(Engine, name, listener)
@@ -0,0 +1,54 @@
+"""Statement timeout for queries executed by resources."""
+from briefy.ws.errors import StatementTimeoutError
+from contextlib import contextmanager
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+import sqlalchemy as sa
+import typing as t
+
+
+QUERY_CANCELED = '57014'
+"""PostgreSQL error code of statements cancelled by the statement timeout."""
+
+SET_TIMEOUT = sa.text(
+    "SELECT current_setting('statement_timeout'), set_config('statement_timeout', :value, true)"
+)
+RESTORE_TIMEOUT = sa.text("SELECT set_config('statement_timeout', :value, true)")
+
+
+def is_statement_timeout(exc: DBAPIError) -> bool:
+    """Check if a database error was raised by the statement timeout."""
+    return getattr(exc.orig, 'pgcode', None) == QUERY_CANCELED
+
+
+@contextmanager
+def statement_timeout(session: Session, timeout: int) -> t.Iterator[None]:
+    """Limit the duration of statements executed in this block.
+
+    The timeout is set, only for PostgreSQL, inside a savepoint, so a cancelled statement
+    does not abort the transaction of the request. For other databases this is a no-op.
+
+    :param session: session executing the statements.
+    :param timeout: maximum duration of each statement, in ms, 0 to disable.
+    :raises StatementTimeoutError: if a statement was cancelled.
+    """
+    if not timeout or session.get_bind().dialect.name != 'postgresql':
+        yield
+        return
+
+    nested = session.begin_nested()
+    try:
+        previous = session.execute(SET_TIMEOUT, {'value': f'{timeout}ms'}).scalar()
+        yield
+        session.execute(RESTORE_TIMEOUT, {'value': previous})
+    except DBAPIError as exc:
+        nested.rollback()
+        if is_statement_timeout(exc):
+            raise StatementTimeoutError(f'Query cancelled after {timeout}ms.') from exc
+        raise
+    except Exception:
+        nested.rollback()
+        raise
+    else:
+        nested.commit()
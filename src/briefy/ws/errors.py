@@ -1,2 +1,6 @@
 """Briefy microservices errors."""
 from briefy.common.exceptions import ValidationError  # noQA
+
+
+class StatementTimeoutError(Exception):
+    """A database statement was cancelled for exceeding the statement timeout."""
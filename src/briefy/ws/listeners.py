@@ -4,7 +4,69 @@ from briefy.common.db.model import Base
 from pyramid.threadlocal import get_current_request
 from sqlalchemy import event as sa_event
 
+import inspect
 import typing as t
+import warnings
+
+
+def _current_user():
+    """Return the authenticated user of the current request."""
+    request = get_current_request()
+    return request.user if request else None
+
+
+class RequestAttribute:
+    """Descriptor for model attributes filled from the current request on first access.
+
+    Replaces a plain class attribute (e.g. ``request = None``), so nothing needs to be done
+    when an instance is loaded from the database.
+    """
+
+    def __init__(self, name: str, resolve: t.Callable, default: t.Any=None):
+        """Initialize the descriptor.
+
+        :param name: attribute name.
+        :param resolve: callable returning the value from the current request.
+        :param default: value of the original class attribute.
+        """
+        self.name = name
+        self.resolve = resolve
+        self.default = default
+
+    def __get__(self, instance: Base, owner: type) -> t.Any:
+        """Return the instance value, resolving it from the current request if not set."""
+        if instance is None:
+            return self.default
+        value = instance.__dict__.get(self.name)
+        if not value:
+            resolved = self.resolve()
+            if resolved:
+                value = instance.__dict__[self.name] = resolved
+            elif value is None:
+                value = self.default
+        return value
+
+    def __set__(self, instance: Base, value: t.Any):
+        """Set the instance value."""
+        instance.__dict__[self.name] = value
+
+
+def _install_request_attribute(klass: type, name: str, resolve: t.Callable) -> bool:
+    """Replace a plain class attribute by a RequestAttribute.
+
+    :param klass: model class.
+    :param name: attribute name.
+    :param resolve: callable returning the value from the current request.
+    :return: True if the attribute is resolved lazily, False if a load listener is needed.
+    """
+    value = inspect.getattr_static(klass, name)
+    if isinstance(value, RequestAttribute):
+        return True
+    if hasattr(type(value), '__get__'):
+        # properties, columns and other descriptors are left untouched
+        return False
+    setattr(klass, name, RequestAttribute(name, resolve, value))
+    return True
 
 
 def base_receive_init_workflow_context(
@@ -29,32 +91,71 @@ def base_receive_init_workflow_context(
             kwargs['workflow_context'] = auth_user
 
 
-def base_receive_load_workflow_context(
-        target: Base,
-        context
-):
+def _load_listener(set_request: bool, set_context: bool) -> t.Callable:
+    """Create the load listener for attributes that could not be resolved lazily.
+
+    :param set_request: set the request attribute on load.
+    :param set_context: set the workflow_context attribute on load.
+    :return: listener function.
+    """
+    def receive_load_workflow_context(target: Base, context):
+        """Listener to set request.user as workflow_context and request in all models.
+
+        :param target: model instance
+        :param context: sqlalchemy query context
+        """
+        request = get_current_request()
+        if request:
+            if set_request and not getattr(target, 'request', None):
+                target.request = request
+            auth_user = request.user
+            if auth_user and set_context and not target.workflow_context:
+                target.workflow_context = auth_user
+
+    return receive_load_workflow_context
+
+
+def base_receive_load_workflow_context(target: Base, context):
     """Listener to set request.user as workflow_context and request in all models.
 
-    Both are set for all models that have these attributes.
+    Deprecated: register_workflow_context_listeners resolves these attributes lazily and
+    only registers a load listener when needed. Kept for services registering this listener
+    directly, the model checks are done on each call.
 
     :param target: model instance
     :param context: sqlalchemy query context
     """
-    request = get_current_request()
-    if request:
-        if 'request' in target.__dir__() and not getattr(target, 'request', None):
-            target.request = request
-        auth_user = request.user
-        set_user = hasattr(target, 'workflow_context') and not target.workflow_context
-        if auth_user and set_user:
-            target.workflow_context = auth_user
+    warnings.warn(
+        'base_receive_load_workflow_context is deprecated, '
+        'use register_workflow_context_listeners instead.',
+        DeprecationWarning,
+        stacklevel=2
+    )
+    klass = type(target)
+    listener = _load_listener(hasattr(klass, 'request'), hasattr(klass, 'workflow_context'))
+    listener(target, context)
 
 
 def register_workflow_context_listeners(models: t.Sequence[Base]):
     """For all models in the list register the workflow context handlers.
 
+    Model capabilities are checked only once, here. The request and workflow_context
+    attributes are resolved from the current request on first access, a load listener is
+    registered only for models where those attributes are not plain class attributes.
+
     :param models: list of model classes
     """
     for model_klass in models:
         sa_event.listen(model_klass, 'init', base_receive_init_workflow_context)
-        sa_event.listen(model_klass, 'load', base_receive_load_workflow_context)
+
+        has_request = hasattr(model_klass, 'request')
+        has_context = hasattr(model_klass, 'workflow_context')
+        set_request = has_request and not _install_request_attribute(
+            model_klass, 'request', get_current_request
+        )
+        set_context = has_context and not _install_request_attribute(
+            model_klass, 'workflow_context', _current_user
+        )
+        if set_request or set_context:
+            load_listener = _load_listener(set_request, set_context)
+            sa_event.listen(model_klass, 'load', load_listener)
@@ -1,5 +1,6 @@
 """Custom JSONRenderer."""
 from briefy.common.utils.transformers import to_serializable
+from briefy.ws.utils import profiling
 from pyramid.interfaces import IJSONAdapter
 from pyramid.renderers import JSON
 from pyramid.request import Request
@@ -8,11 +9,81 @@ from zope.interface import providedBy
 import typing as t
 
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
 _marker = object()
 
+JSON_TYPE = 'application/json'
+MSGPACK_TYPE = 'application/msgpack'
+MSGPACK_TYPES = (MSGPACK_TYPE, 'application/x-msgpack')
+
+
+def _media_quality(accept: str, media_types: t.Sequence[str]) -> float:
+    """Return the quality an Accept header gives to a media type.
+
+    :param accept: value of the Accept header.
+    :param media_types: media type and its aliases.
+    :return: quality of the most specific matching range, 0 if not accepted.
+    """
+    main_types = {media_type.split('/')[0] for media_type in media_types}
+    best_specificity, best_quality = -1, 0.0
+    for item in accept.split(','):
+        media_range, *params = [value.strip() for value in item.split(';')]
+        media_range = media_range.lower()
+        if media_range in media_types:
+            specificity = 2
+        elif media_range.endswith('/*') and media_range[:-2] in main_types:
+            specificity = 1
+        elif media_range == '*/*':
+            specificity = 0
+        else:
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if specificity > best_specificity:
+            best_specificity, best_quality = specificity, quality
+    return best_quality
+
+
+def accepts_msgpack(request: Request) -> bool:
+    """Check if the client prefers MessagePack over JSON, and msgpack is installed.
+
+    :param request: pyramid request object.
+    :return: True if the response should be encoded with MessagePack.
+    """
+    if msgpack is None:
+        return False
+    accept = request.headers.get('Accept', '')
+    if 'msgpack' not in accept:
+        return False
+    return _media_quality(accept, MSGPACK_TYPES) > _media_quality(accept, (JSON_TYPE, ))
+
+
+def msgpack_dumps(value: t.Any) -> bytes:
+    """Encode a value with MessagePack, using the same type mapping as the JSON renderer."""
+    return msgpack.packb(value, default=to_serializable, use_bin_type=True)
+
+
+def msgpack_loads(data: bytes) -> t.Any:
+    """Decode a MessagePack payload."""
+    return msgpack.unpackb(data, raw=False)
+
 
 class JSONRenderer(JSON):
-    """JSON renderer that inject to_serializable as default for json or simplejson dumps call."""
+    """JSON renderer that inject to_serializable as default for json or simplejson dumps call.
+
+    Clients preferring ``application/msgpack`` in the Accept header get a MessagePack
+    payload instead, if msgpack is installed.
+    """
 
     def _make_default(self, request: Request):
         """Make default function is not used anymore, just here to explicit it."""
@@ -35,12 +106,24 @@ class JSONRenderer(JSON):
         """
         def _render(value, system):
             request = system.get('request')
-            if request is not None:
-                response = request.response
-                ct = response.content_type
-                if ct == response.default_content_type:
-                    response.content_type = 'application/json'
+            if request is None:
+                return self.serializer(value, default=to_serializable, **self.kw)
+            response = request.response
+            ct = response.content_type
+            serializer = None
+            if ct == response.default_content_type:
+                vary = list(response.vary or ())
+                if 'Accept' not in vary:
+                    response.vary = vary + ['Accept']
+                if accepts_msgpack(request):
+                    response.content_type = MSGPACK_TYPE
+                    serializer = msgpack_dumps
+                else:
+                    response.content_type = JSON_TYPE
             # do not use _make_default, just pass to_serializable
-            return self.serializer(value, default=to_serializable, **self.kw)
+            with profiling.phase(request, 'serialization'):
+                if serializer is not None:
+                    return serializer(value)
+                return self.serializer(value, default=to_serializable, **self.kw)
 
         return _render
@@ -4,15 +4,35 @@ from briefy.common.db.mixins import LocalRolesMixin
 from briefy.common.db.model import Base
 from briefy.ws import logger
 from briefy.ws.auth import validate_jwt_token
+from briefy.ws.config import LISTING_STATEMENT_TIMEOUT
+from briefy.ws.db import routing
+from briefy.ws.db import slowlog
+from briefy.ws.db import timeout
+from briefy.ws.db.functions import date_bucket
+from briefy.ws.db.functions import DATE_BUCKETS
+from briefy.ws.db.functions import in_values
+from briefy.ws.db.functions import LIKE_ESCAPE
+from briefy.ws.db.functions import text_rank
+from briefy.ws.db.functions import text_search
+from briefy.ws.db.indexes import field_usage
+from briefy.ws.db.indexes import FILTER
+from briefy.ws.db.indexes import SORT
+from briefy.ws.errors import StatementTimeoutError
 from briefy.ws.errors import ValidationError
 from briefy.ws.resources.factory import BaseFactory
 from briefy.ws.resources.validation import validate_id
 from briefy.ws.utils import data
 from briefy.ws.utils import filter
+from briefy.ws.utils import instrumentation
+from briefy.ws.utils import metrics
 from briefy.ws.utils import paginate
+from briefy.ws.utils import profiling
 from briefy.ws.utils import user
+from briefy.ws.utils.cache import OBJECTS
+from briefy.ws.utils.cache import request_cache
 from cornice.util import json_error
 from cornice.validators import colander_body_validator
+from functools import partial
 from pyramid.httpexceptions import HTTPNotFound as NotFound
 from pyramid.httpexceptions import HTTPUnauthorized as Unauthorized
 from pyramid.request import Request
@@ -23,11 +43,16 @@ from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 
 import colander
-import newrelic.agent
 import sqlalchemy as sa
 import typing as t
 
 
+def _is_type(column: sa.Column, types: t.Tuple[type, ...]) -> bool:
+    """Check the type of a column, or of the implementation of a decorated type."""
+    type_ = column.type
+    return isinstance(getattr(type_, 'impl', type_), types)
+
+
 class BaseResource:
     """Base class for resources."""
 
@@ -37,12 +62,46 @@ class BaseResource:
     default_order_direction = 1
     filter_related_fields = ()
     enable_security = True
+    use_read_replica = True
+    """Read from the read replica, if configured, on GET and HEAD requests."""
+
+    aggregate_functions = ('sum', 'avg', 'min', 'max')
+    """Aggregate functions allowed in get_aggregates, over numeric filter fields."""
+
+    aggregate_groups_limit = 1000
+    """Maximum number of groups returned by get_aggregates."""
+
+    search_fields = ()
+    """Text columns searched by the _q and search_<field> filters."""
+
+    search_config = 'simple'
+    """PostgreSQL text search configuration used by full-text search."""
+
+    statement_timeouts = ()
+    """Timeout, in ms, of listing statements per HTTP verb, e.g. ``(('GET', 5000), )``.
+
+    Verbs not listed use LISTING_STATEMENT_TIMEOUT. Only applied on PostgreSQL.
+    """
 
     _required_fields = ()
     _default_notify_events = None
     _item_count = None
     _query = None
     _query_params = None
+    _parsed_query_params = None
+    _search_rank = None
+
+    _registry = []
+
+    def __init_subclass__(cls, **kwargs):
+        """Keep track of all resource classes."""
+        super().__init_subclass__(**kwargs)
+        BaseResource._registry.append(cls)
+
+    @classmethod
+    def registered_resources(cls) -> t.List[type]:
+        """Return all subclasses of this resource class."""
+        return [klass for klass in BaseResource._registry if issubclass(klass, cls)]
 
     def __init__(self, context: BaseFactory, request: Request):
         """Initialize the service."""
@@ -50,6 +109,7 @@ class BaseResource:
         self.request = request
         cls_ = self.__class__
         self._transaction_name = f'{cls_.__module__}:{cls_.__name__}'
+        routing.use_read_replica(request, self.use_read_replica)
 
     @property
     def friendly_name(self) -> str:
@@ -58,7 +118,7 @@ class BaseResource:
 
     def set_transaction_name(self, suffix) -> None:
         """Set newrelic transaction name."""
-        newrelic.agent.set_transaction_name(f'{self._transaction_name}.{suffix}', 'WebService')
+        instrumentation.set_transaction_name(f'{self._transaction_name}.{suffix}', 'WebService')
 
     @property
     def session(self) -> Session:
@@ -101,21 +161,34 @@ class BaseResource:
             event_klass = obj_attr.get(method)
         return event_klass
 
-    def _get_base_query(self, permission: str='view') -> Query:
-        """Return the base query for this service.
+    def _get_query_kwargs(self, permission: str='view') -> dict:
+        """Return the arguments used to scope the model query to the current user.
 
-        :return: Query object with default filter already applied.
+        :return: Dictionary with principal_id and permission or empty if no scope is needed.
         """
-        context = self.context
-        model = self.model
         user = self.request.user
-        principal_id = self.request.user.id
-        has_global_permission = context.has_global_permissions(permission, user.groups)
+        has_global_permission = self.context.has_global_permissions(permission, user.groups)
         kwargs = {}
         lr_subclass = issubclass(self.model, LocalRolesMixin)
         if self.enable_security and not has_global_permission and lr_subclass:
-            kwargs['principal_id'] = principal_id
+            kwargs['principal_id'] = user.id
             kwargs['permission'] = f'can_{permission}'
+        return kwargs
+
+    def _get_base_query(
+            self,
+            permission: str='view',
+            apply_default_filters: bool=True
+    ) -> Query:
+        """Return the base query for this service.
+
+        :param permission: permission used to scope the query to the current user.
+        :param apply_default_filters: apply the default filters of this resource.
+        :return: Query object with default filter already applied.
+        """
+        model = self.model
+        principal_id = self.request.user.id
+        kwargs = self._get_query_kwargs(permission)
         try:
             query = model.query(**kwargs)
         except AttributeError as exc:
@@ -124,7 +197,8 @@ class BaseResource:
             logger.error(msg)
             raise Unauthorized(msg)
 
-        query = self.default_filters(query)
+        if apply_default_filters:
+            query = self.default_filters(query)
         return query
 
     def get_required_fields(self, method: str) -> tuple:
@@ -138,7 +212,8 @@ class BaseResource:
 
     _validators = (
         ('GET', ('validate_id', )),
-        ('PUT', ('validate_id', ))
+        ('PUT', ('validate_id', )),
+        ('PATCH', ('validate_id', )),
     )
 
     @property
@@ -179,33 +254,45 @@ class BaseResource:
 
         :param request: request object
         """
-        validate_jwt_token(request)
         request_method = request.method
-
-        validators = self.validators.get(request_method, [])
-        for item in validators:
-            try:
-                validator = item
-                if isinstance(item, str):
-                    validator = getattr(self, item)
-            except AttributeError as e:
-                raise AttributeError(f'Validator "{item}" specified not found.')
-            else:
-                validator(request)
+        with profiling.phase(request, 'validators'):
+            validate_jwt_token(request)
+            validators = self.validators.get(request_method, [])
+            for item in validators:
+                try:
+                    validator = item
+                    if isinstance(item, str):
+                        validator = getattr(self, item)
+                except AttributeError as e:
+                    raise AttributeError(f'Validator "{item}" specified not found.')
+                else:
+                    validator(request)
 
         # Only validate body if we expect a body in the method
         if request_method in ('PATCH', 'POST', 'PUT'):
-            colander_body_validator(request, self.schema)
+            with profiling.phase(request, 'schema'):
+                schema = self.schema
+            with profiling.phase(request, 'validators'):
+                colander_body_validator(request, schema)
 
-    def raise_invalid(self, location: str='body', name: str='', description: str='', **kwargs):
-        """Raise a 400 error.
+    def raise_invalid(
+            self,
+            location: str='body',
+            name: str='',
+            description: str='',
+            status: int=400,
+            **kwargs
+    ):
+        """Raise a validation error, with status 400 by default.
 
         :param location: location in request (e.g. ``'querystring'``)
         :param name: field name
         :param description: detailed description of validation error
+        :param status: HTTP status of the error response.
         """
         request = self.request
         request.errors.add(location, name, description, **kwargs)
+        request.errors.status = status
         return json_error(request)
 
     def notify_obj_event(self, obj: Base, method: str='') -> None:
@@ -221,24 +308,46 @@ class BaseResource:
             event_klass = self.get_notify_event_class(method, obj)
 
             if event_klass:
-                event = event_klass(obj, request)
-                request.registry.notify(event)
-                # also execute the event to dispatch to sqs if needed
-                event()
+                metrics.EVENTS.inc(event=event_klass.__name__)
+                metrics.EVENTS_IN_FLIGHT.inc()
+                try:
+                    with profiling.phase(request, 'events'):
+                        event = event_klass(obj, request)
+                        request.registry.notify(event)
+                        # also execute the event to dispatch to sqs if needed
+                        event()
+                finally:
+                    metrics.EVENTS_IN_FLIGHT.dec()
 
     def get_one(self, id: str, permission: str='view') -> Base:
         """Given an id, return an instance of the model object or raise a not found exception.
 
+        Objects are cached in the request, so each one is loaded only once per permission.
+        The instance loaded by the route factory is reused when the query for this
+        permission would neither be scoped to the user nor have default filters.
+
         :param id: Id for the object
         :return: Object
         """
         model = self.model
-        query = self._get_base_query(permission=permission)
-        obj = query.filter(model.id == id).one_or_none()
+        cache = request_cache(self.request, OBJECTS)
+        key = (model, id, permission)
+        obj = cache.get(key)
+        if obj is None:
+            filtered = self.__class__.default_filters is not BaseResource.default_filters
+            if not (filtered or self._get_query_kwargs(permission)):
+                obj = cache.get((model, id))
+
+        metrics.CACHE_REQUESTS.inc(cache=OBJECTS, result='miss' if obj is None else 'hit')
+        if obj is None:
+            query = self._get_base_query(permission=permission)
+            with profiling.phase(self.request, 'query'):
+                obj = query.filter(model.id == id).one_or_none()
 
         if not obj:
             raise NotFound(f'{self.friendly_name} with id: {id} not found.')
 
+        cache[key] = obj
         return obj
 
     def _get_records_query(self, permission: str='view') -> t.Tuple[Query, dict]:
@@ -260,6 +369,38 @@ class BaseResource:
 
         return self._query, self._query_params
 
+    def get_statement_timeout(self, method: str) -> int:
+        """Return the timeout, in ms, of listing statements for a HTTP verb.
+
+        :param method: HTTP verb.
+        :return: timeout in ms, 0 if disabled.
+        """
+        timeouts = dict(self.statement_timeouts)
+        return int(timeouts.get(method, LISTING_STATEMENT_TIMEOUT))
+
+    def _statement_timeout(self, session: t.Optional[Session]=None) -> t.ContextManager:
+        """Limit the duration of statements executed by the current request listing.
+
+        :param session: session executing the statements, defaults to the resource session.
+        """
+        session = session if session is not None else self.session
+        return timeout.statement_timeout(
+            session, self.get_statement_timeout(self.request.method)
+        )
+
+    def raise_timeout(self, exc: StatementTimeoutError):
+        """Return a 503 error for a listing cancelled by the statement timeout.
+
+        :param exc: statement timeout error.
+        """
+        return self.raise_invalid(
+            'querystring', '', f'{exc} Use more selective filters.', status=503
+        )
+
+    def _capture_slow_queries(self) -> t.ContextManager:
+        """Record slow statements, built from the request parameters, in the slow query log."""
+        return slowlog.capture(self._transaction_name, dict(self.request.GET))
+
     def get_records(self) -> dict:
         """Get all records for this resource and return a dictionary.
 
@@ -267,7 +408,9 @@ class BaseResource:
         """
         query, query_params = self._get_records_query()
         item_count = self.count_records(query)
-        pagination = self.paginate(query, query_params, item_count)
+        with self._capture_slow_queries(), self._statement_timeout(query.session):
+            with profiling.phase(self.request, 'query'):
+                pagination = self.paginate(query, query_params, item_count)
         return pagination
 
     def count_records(self, query: t.Optional[Query]=None) -> int:
@@ -279,10 +422,73 @@ class BaseResource:
             query, query_params = self._get_records_query()
 
         if not self._item_count:
-            self._item_count = query.count()
+            with self._capture_slow_queries(), self._statement_timeout(query.session):
+                with profiling.phase(self.request, 'query'):
+                    self._item_count = query.count()
 
         return self._item_count
 
+    def _aggregate_error(self, name: str, message: str):
+        """Raise a validation error for an aggregate parameter."""
+        raise ValidationError(message=message, location='querystring', name=name)
+
+    def _aggregate_group(self, subquery: sa.sql.Alias, group_by: str) -> sa.sql.ColumnElement:
+        """Return the grouping expression for a field or a date bucket (e.g. created_at:month).
+
+        :param subquery: filtered query as a subquery.
+        :param group_by: field name, optionally followed by a date bucket.
+        :return: expression labeled as group.
+        """
+        field, _, bucket = group_by.partition(':')
+        if field not in self.filter_allowed_fields or field not in subquery.c:
+            self._aggregate_error('_group_by', f'Unknown group by field \'{field}\'')
+        column = subquery.c[field]
+        if bucket:
+            if bucket not in DATE_BUCKETS:
+                buckets = ', '.join(DATE_BUCKETS)
+                self._aggregate_error('_group_by', f'Date bucket must be one of: {buckets}')
+            if not _is_type(column, (sa.Date, sa.DateTime)):
+                self._aggregate_error('_group_by', f'Field \'{field}\' is not a date')
+            column = date_bucket(column, bucket)
+        return column.label('group')
+
+    def get_aggregates(self, aggregates: t.Sequence[str], group_by: str='') -> dict:
+        """Return aggregates of numeric fields over the filtered, permission scoped, query.
+
+        Only the aggregates are computed and returned, in a single statement.
+
+        :param aggregates: list of function:field, e.g. ['sum:price', 'avg:price'].
+        :param group_by: field name or a date field and bucket, e.g. created_at:month.
+        :return: Payload with a list of aggregates, one item per group.
+        """
+        if not aggregates:
+            self._aggregate_error('_aggregate', 'At least one aggregate is required.')
+        query, query_params = self._get_records_query()
+        subquery = query.order_by(None).subquery()
+        allowed_fields = self.filter_allowed_fields
+        columns = [sa.func.count().label('count')]
+        for aggregate in aggregates:
+            func, _, field = aggregate.partition(':')
+            if func not in self.aggregate_functions:
+                functions = ', '.join(self.aggregate_functions)
+                self._aggregate_error('_aggregate', f'Aggregate must be one of: {functions}')
+            if field not in allowed_fields or field not in subquery.c:
+                self._aggregate_error('_aggregate', f'Unknown aggregate field \'{field}\'')
+            column = subquery.c[field]
+            if not _is_type(column, (sa.Integer, sa.Numeric)):
+                self._aggregate_error('_aggregate', f'Field \'{field}\' is not numeric')
+            columns.append(getattr(sa.func, func)(column).label(f'{func}_{field}'))
+
+        statement = sa.select(columns)
+        if group_by:
+            group = self._aggregate_group(subquery, group_by)
+            statement = sa.select([group] + columns).group_by(group).order_by(group)
+            statement = statement.limit(self.aggregate_groups_limit)
+        with self._capture_slow_queries(), self._statement_timeout(query.session):
+            with profiling.phase(self.request, 'query'):
+                rows = query.session.execute(statement).fetchall()
+        return {'aggregates': [dict(row.items()) for row in rows]}
+
     def get_column_from_key(self, query, key) -> t.Tuple[Query, ColumnProperty, str]:
         """Get a column and join based on a key.
 
@@ -310,19 +516,79 @@ class BaseResource:
 
         return query, column, field
 
+    def search_query(self, query: Query, fields: t.Sequence[str], terms: str) -> Query:
+        """Filter a query by a full-text search of the terms in any of the fields.
+
+        The relevance of each object is kept, to order results when no sorting was requested.
+
+        :param query: query to be filtered.
+        :param fields: names of the searched fields, all of them in search_fields.
+        :param terms: search terms.
+        :return: filtered query.
+        """
+        if not fields:
+            raise ValidationError(
+                message=f'{self.friendly_name} does not support full-text search',
+                location='querystring',
+                name='_q'
+            )
+        for field in fields:
+            if field not in self.search_fields:
+                raise ValidationError(
+                    message=f'Field \'{field}\' does not support full-text search',
+                    location='querystring',
+                    name=f'search_{field}'
+                )
+        config = self.search_config
+        columns = [getattr(self.model, field) for field in fields]
+        query = query.filter(sa.or_(*[text_search(column, terms, config) for column in columns]))
+        rank = text_rank(columns[0], terms, config)
+        for column in columns[1:]:
+            rank = rank + text_rank(column, terms, config)
+        self._search_rank = rank if self._search_rank is None else self._search_rank + rank
+        return query
+
+    def _parse_query_params(self, query_params: dict) -> filter.QueryParams:
+        """Parse filters, sorting and pagination, once per query parameters dictionary.
+
+        :param query_params: Dictionary containing query_params for a request.
+        :return: QueryParams with filters, sorting and pagination.
+        """
+        parsed = self._parsed_query_params
+        if parsed is None or parsed[0] is not query_params:
+            parsed = self._parsed_query_params = (
+                query_params,
+                filter.parse_query_params(
+                    query_params,
+                    self.filter_allowed_fields,
+                    self.default_order_by,
+                    self.default_order_direction,
+                    self.items_per_page
+                )
+            )
+        return parsed[1]
+
     def filter_query(self, query: Query, query_params: t.Optional[dict]=None) -> Query:
         """Apply request filters to a query."""
-        raw_filters = filter.create_filter_from_query_params(
-            query_params,
-            self.filter_allowed_fields
-        )
+        raw_filters = self._parse_query_params(query_params).filters
+        terms = (query_params or {}).get('_q', '').strip()
+        if terms:
+            query = self.search_query(query, self.search_fields, terms)
 
         for raw_filter in raw_filters:
+            if raw_filter.operator == filter.COMPARISON.SEARCH:
+                query = self.search_query(query, [raw_filter.field], raw_filter.value)
+                continue
             with_transformation = False
             mapper = None
             key = raw_filter.field
+            field_usage.record(self.model, FILTER, key)
             value = raw_filter.value
             op = raw_filter.operator.value
+            op_kwargs = {}
+            if raw_filter.operator in filter.PREFIX_OPERATORS:
+                op = filter.PREFIX_OPERATORS[raw_filter.operator]
+                op_kwargs['escape'] = LIKE_ESCAPE
             query, column, sub_key = self.get_column_from_key(query, key)
 
             if not column:
@@ -373,6 +639,13 @@ class BaseResource:
                         with_transformation = True
                     attrs = [getattr(column, name) for name in possible_names if
                              hasattr(column, name)]
+                    istartswith = raw_filter.operator == filter.COMPARISON.ISTARTSWITH
+                    if istartswith and not with_transformation:
+                        # lower(column) LIKE can use a lower(column) functional index
+                        attrs = [sa.func.lower(column).like]
+                    elif raw_filter.operator in filter.SET_OPERATORS and not with_transformation:
+                        negate = raw_filter.operator == filter.COMPARISON.EXCLUDE
+                        attrs = [partial(in_values, column, negate=negate)]
 
             # validate before try to create the filter
             if not attrs:
@@ -384,7 +657,8 @@ class BaseResource:
                 }
                 return self.raise_invalid(**error_details)
 
-            expression = attrs[0](value)
+            args = value if raw_filter.operator == filter.COMPARISON.BETWEEN else (value, )
+            expression = attrs[0](*args, **op_kwargs)
             is_proxy = isinstance(column, AssociationProxy)
             is_instrumented = isinstance(column, InstrumentedAttribute)
 
@@ -409,15 +683,14 @@ class BaseResource:
 
     def sort_query(self, query: Query, query_params: t.Optional[dict]=None) -> Query:
         """Apply request sorting to a query."""
-        raw_sorting = filter.create_sorting_from_query_params(
-            query_params,
-            self.filter_allowed_fields,
-            self.default_order_by,
-            self.default_order_direction
-        )
+        raw_sorting = self._parse_query_params(query_params).sorting
+        if self._search_rank is not None and not (query_params or {}).get('_sort'):
+            # most relevant first, the default sorting breaks ties
+            query = query.order_by(sa.desc(self._search_rank))
 
         for sorting in raw_sorting:
             key = sorting.field
+            field_usage.record(self.model, SORT, key)
             direction = sorting.direction
             func = sa.asc
             if direction == -1:
@@ -435,7 +708,7 @@ class BaseResource:
         """Execute the Query, return the paginated results."""
         if '_items_per_page' not in query_params:
             query_params['_items_per_page'] = str(self.items_per_page)
-        params = paginate.extract_pagination_from_query_params(query_params)
+        params = dict(self._parse_query_params(query_params).pagination)
         params['collection'] = query
         params['item_count'] = item_count if item_count else self.count_records(query)
         pagination = paginate.SQLPage(**params)
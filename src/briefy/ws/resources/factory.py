@@ -1,7 +1,12 @@
 """Context base factory for cornice resources."""
+from briefy.common.db.model import Base
+from briefy.ws.utils.cache import OBJECTS
+from briefy.ws.utils.cache import request_cache
 from briefy.ws.utils.validate import validate_uuid
+from collections import namedtuple
 from pyramid.authorization import Allow
 from pyramid.request import Request
+from pyramid.security import DENY_ALL
 
 import typing as t
 
@@ -12,11 +17,39 @@ ACL = t.Tuple[str, str, t.Sequence[str]]
 __base_admin_acl__ = [(Allow, 'g:briefy', ['list', 'view'])]
 
 
+ModelACL = namedtuple('ModelACL', ['acl', 'roles'])
+"""Precomputed ACL of a model class and the mapping of permission to roles."""
+
+
+_model_acls = {}
+
+
+def get_model_acl(model: type) -> ModelACL:
+    """Return the ACL and permission to roles index for a model class.
+
+    Both are computed only once per model class.
+
+    :param model: model class.
+    :return: ModelACL for the model class.
+    """
+    model_acl = _model_acls.get(model)
+    if model_acl is None:
+        acl = tuple([(Allow, role, permissions) for role, permissions in model.__acl__()])
+        roles = {}
+        for permission, acl_roles in model.__raw_acl__:
+            # as in the raw acl, only the first entry for a permission is considered
+            roles.setdefault(permission, frozenset(acl_roles))
+        model_acl = _model_acls[model] = ModelACL(acl, roles)
+    return model_acl
+
+
 class BaseFactory:
     """Base Factory that computes acl."""
 
     model = None
 
+    _acl = None
+
     def __init__(self, request: Request):
         """Initialize route factory.
 
@@ -36,8 +69,11 @@ class BaseFactory:
     def __acl__(self) -> t.Sequence[ACL]:
         """ACL for a factory.
 
+        The ACL is computed once, as the factory lives only during one request.
         :return: list of tuples containing the acl
         """
+        if self._acl is not None:
+            return self._acl
         permissions = []
         # ACL for admins
         permissions.extend(__base_admin_acl__)
@@ -47,6 +83,7 @@ class BaseFactory:
         permissions.extend(self.model_permissions)
         # Computed acl from workflow
         permissions.extend(self.workflow_permissions)
+        self._acl = permissions
         return permissions
 
     @property
@@ -55,7 +92,7 @@ class BaseFactory:
         model = self.model
         permissions = []
         if model:
-            permissions = [(Allow, role, permissions) for role, permissions in model.__acl__()]
+            permissions = get_model_acl(model).acl
         return permissions
 
     def has_global_permissions(self, permission: str, roles: t.Sequence[str]) -> bool:
@@ -63,15 +100,27 @@ class BaseFactory:
         model = self.model
         check = False
         if model:
-            raw_acl = self.model.__raw_acl__
-            for acl_permissions, acl_roles in raw_acl:
-                if acl_permissions == permission:
-                    for role in roles:
-                        if role in acl_roles:
-                            check = True
-                    break
+            acl_roles = get_model_acl(model).roles.get(permission)
+            check = bool(acl_roles) and not acl_roles.isdisjoint(roles)
         return check
 
+    @property
+    def context_object(self) -> t.Optional[Base]:
+        """Model instance for the current item route.
+
+        The instance is kept in the request cache to be reused by the resource.
+        :return: model instance or None if this is not an item route.
+        """
+        context_id = self.request.matchdict.get('id')
+        model = self.model
+        if not (model and validate_uuid(context_id)):
+            return None
+        cache = request_cache(self.request, OBJECTS)
+        key = (model, context_id)
+        if key not in cache:
+            cache[key] = model.get(context_id)
+        return cache[key]
+
     @property
     def workflow_permissions(self) -> t.Sequence[ACL]:
         """Compute ACLs from instance workflow.
@@ -79,12 +128,10 @@ class BaseFactory:
         :return: permissions from model instance using workflow object.
         """
         result = []
-        context_id = self.request.matchdict.get('id')
-        model = self.model
         user = self.request.user
 
-        if validate_uuid(context_id) and model and user:
-            context = model.get(context_id)
+        if user:
+            context = self.context_object
             if context and getattr(context, 'workflow', None):
                 wf = context.workflow
                 wf.context = user
@@ -92,3 +139,16 @@ class BaseFactory:
                 if permissions:
                     result.append((Allow, user.id, permissions))
         return result
+
+
+class DevopsFactory:
+    """Route factory for devops views, only available to briefy admins."""
+
+    __acl__ = [(Allow, 'g:briefy', 'devops'), DENY_ALL]
+
+    def __init__(self, request: Request):
+        """Initialize route factory.
+
+        :param request: pyramid request object.
+        """
+        self.request = request
@@ -1,13 +1,27 @@
 """Webservice base resource."""
 from briefy.common.db.model import Base
 from briefy.ws import logger
+from briefy.ws.errors import StatementTimeoutError
 from briefy.ws.errors import ValidationError
 from briefy.ws.resources import BaseResource
 from briefy.ws.resources import events
+from briefy.ws.utils import changes
+from briefy.ws.utils import conditional
 from briefy.ws.utils import data
+from briefy.ws.utils import profiling
 from cornice.resource import view
+from datetime import datetime
+from pyramid.response import Response
+from sqlalchemy.orm import ColumnProperty
 
 import colander
+import sqlalchemy as sa
+import transaction
+import typing as t
+
+
+_PARTIAL_SCHEMAS = {}
+"""Partial write schemas, per resource class, model and HTTP verb, cloned on each request."""
 
 
 class RESTService(BaseResource):
@@ -15,8 +29,33 @@ class RESTService(BaseResource):
 
     default_excludes = ['created_at', 'updated_at', 'state_history', 'state']
 
+    bulk_update_limit = 100
+    """Maximum number of objects that can be updated by a single collection_patch call."""
+
+    cache_write_schema = False
+    """Build the partial schemas used by PUT and PATCH only once per resource class and model.
+
+    Only enable this if ``schema_write`` does not depend on the current request or context.
+    """
+
+    conditional_get = True
+    """Return ETag headers and answer conditional GET requests with 304 Not Modified."""
+
+    etag_fields = ('updated_at', 'version')
+    """Model columns changed on every update of an object, missing ones are ignored."""
+
+    facets_limit = 10
+    """Maximum number of fields in a single _facets request."""
+
+    changes_max_limit = 500
+    """Maximum number of objects returned by a single _changes request."""
+
+    tombstone_states = ('deleted', )
+    """Workflow states of soft deleted objects, returned as tombstones by the changes feed."""
+
     _required_fields = (
         ('PUT', tuple()),
+        ('PATCH', tuple()),
     )
 
     _columns_map = ()
@@ -56,16 +95,225 @@ class RESTService(BaseResource):
         """Return the schema for POST requests."""
         return self.schema_write
 
+    def _partial_schema(self, method: str) -> colander.SchemaNode:
+        """Return the write schema with only the required fields for a method as mandatory.
+
+        :param method: HTTP verb used to get the required fields.
+        :return: A schema instance that can be changed by the caller.
+        """
+        key = (self.__class__, self.model, method)
+        schema = _PARTIAL_SCHEMAS.get(key) if self.cache_write_schema else None
+        if schema is None:
+            schema = self.schema_write
+            required_fields = self.get_required_fields(method)
+            for child in schema.children:
+                if child.title not in required_fields:
+                    child.missing = colander.drop
+                    child.default = colander.null
+            if not self.cache_write_schema:
+                return schema
+            _PARTIAL_SCHEMAS[key] = schema
+        return schema.clone()
+
     @property
     def schema_put(self) -> colander.SchemaNode:
         """Return the schema for PUT requests."""
-        schema = self.schema_write
-        required_fields = self.get_required_fields('PUT')
-        for child in schema.children:
-            if child.title not in required_fields:
-                child.missing = colander.drop
-                child.default = colander.null
-        return schema
+        return self._partial_schema('PUT')
+
+    @property
+    def schema_patch(self) -> colander.SchemaNode:
+        """Return the schema for PATCH requests.
+
+        For the collection route the payload is a mapping with a ``data`` list, each item
+        being a partial update that must contain the ``id`` of the object to be updated.
+        """
+        schema = self._partial_schema('PATCH')
+        if self.request.matchdict.get('id'):
+            return schema
+
+        id_node = schema.get('id')
+        if id_node is None:
+            id_node = colander.SchemaNode(colander.String(), name='id')
+            schema.add(id_node)
+        id_node.missing = colander.required
+        items = colander.SchemaNode(
+            colander.Sequence(),
+            schema,
+            name='data',
+            validator=colander.Length(min=1, max=self.bulk_update_limit)
+        )
+        return colander.SchemaNode(colander.Mapping(unknown='ignore'), items)
+
+    def _is_column(self, name: str) -> bool:
+        """Check if the model has a column with this name."""
+        attr = getattr(self.model, name, None)
+        return isinstance(getattr(attr, 'property', None), ColumnProperty)
+
+    def _etag_columns(self) -> t.List[sa.Column]:
+        """Return the model columns used to build item entity tags."""
+        if not self.conditional_get:
+            return []
+        return [getattr(self.model, name) for name in self.etag_fields if self._is_column(name)]
+
+    def _make_etag(self, *parts: t.Any) -> str:
+        """Return an entity tag for a representation served to the current user.
+
+        The resource, project version and user are part of the tag, so representations
+        are not shared between users and are invalidated by new releases.
+
+        :param parts: values identifying the representation.
+        :return: entity tag.
+        """
+        request = self.request
+        settings = getattr(request.registry, 'settings', None) or {}
+        version = settings.get('project_version')
+        user_id = getattr(request.user, 'id', None)
+        return conditional.make_etag(self._transaction_name, version, user_id, *parts)
+
+    def _is_conditional(self) -> bool:
+        """Check if the current request has conditional headers."""
+        headers = self.request.headers
+        return 'If-None-Match' in headers or 'If-Modified-Since' in headers
+
+    def _item_validators(
+            self,
+            id: str,
+            values: t.Sequence
+    ) -> t.Tuple[str, t.Optional[datetime]]:
+        """Return the entity tag and modification date of an object.
+
+        :param id: object id.
+        :param values: values of the etag columns of the object.
+        :return: tuple with entity tag and last modified date.
+        """
+        names = [column.key for column in self._etag_columns()]
+        last_modified = dict(zip(names, values)).get('updated_at')
+        return self._make_etag('item', str(id), *values), last_modified
+
+    def _collection_etag(self) -> t.Optional[str]:
+        """Return the entity tag of the current listing.
+
+        The tag is built from the query string, the number of matching objects and their
+        most recent update, both computed with a single aggregate query that also replaces
+        the count query of the listing.
+
+        :return: entity tag, None if the model has no updated_at column.
+        """
+        if not (self.conditional_get and self._is_column('updated_at')):
+            return None
+        query, query_params = self._get_records_query()
+        aggregate = query.order_by(None).from_self(
+            sa.func.max(self.model.updated_at), sa.func.count()
+        )
+        with self._capture_slow_queries(), self._statement_timeout(query.session):
+            with profiling.phase(self.request, 'query'):
+                last_modified, count = aggregate.one()
+        self._item_count = count
+        params = sorted(query_params.items())
+        return self._make_etag('collection', params, last_modified, count)
+
+    def get_changes(self, cursor: str) -> dict:
+        """Return objects changed after a cursor, in (updated_at, id) order.
+
+        Objects hidden by the default filters that are in one of the tombstone_states are
+        returned as tombstones, so clients can remove them. Filters in the query string are
+        not applied, only the _items_per_page parameter is used, up to changes_max_limit.
+
+        :param cursor: cursor returned by a previous call, empty to start from the beginning.
+        :return: Payload with changed objects, the cursor to resume from and if there are more.
+        """
+        model = self.model
+        if not self._is_column('updated_at'):
+            raise ValidationError(
+                message=f'Changes are not available for {self.friendly_name}.',
+                location='querystring',
+                name='_changes'
+            )
+        try:
+            position = changes.decode_cursor(cursor) if cursor else None
+            limit = int(self.request.GET.get('_items_per_page', self.items_per_page))
+        except ValueError as e:
+            raise ValidationError(message=str(e), location='querystring', name='_changes')
+        limit = min(max(limit, 1), self.changes_max_limit)
+
+        # same scope as the listing, see _get_records_query
+        query = self._get_base_query(permission='view')
+        query = changes.after_cursor(query, model.updated_at, model.id, position)
+        with self._statement_timeout(query.session), profiling.phase(self.request, 'query'):
+            objs = query.limit(limit + 1).all()
+        with profiling.phase(self.request, 'serialization'):
+            rows = {
+                (obj.updated_at, str(obj.id)): obj.to_listing_dict() for obj in objs
+            }
+
+        if self.tombstone_states and self._is_column('state'):
+            query = self._get_base_query(permission='view', apply_default_filters=False)
+            query = query.filter(model.state.in_(self.tombstone_states))
+            query = changes.after_cursor(query, model.updated_at, model.id, position)
+            query = query.with_entities(model.id, model.updated_at, model.state)
+            with self._statement_timeout(query.session):
+                with profiling.phase(self.request, 'query'):
+                    deleted = query.limit(limit + 1).all()
+            for id, updated_at, state in deleted:
+                rows.setdefault((updated_at, str(id)), {
+                    'id': id, 'updated_at': updated_at, 'state': state, '_deleted': True
+                })
+
+        keys = sorted(rows)
+        page = keys[:limit]
+        items = [rows[key] for key in page]
+        return {
+            'data': items,
+            'total': len(items),
+            'cursor': changes.encode_cursor(*page[-1]) if page else cursor,
+            'has_more': len(keys) > limit,
+        }
+
+    def get_facets(self, fields: t.Sequence[str]) -> dict:
+        """Return the number of objects per value of each field, for the current filters.
+
+        Counts of all fields are computed in a single statement, a UNION ALL of GROUP BY
+        queries over the filtered and permission scoped listing query.
+
+        :param fields: names of model columns allowed in filters.
+        :return: Payload with a list of values and counts per field, most frequent first.
+        """
+        if not fields or len(fields) > self.facets_limit:
+            raise ValidationError(
+                message=f'Between 1 and {self.facets_limit} facet fields are required.',
+                location='querystring',
+                name='_facets'
+            )
+        query, query_params = self._get_records_query()
+        subquery = query.order_by(None).subquery()
+        allowed_fields = self.filter_allowed_fields
+        selects = []
+        for field in fields:
+            if field not in allowed_fields or field not in subquery.c:
+                raise ValidationError(
+                    message=f'Unknown facet field \'{field}\'',
+                    location='querystring',
+                    name='_facets'
+                )
+            column = subquery.c[field]
+            selects.append(
+                sa.select([
+                    sa.literal(field).label('facet'),
+                    sa.cast(column, sa.String).label('value'),
+                    sa.func.count().label('count'),
+                ]).group_by(column)
+            )
+        statement = sa.union_all(*selects) if len(selects) > 1 else selects[0]
+        with self._capture_slow_queries(), self._statement_timeout(query.session):
+            with profiling.phase(self.request, 'query'):
+                rows = query.session.execute(statement).fetchall()
+
+        facets = {field: [] for field in fields}
+        for facet, value, count in rows:
+            facets[facet].append({'value': value, 'count': count})
+        for values in facets.values():
+            values.sort(key=lambda item: (-item['count'], item['value'] or ''))
+        return {'facets': facets}
 
     @view(validators='_run_validators', permission='create')
     def collection_post(self, model: Base=None) -> dict:
@@ -100,26 +348,55 @@ class RESTService(BaseResource):
         """Return the header with total objects for this request."""
         self.set_transaction_name('collection_head')
         headers = self.request.response.headers
-        total_records = self.count_records()
+        try:
+            total_records = self.count_records()
+        except StatementTimeoutError as e:
+            return self.raise_timeout(e)
         headers['Total-Records'] = '{total}'.format(total=total_records)
 
     @view(validators='_run_validators', permission='list')
     def collection_get(self) -> dict:
         """Return a list of objects.
 
+        With the _changes parameter, return the changes feed after the given cursor. With
+        the _facets parameter, a comma separated list of fields, return the number of
+        filtered objects per value of each field. With the _aggregate parameter, e.g.
+        sum:price,avg:price, and an optional _group_by, return only the aggregates.
+
         :returns: Payload with total records and list of objects
         """
         self.set_transaction_name('collection_get')
-        headers = self.request.response.headers
+        request = self.request
+        headers = request.response.headers
         try:
+            if '_changes' in request.GET:
+                return self.get_changes(request.GET['_changes'])
+            if '_facets' in request.GET:
+                fields = [field.strip() for field in request.GET['_facets'].split(',')]
+                return self.get_facets(list(dict.fromkeys([field for field in fields if field])))
+            if '_aggregate' in request.GET:
+                items = [item.strip() for item in request.GET['_aggregate'].split(',')]
+                return self.get_aggregates(
+                    list(dict.fromkeys([item for item in items if item])),
+                    request.GET.get('_group_by', '').strip()
+                )
+            etag = self._collection_etag()
+            if etag:
+                # deleted objects do not change the last modification date, only the etag
+                if conditional.is_not_modified(request, etag):
+                    return conditional.not_modified(etag)
+                conditional.set_validators(request.response, etag)
             pagination = self.get_records()
         except ValidationError as e:
             error_details = {'location': e.location, 'description': e.message, 'name': e.name}
             return self.raise_invalid(**error_details)
+        except StatementTimeoutError as e:
+            return self.raise_timeout(e)
 
         headers['Total-Records'] = str(self.count_records())
         # Force in here to use the listing serialization.
-        pagination['data'] = [o.to_listing_dict() for o in pagination['data']]
+        with profiling.phase(self.request, 'serialization'):
+            pagination['data'] = [o.to_listing_dict() for o in pagination['data']]
         # also append columns metadata if available
         columns_map = self._columns_map
         if columns_map:
@@ -127,17 +404,85 @@ class RESTService(BaseResource):
         return pagination
 
     @view(validators='_run_validators', permission='view')
-    def get(self) -> Base:
-        """Get an instance of the model object."""
+    def get(self) -> t.Union[Base, Response]:
+        """Get an instance of the model object.
+
+        Conditional requests are checked with a query for the etag columns only, so
+        unchanged objects are neither loaded nor serialized.
+        """
         self.set_transaction_name('get')
-        id = self.request.matchdict.get('id', '')
+        request = self.request
+        id = request.matchdict.get('id', '')
+        columns = self._etag_columns()
+        if columns and self._is_conditional():
+            query = self._get_base_query(permission='view').filter(self.model.id == id)
+            with profiling.phase(request, 'query'):
+                values = query.with_entities(*columns).one_or_none()
+            if values is not None:
+                etag, last_modified = self._item_validators(id, values)
+                if conditional.is_not_modified(request, etag, last_modified):
+                    return conditional.not_modified(etag, last_modified)
+
         obj = self.get_one(id, permission='view')
+        if columns:
+            values = [getattr(obj, column.key) for column in columns]
+            etag, last_modified = self._item_validators(id, values)
+            conditional.set_validators(request.response, etag, last_modified)
         return obj
 
     @view(validators='_run_validators', permission='edit')
-    def put(self) -> Base:
-        """Update an existing object."""
-        self.set_transaction_name('put')
+    def collection_patch(self) -> dict:
+        """Partially update a list of objects.
+
+        All objects are loaded with a single permission aware query, updated, flushed once
+        and only then the update events are dispatched.
+
+        :returns: Payload with the updated objects.
+        """
+        self.set_transaction_name('collection_patch')
+        model = self.model
+        items = self.request.validated['data']
+        payloads = {}
+        for item in items:
+            obj_id = str(item['id'])
+            if obj_id in payloads:
+                return self.raise_invalid(
+                    'body', 'data', f'Duplicate {self.friendly_name} id: {obj_id}'
+                )
+            # the id is only used to find the object, it is never updated
+            payloads[obj_id] = {key: value for key, value in item.items() if key != 'id'}
+
+        query = self._get_base_query(permission='edit')
+        objs = query.filter(model.id.in_(list(payloads))).all()
+        missing = set(payloads) - {str(obj.id) for obj in objs}
+        if missing:
+            ids = ', '.join(sorted(missing))
+            return self.raise_invalid('body', 'data', f'{self.friendly_name} not found: {ids}')
+
+        savepoint = transaction.savepoint()
+        for obj in objs:
+            try:
+                obj.update(payloads[str(obj.id)])
+            except ValidationError as e:
+                # do not keep changes already applied to other objects in this batch
+                savepoint.rollback()
+                error_details = {
+                    'location': e.location, 'description': e.message, 'name': f'data.{e.name}'
+                }
+                return self.raise_invalid(**error_details)
+            except Exception as e:
+                logger.exception(
+                    f'Error updating an instance {obj.id} of {obj.__class__.__name__}'
+                )
+                raise ValueError from e
+
+        self.session.flush()
+        for obj in objs:
+            self.notify_obj_event(obj, 'PUT')
+        return {'data': objs, 'total': len(objs)}
+
+    def _update_one(self) -> Base:
+        """Update the object from the current route with the validated payload."""
         id = self.request.matchdict.get('id', '')
         obj = self.get_one(id, permission='edit')
         try:
@@ -150,9 +495,22 @@ class RESTService(BaseResource):
             raise ValueError from e
         else:
             self.session.flush()
+            # subscribers handle a partial update as any other update
             self.notify_obj_event(obj, 'PUT')
             return obj
 
+    @view(validators='_run_validators', permission='edit')
+    def put(self) -> Base:
+        """Update an existing object."""
+        self.set_transaction_name('put')
+        return self._update_one()
+
+    @view(validators='_run_validators', permission='edit')
+    def patch(self) -> Base:
+        """Partially update an existing object."""
+        self.set_transaction_name('patch')
+        return self._update_one()
+
     @view(permission='delete')
     def delete(self) -> Base:
         """Soft delete an object if there is an appropriated transition for it."""
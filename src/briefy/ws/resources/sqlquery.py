@@ -1,4 +1,5 @@
 """Webservice to return a paginate collection based in a custom query."""
+from briefy.ws.errors import StatementTimeoutError
 from briefy.ws.resources import BaseResource
 from briefy.ws.utils import paginate
 from cornice.resource import view
@@ -51,7 +52,11 @@ class SQLQueryService(BaseResource):
         db = self.request.db
         query = self._collection_query
         query = self.query_params(query)
-        result = db.execute(query)
+        try:
+            with self._statement_timeout(db):
+                result = db.execute(query)
+        except StatementTimeoutError as e:
+            return self.raise_timeout(e)
 
         data_set = []
         data_keys = list(enumerate(result.keys()))
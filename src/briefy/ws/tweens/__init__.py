@@ -0,0 +1 @@
+"""Pyramid tweens for briefy.ws."""
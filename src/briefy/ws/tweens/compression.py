@@ -0,0 +1,127 @@
+"""Tween to compress responses."""
+from briefy.ws.config import COMPRESSION_LEVEL
+from briefy.ws.config import COMPRESSION_MIN_SIZE
+from briefy.ws.config import COMPRESSION_TYPES
+from pyramid.registry import Registry
+from pyramid.request import Request
+from pyramid.response import Response
+
+import gzip
+import typing as t
+import zlib
+
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def _brotli(body: bytes, level: int) -> bytes:
+    """Compress with brotli, mapping levels 1-9 to brotli quality 1-11."""
+    quality = min(11, max(0, round(level * 11 / 9)))
+    return brotli.compress(body, quality=quality)
+
+
+def _deflate(body: bytes, level: int) -> bytes:
+    """Compress with zlib, as expected by the deflate content coding."""
+    return zlib.compress(body, level)
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    """Compress with gzip."""
+    return gzip.compress(body, compresslevel=level)
+
+
+ENCODERS = {
+    'gzip': _gzip,
+    'deflate': _deflate,
+}
+"""Available content codings and their functions, in order of preference."""
+
+if brotli is not None:
+    ENCODERS = {'br': _brotli, **ENCODERS}
+
+
+def choose_encoding(accept_encoding: str, available: t.Sequence[str]) -> t.Optional[str]:
+    """Choose a content coding accepted by the client.
+
+    :param accept_encoding: value of the Accept-Encoding header.
+    :param available: content codings supported by the server, in order of preference.
+    :return: the content coding with the highest quality, None for identity.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, *params = [value.strip() for value in item.split(';')]
+        coding = coding.lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            if param.lower().startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    default = qualities.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = qualities.get(coding, default)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _is_compressible(request: Request, response: Response, types: t.Sequence[str]) -> bool:
+    """Check if the response can be compressed."""
+    if request.method == 'HEAD' or response.status_int in (204, 206, 304):
+        return False
+    if response.content_encoding or response.content_type not in types:
+        return False
+    cache_control = response.headers.get('Cache-Control', '')
+    return 'no-transform' not in cache_control
+
+
+def compression_tween_factory(handler: t.Callable, registry: Registry) -> t.Callable:
+    """Tween compressing responses with gzip, deflate or brotli (if installed).
+
+    Only responses with one of the COMPRESSION_TYPES content types and bodies of at least
+    COMPRESSION_MIN_SIZE bytes are compressed, with the COMPRESSION_LEVEL level (1-9).
+    Strong entity tags become weak, as the representation changes with the encoding.
+
+    :param handler: next handler in the chain.
+    :param registry: application registry.
+    :return: tween function.
+    """
+    level = int(COMPRESSION_LEVEL)
+    min_size = int(COMPRESSION_MIN_SIZE)
+    types = tuple([value.strip() for value in COMPRESSION_TYPES.split(',') if value.strip()])
+    available = tuple(ENCODERS)
+
+    def compression_tween(request: Request) -> Response:
+        response = handler(request)
+        if not _is_compressible(request, response, types):
+            return response
+
+        vary = list(response.vary or ())
+        if 'Accept-Encoding' not in vary:
+            response.vary = vary + ['Accept-Encoding']
+
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        encoding = choose_encoding(accept_encoding, available) if accept_encoding else None
+        if encoding is None:
+            return response
+        body = response.body
+        if len(body) < min_size:
+            return response
+
+        response.body = ENCODERS[encoding](body, level)
+        response.content_encoding = encoding
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response.headers['ETag'] = f'W/{etag}'
+        return response
+
+    return compression_tween
@@ -0,0 +1,59 @@
+"""Tween to record request metrics."""
+from briefy.ws.db import stats
+from briefy.ws.utils import metrics
+from pyramid.registry import Registry
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.threadlocal import get_current_request
+
+import time
+import typing as t
+
+
+UNMATCHED = 'unmatched'
+"""Resource label of requests not matching any route."""
+
+
+def get_resource(request: Request) -> str:
+    """Return the resource label of a request: the name of the matched route."""
+    route = getattr(request, 'matched_route', None)
+    return route.name if route else UNMATCHED
+
+
+def observe_statement(conn, statement, parameters, executemany, duration: float):
+    """Statement observer recording the duration of statements of the current request."""
+    request = get_current_request()
+    if request is not None:
+        metrics.DB_STATEMENT_DURATION.observe(duration, resource=get_resource(request))
+
+
+def metrics_tween_factory(handler: t.Callable, registry: Registry) -> t.Callable:
+    """Tween recording latency of requests and duration of their SQL statements.
+
+    Metrics are labeled with the resource, the name of the matched route, so latency
+    histograms are available per resource and HTTP method.
+
+    :param handler: next handler in the chain.
+    :param registry: application registry.
+    :return: tween function.
+    """
+    stats.install()
+    if observe_statement not in stats.statement_observers:
+        stats.statement_observers.append(observe_statement)
+
+    def metrics_tween(request: Request) -> Response:
+        start_time = time.perf_counter()
+        status = 500
+        try:
+            response = handler(request)
+            status = response.status_int
+        finally:
+            metrics.REQUEST_DURATION.observe(
+                time.perf_counter() - start_time,
+                resource=get_resource(request),
+                method=request.method,
+                status=status,
+            )
+        return response
+
+    return metrics_tween
@@ -0,0 +1,83 @@
+"""Tween to profile individual requests on demand."""
+from briefy.ws.config import PROFILING_BUFFER_SIZE
+from briefy.ws.config import PROFILING_STATS_LIMIT
+from briefy.ws.utils import profiling
+from datetime import datetime
+from datetime import timezone
+from pyramid.registry import Registry
+from pyramid.request import Request
+from pyramid.response import Response
+
+import cProfile
+import io
+import pstats
+import time
+import typing as t
+import uuid
+
+
+ADMIN_GROUP = 'g:briefy'
+
+profiles = profiling.ProfileStore(int(PROFILING_BUFFER_SIZE))
+"""Profiles of this process."""
+
+
+def can_profile(request: Request) -> bool:
+    """Check if the request asked to be profiled and comes from a briefy admin."""
+    if profiling.PROFILE_HEADER not in request.headers:
+        return False
+    user = request.user
+    return bool(user) and ADMIN_GROUP in user.groups
+
+
+def profiler_tween_factory(handler: t.Callable, registry: Registry) -> t.Callable:
+    """Tween running requests with the X-Briefy-Profile header under cProfile.
+
+    Only requests authenticated with a briefy admin token are profiled. The profile, with
+    the time spent in each phase of the request, is stored and its id returned in the
+    X-Briefy-Profile-Id header; phases are also returned as Server-Timing headers.
+
+    :param handler: next handler in the chain.
+    :param registry: application registry.
+    :return: tween function.
+    """
+    stats_limit = int(PROFILING_STATS_LIMIT)
+
+    def profiler_tween(request: Request) -> Response:
+        if not can_profile(request):
+            return handler(request)
+
+        phases = profiling.enable_phases(request)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = handler(request)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+
+        sort_by = request.headers[profiling.PROFILE_HEADER] or 'cumulative'
+        if sort_by not in ('cumulative', 'time', 'calls'):
+            sort_by = 'cumulative'
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(sort_by).print_stats(stats_limit)
+
+        profile_id = str(uuid.uuid4())
+        profiles.add({
+            'id': profile_id,
+            'method': request.method,
+            'url': request.url,
+            'user': request.user.id,
+            'status': response.status_int,
+            'timestamp': datetime.now(timezone.utc),
+            'duration': round(elapsed * 1000, 2),
+            'phases': {name: round(value * 1000, 2) for name, value in phases.items()},
+            'stats': stream.getvalue(),
+        })
+        response.headers[profiling.PROFILE_ID_HEADER] = profile_id
+        for name, value in phases.items():
+            response.headers.add('Server-Timing', f'{name};dur={value * 1000:.2f}')
+        return response
+
+    return profiler_tween
@@ -0,0 +1,58 @@
+"""Tween to report SQL statements statistics per request."""
+from briefy.ws import logger
+from briefy.ws.config import SQL_STATS_QUERY_BUDGET
+from briefy.ws.config import SQL_STATS_TIME_BUDGET
+from briefy.ws.db import stats
+from briefy.ws.utils import instrumentation
+from pyramid.registry import Registry
+from pyramid.request import Request
+from pyramid.response import Response
+
+import time
+import typing as t
+
+
+def sqlstats_tween_factory(handler: t.Callable, registry: Registry) -> t.Callable:
+    """Tween counting statements, rows and database time of each request.
+
+    Statistics are returned in the Server-Timing header, recorded as New Relic custom
+    metrics and requests over the query count or latency budgets are logged.
+
+    :param handler: next handler in the chain.
+    :param registry: application registry.
+    :return: tween function.
+    """
+    query_budget = int(SQL_STATS_QUERY_BUDGET)
+    time_budget = float(SQL_STATS_TIME_BUDGET) / 1000
+    stats.install()
+
+    def sqlstats_tween(request: Request) -> Response:
+        start_time = time.perf_counter()
+        sql = stats.start()
+        try:
+            response = handler(request)
+        finally:
+            stats.stop()
+        elapsed = time.perf_counter() - start_time
+
+        response.headers.add('Server-Timing', sql.server_timing())
+        response.headers.add('Server-Timing', f'app;dur={elapsed * 1000:.2f}')
+        instrumentation.record_custom_metric('Custom/Database/Statements', sql.statements)
+        instrumentation.record_custom_metric('Custom/Database/Rows', sql.rows)
+        instrumentation.record_custom_metric('Custom/Database/Duration', sql.duration)
+
+        if sql.statements > query_budget or elapsed > time_budget:
+            logger.warning(
+                f'Request over budget: {request.method} {request.path} '
+                f'took {elapsed * 1000:.0f}ms with {sql.statements} statements '
+                f'({sql.duration * 1000:.0f}ms, {sql.rows} rows)',
+                extra={
+                    'statements': sql.statements,
+                    'rows': sql.rows,
+                    'db_duration': sql.duration,
+                    'duration': elapsed,
+                }
+            )
+        return response
+
+    return sqlstats_tween
@@ -0,0 +1,106 @@
+"""Cache utilities for briefy.ws."""
+from briefy.ws.utils import metrics
+from collections import OrderedDict
+from pyramid.request import Request
+
+import threading
+import time
+import typing as t
+
+
+OBJECTS = 'objects'
+"""Namespace for model instances loaded during a request."""
+
+
+def request_cache(request: Request, namespace: str) -> dict:
+    """Return a dictionary to cache values during the lifetime of a request.
+
+    The same dictionary is returned for every call with the same request and namespace, so
+    it can be shared by route factories, resources and validators.
+
+    :param request: pyramid request object.
+    :param namespace: Name of the cache.
+    :return: Dictionary used as cache.
+    """
+    caches = getattr(request, '_briefy_cache', None)
+    if caches is None:
+        caches = {}
+        request._briefy_cache = caches
+    return caches.setdefault(namespace, {})
+
+
+class TimeoutLRUCache:
+    """Thread safe, size bounded, cache where every entry expires.
+
+    When full, the least recently used entry is discarded. Lookups of named caches are
+    recorded in the briefy_ws_cache_requests_total metric.
+    """
+
+    hits = 0
+    misses = 0
+
+    def __init__(self, maxsize: int, ttl: float, name: str=''):
+        """Initialize the cache.
+
+        :param maxsize: Maximum number of entries.
+        :param ttl: Default time to live, in seconds, of an entry.
+        :param name: Name of the cache in metrics, lookups are not recorded if empty.
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of entries in the cache, including expired ones."""
+        return len(self._data)
+
+    def get(self, key: t.Hashable, default: t.Any=None) -> t.Any:
+        """Return the value for a key, if it exists and did not expire.
+
+        :param key: key of the entry.
+        :param default: value returned if key is not in the cache.
+        :return: cached value or default.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.time() < expires_at:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    self._record('hit')
+                    return value
+                del self._data[key]
+            self.misses += 1
+            self._record('miss')
+            return default
+
+    def _record(self, result: str):
+        """Record a lookup in the cache metrics.
+
+        :param result: hit or miss.
+        """
+        if self.name:
+            metrics.CACHE_REQUESTS.inc(cache=self.name, result=result)
+
+    def set(self, key: t.Hashable, value: t.Any, expires_at: t.Optional[float]=None):
+        """Add a value to the cache.
+
+        :param key: key of the entry.
+        :param value: value to be cached.
+        :param expires_at: timestamp when the entry expires, capped by the default ttl.
+        """
+        max_expires_at = time.time() + self.ttl
+        expires_at = min(expires_at, max_expires_at) if expires_at else max_expires_at
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._data.clear()
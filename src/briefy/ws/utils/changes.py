@@ -0,0 +1,75 @@
+"""Changes feed utilities for briefy.ws.
+
+Objects are returned in (updated_at, id) order and a cursor holds the position of the last
+returned object, so a client can resume syncing from it.
+"""
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from sqlalchemy.orm import Query
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+import base64
+import sqlalchemy as sa
+import typing as t
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(updated_at: datetime, id: str) -> str:
+    """Return an opaque cursor for a position in the changes feed.
+
+    :param updated_at: modification date of the last returned object, naive dates are UTC.
+    :param id: id of the last returned object.
+    :return: url safe cursor.
+    """
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    delta = updated_at - EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    value = f'{micros}:{id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(value).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> t.Tuple[datetime, str]:
+    """Return the position in the changes feed of a cursor.
+
+    :param cursor: value returned by encode_cursor.
+    :return: tuple with modification date, in UTC, and id.
+    :raises ValueError: if the cursor is not valid.
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        value = base64.urlsafe_b64decode(cursor + padding).decode('utf-8')
+        micros, id = value.split(':', 1)
+        updated_at = EPOCH + timedelta(microseconds=int(micros))
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise ValueError(f'Invalid cursor: {cursor}') from exc
+    if not id:
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return updated_at, id
+
+
+def after_cursor(
+        query: Query,
+        updated_at: InstrumentedAttribute,
+        id: InstrumentedAttribute,
+        position: t.Optional[t.Tuple[datetime, str]]
+) -> Query:
+    """Filter and order a query to return objects after a position in the changes feed.
+
+    :param query: query to be filtered.
+    :param updated_at: modification date column.
+    :param id: id column.
+    :param position: tuple with modification date and id, None to start from the beginning.
+    :return: filtered and ordered query.
+    """
+    if position:
+        date, last_id = position
+        if not getattr(updated_at.type, 'timezone', False):
+            date = date.replace(tzinfo=None)
+        query = query.filter(
+            sa.or_(updated_at > date, sa.and_(updated_at == date, id > last_id))
+        )
+    return query.order_by(None).order_by(updated_at, id)
@@ -0,0 +1,72 @@
+"""Circuit breaker for calls to internal services."""
+import threading
+import time
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Stop calling a service after consecutive failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls are not
+    allowed. Once ``reset_timeout`` seconds have passed one trial call is allowed
+    (half open) and the timeout starts again: the circuit closes if the trial succeeds
+    and stays open if it fails.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        """Initialize the circuit breaker.
+
+        :param name: name of the service.
+        :param failure_threshold: number of consecutive failures to open the circuit.
+        :param reset_timeout: seconds to wait before allowing a trial call.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state of the circuit: closed, open or half_open."""
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """Check if a call to the service can be made now."""
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit if the threshold was reached."""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def info(self) -> dict:
+        """Return state information of the circuit."""
+        return {
+            'state': self.state,
+            'failures': self.failures,
+        }
@@ -0,0 +1,111 @@
+"""Conditional requests (ETag and Last-Modified) utilities for briefy.ws."""
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.request import Request
+from pyramid.response import Response
+
+import hashlib
+import typing as t
+
+
+def make_etag(*parts: t.Any) -> str:
+    """Return an entity tag for a list of values.
+
+    :param parts: values identifying a representation, they must have a stable repr.
+    :return: hex digest, to be used as a strong ETag.
+    """
+    value = '\x1f'.join([repr(part) for part in parts])
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+def _as_utc(value: t.Optional[datetime]) -> t.Optional[datetime]:
+    """Return a timezone aware datetime, naive values are considered to be in UTC."""
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Check if an If-None-Match header matches an entity tag, using weak comparison.
+
+    :param header: value of the If-None-Match header.
+    :param etag: current entity tag.
+    :return: True if the header matches the entity tag.
+    """
+    if header.strip() == '*':
+        return True
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag.strip('"') == etag:
+            return True
+    return False
+
+
+def parse_http_date(value: str) -> t.Optional[datetime]:
+    """Parse an HTTP date, returning None for invalid values."""
+    try:
+        return _as_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def is_not_modified(
+        request: Request,
+        etag: str,
+        last_modified: t.Optional[datetime]=None
+) -> bool:
+    """Check if the representation known by the client is still current.
+
+    If-None-Match takes precedence over If-Modified-Since, as defined in RFC 7232.
+
+    :param request: pyramid request object.
+    :param etag: current entity tag.
+    :param last_modified: current modification date.
+    :return: True if a 304 response should be returned.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    headers = request.headers
+    if 'If-None-Match' in headers:
+        return etag_matches(headers['If-None-Match'], etag)
+    if_modified_since = parse_http_date(headers.get('If-Modified-Since', ''))
+    if if_modified_since and last_modified:
+        # Last-Modified has a precision of seconds
+        last_modified = _as_utc(last_modified).replace(microsecond=0)
+        return last_modified <= if_modified_since
+    return False
+
+
+def set_validators(
+        response: Response,
+        etag: str,
+        last_modified: t.Optional[datetime]=None
+):
+    """Set ETag, Last-Modified and Vary headers in a response.
+
+    :param response: pyramid response object.
+    :param etag: current entity tag.
+    :param last_modified: current modification date.
+    """
+    response.etag = etag
+    if last_modified:
+        response.last_modified = _as_utc(last_modified)
+    vary = list(response.vary or ())
+    if 'Authorization' not in vary:
+        response.vary = vary + ['Authorization']
+
+
+def not_modified(etag: str, last_modified: t.Optional[datetime]=None) -> HTTPNotModified:
+    """Return a 304 response with the current validators.
+
+    :param etag: current entity tag.
+    :param last_modified: current modification date.
+    :return: Not Modified response.
+    """
+    response = HTTPNotModified()
+    set_validators(response, etag, last_modified)
+    return response
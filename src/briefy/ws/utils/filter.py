@@ -1,4 +1,6 @@
 """Filter and Sorting utilities to be used for REST Services."""
+from briefy.ws.config import FILTER_MAX_VALUES
+from briefy.ws.db.functions import escape_like
 from briefy.ws.errors import ValidationError
 from briefy.ws.utils import data
 from collections import namedtuple
@@ -18,6 +20,10 @@ Sort = namedtuple('Sort', ['field', 'direction'])
 """Sorting properties."""
 
 
+QueryParams = namedtuple('QueryParams', ['filters', 'sorting', 'pagination'])
+"""Filters, sorting and pagination of a request."""
+
+
 class COMPARISON(Enum):
     """Comparision enum.
 
@@ -34,6 +40,180 @@ class COMPARISON(Enum):
     LIKE = 'like'
     ILIKE = 'ilike'
     EXCLUDE = 'notin_'
+    SEARCH = 'search'
+    STARTSWITH = 'startswith'
+    ISTARTSWITH = 'istartswith'
+    BETWEEN = 'between'
+
+
+PREFIX_OPERATORS = {
+    COMPARISON.STARTSWITH: 'like',
+    COMPARISON.ISTARTSWITH: 'ilike',
+}
+"""Prefix operators and the column operator matching their escaped LIKE pattern."""
+
+SET_OPERATORS = (COMPARISON.IN, COMPARISON.EXCLUDE)
+"""Operators over a list of comma separated values."""
+
+OPERATORS = {
+    'min': COMPARISON.MIN,
+    'max': COMPARISON.MAX,
+    'not': COMPARISON.NOT,
+    'lt': COMPARISON.LT,
+    'gt': COMPARISON.GT,
+    'in': COMPARISON.IN,
+    'exclude': COMPARISON.EXCLUDE,
+    'like': COMPARISON.LIKE,
+    'ilike': COMPARISON.ILIKE,
+    'search': COMPARISON.SEARCH,
+    'startswith': COMPARISON.STARTSWITH,
+    'istartswith': COMPARISON.ISTARTSWITH,
+    'between': COMPARISON.BETWEEN,
+}
+"""Filter parameter prefixes, e.g. min_ in min_price, and their operators."""
+
+UPDATED_AT_FILTERS = {
+    '_since': COMPARISON.GT,
+    '_to': COMPARISON.MAX,
+    '_before': COMPARISON.LT,
+}
+"""Parameters filtering updated_at by a timestamp."""
+
+PAGINATION = {
+    '_page': 'page',
+    '_items_per_page': 'items_per_page',
+}
+"""Pagination parameters and their names in the pagination dictionary."""
+
+_FIELD = re.compile(r'^[\.\w]+$')
+_SORT_FIELD = re.compile(r'^([\-+]?)([\.\w]+)$')
+
+
+def _parse_filter(
+        param: str,
+        param_value: str,
+        allowed_fields: t.Container[str]
+) -> t.Optional[Filter]:
+    """Return the Filter of a query parameter.
+
+    :param param: parameter name, e.g. min_price.
+    :param param_value: parameter value.
+    :param allowed_fields: fields that support filtering.
+    :return: Filter object, or None for empty searches.
+    """
+    if param in UPDATED_AT_FILTERS:
+        try:
+            value = int(param_value)
+        except ValueError:
+            raise ValueError(f'Parameter "{param}" is not a valid integer.')
+        return Filter(UPDATED_AT, value, UPDATED_AT_FILTERS[param])
+
+    keyword, _, field = param.partition('_')
+    operator = OPERATORS.get(keyword)
+    if operator is None or not _FIELD.match(field):
+        operator, field = COMPARISON.EQ, param
+
+    if field not in allowed_fields:
+        raise ValidationError(
+            message=f'Unknown filter field \'{field}\'',
+            location='querystring',
+            name=field
+        )
+
+    if operator == COMPARISON.SEARCH:
+        # search terms are never converted to native values
+        value = param_value.strip()
+        return Filter(field, value, operator) if value else None
+    elif operator in PREFIX_OPERATORS:
+        # 'abc%' patterns, without a leading wildcard, can use btree indexes
+        value = param_value.lower() if operator == COMPARISON.ISTARTSWITH else param_value
+        value = f'{escape_like(value)}%'
+    elif operator in SET_OPERATORS:
+        value = set([data.native_value(v, field) for v in param_value.split(',')])
+        max_values = int(FILTER_MAX_VALUES)
+        if len(value) > max_values:
+            raise ValidationError(
+                message=f'Filter \'{param}\' accepts at most {max_values} values',
+                location='querystring',
+                name=field
+            )
+    elif operator == COMPARISON.BETWEEN:
+        value = tuple([data.native_value(v.strip(), field) for v in param_value.split(',')])
+        if len(value) != 2:
+            raise ValidationError(
+                message=f'Filter \'{param}\' requires two comma separated values',
+                location='querystring',
+                name=field
+            )
+    else:
+        value = data.native_value(param_value, field)
+        if operator in (COMPARISON.LIKE, COMPARISON.ILIKE, ):
+            value = value.replace('%', '')
+            value = f'%{value}%'
+    return Filter(field, value, operator)
+
+
+def _parse_sorting(param_value: str, allowed_fields: t.Container[str]) -> t.List[Sort]:
+    """Return the Sort objects of a _sort parameter.
+
+    :param param_value: comma separated field names, prefixed by - for descending order.
+    :param allowed_fields: fields that support sorting.
+    :return: list of Sort objects.
+    """
+    sorting = []
+    for field in param_value.split(','):
+        m = _SORT_FIELD.match(field.strip())
+        if m:
+            order, field = m.groups()
+            if field not in allowed_fields:
+                raise ValidationError(
+                    message=f'Unknown sort field \'{field}\'',
+                    location='querystring',
+                    name=field
+                )
+            direction = -1 if order == '-' else 1
+            sorting.append(Sort(field, direction))
+    return sorting
+
+
+def parse_query_params(
+        query_params: dict,
+        allowed_fields: t.Iterable[str],
+        default: str='',
+        default_direction: int=1,
+        items_per_page: int=25
+) -> QueryParams:
+    """Process a query parameters dictionary into filters, sorting and pagination, in one pass.
+
+    :param query_params: Dictionary containing query_params for a request.
+    :param allowed_fields: List of fields that support filtering and sorting.
+    :param default: Default field for sorting.
+    :param default_direction: Default direction for sorting.
+    :param items_per_page: Default number of items per page.
+    :return: QueryParams with lists of Filter and Sort objects and the pagination dictionary.
+    """
+    allowed_fields = frozenset(allowed_fields)
+    filters = []
+    sorting = []
+    pagination = {'page': 1, 'items_per_page': items_per_page}
+    for param, param_value in query_params.items():
+        param = param.strip()
+        if param == '_sort':
+            sorting = _parse_sorting(param_value, allowed_fields)
+        elif param in PAGINATION:
+            try:
+                value = int(param_value)
+            except ValueError:
+                continue
+            if value > 0:
+                pagination[PAGINATION[param]] = value
+        elif not param.startswith('_') or param in UPDATED_AT_FILTERS:
+            item = _parse_filter(param, param_value, allowed_fields)
+            if item:
+                filters.append(item)
+    if not sorting and (default and default_direction):
+        sorting.append(Sort(default, default_direction))
+    return QueryParams(filters, sorting, pagination)
 
 
 def create_filter_from_query_params(
@@ -46,53 +226,18 @@ def create_filter_from_query_params(
     :param allowed_fields: List of fields that support sorting.
     :return: list of Filter objects.
     """
+    allowed_fields = frozenset(allowed_fields)
     filters = []
     for param, param_value in query_params.items():
         param = param.strip()
 
         # Ignore specific fields
-        if param.startswith('_') and param not in ('_since', '_to', '_before'):
-            continue
-
-        # Handle the _since specific filter.
-        if param in ('_since', '_to', '_before'):
-            try:
-                value = int(param_value)
-            except ValueError as exc:
-                raise ValueError(f'Parameter "{param}" is not a valid integer.')
-
-            operators = {
-                '_since': COMPARISON.GT,
-                '_to': COMPARISON.MAX,
-                '_before': COMPARISON.LT,
-            }
-
-            operator = operators[param]
-
-            filters.append(Filter(UPDATED_AT, value, operator))
+        if param.startswith('_') and param not in UPDATED_AT_FILTERS:
             continue
 
-        m = re.match(r'^(min|max|not|lt|gt|in|exclude|like|ilike)_([\.\w]+)$', param)
-        if m:
-            keyword, field = m.groups()
-            operator = getattr(COMPARISON, keyword.upper())
-        else:
-            operator, field = COMPARISON.EQ, param
-
-        if field not in allowed_fields:
-            raise ValidationError(
-                message=f'Unknown filter field \'{field}\'',
-                location='querystring',
-                name=field
-            )
-
-        value = data.native_value(param_value, field)
-        if operator in (COMPARISON.IN, COMPARISON.EXCLUDE):
-            value = set([data.native_value(v, field) for v in param_value.split(',')])
-        elif operator in (COMPARISON.LIKE, COMPARISON.ILIKE, ):
-            value = value.replace('%', '')
-            value = f'%{value}%'
-        filters.append(Filter(field, value, operator))
+        item = _parse_filter(param, param_value, allowed_fields)
+        if item:
+            filters.append(item)
     return filters
 
 
@@ -109,21 +254,7 @@ def create_sorting_from_query_params(
     :param default_direction: Default direction for sorting.
     :return: list of Sort objects.
     """
-    specified = query_params.get('_sort', '').split(',')
-    sorting = []
-    for field in specified:
-        field = field.strip()
-        m = re.match(r'^([\-+]?)([\.\w]+)$', field)
-        if m:
-            order, field = m.groups()
-            if field not in allowed_fields:
-                raise ValidationError(
-                    message=f'Unknown sort field \'{field}\'',
-                    location='querystring',
-                    name=field
-                )
-            direction = -1 if order == '-' else 1
-            sorting.append(Sort(field, direction))
+    sorting = _parse_sorting(query_params.get('_sort', ''), frozenset(allowed_fields))
     if not sorting and (default and default_direction):
         sorting.append(Sort(default, default_direction))
     return sorting
@@ -0,0 +1,90 @@
+"""New Relic instrumentation for briefy.ws.
+
+The New Relic agent is optional: if it is not installed, or the instrumentation level is
+``off``, all functions in this module are no-ops.
+"""
+from briefy.common.log import logger
+from briefy.ws.config import NEWRELIC_INSTRUMENTATION
+from briefy.ws.config import NEWRELIC_USER_CLAIMS
+
+import typing as t
+
+
+try:
+    import newrelic.agent as agent
+except ImportError:  # pragma: no cover
+    agent = None
+
+
+OFF = 'off'
+MINIMAL = 'minimal'
+FULL = 'full'
+LEVELS = (OFF, MINIMAL, FULL)
+
+
+def _get_level(value: str) -> str:
+    """Return the instrumentation level to be used.
+
+    :param value: configured level.
+    :return: one of the LEVELS.
+    """
+    if agent is None:
+        return OFF
+    level = value.strip().lower()
+    if level not in LEVELS:
+        logger.warning(f'Invalid NEWRELIC_INSTRUMENTATION value "{value}", using {MINIMAL}.')
+        level = MINIMAL
+    return level
+
+
+LEVEL = _get_level(NEWRELIC_INSTRUMENTATION)
+"""Current instrumentation level."""
+
+USER_CLAIMS = tuple([claim.strip() for claim in NEWRELIC_USER_CLAIMS.split(',') if claim.strip()])
+"""JWT claims recorded as custom parameters in the full level."""
+
+
+def set_transaction_name(name: str, group: str='WebService'):
+    """Set the name of the current New Relic transaction.
+
+    :param name: transaction name.
+    :param group: transaction group.
+    """
+    if LEVEL != OFF:
+        agent.set_transaction_name(name, group)
+
+
+def add_custom_parameter(key: str, value: t.Any):
+    """Add a custom parameter to the current New Relic transaction.
+
+    :param key: parameter name.
+    :param value: parameter value.
+    """
+    if LEVEL != OFF:
+        agent.add_custom_parameter(key, value)
+
+
+def record_custom_metric(name: str, value: t.Union[int, float]):
+    """Record a custom metric value in New Relic.
+
+    :param name: metric name, should start with ``Custom/``.
+    :param value: metric value.
+    """
+    if LEVEL != OFF:
+        agent.record_custom_metric(name, value)
+
+
+def record_user(user_id: str, claims: dict):
+    """Record the authenticated user in the current New Relic transaction.
+
+    :param user_id: id of the authenticated user.
+    :param claims: JWT claims of the authenticated user.
+    """
+    if LEVEL == OFF:
+        return
+    agent.add_custom_parameter('user_id', user_id)
+    if LEVEL == FULL:
+        keys = claims.keys() if '*' in USER_CLAIMS else USER_CLAIMS
+        for key in keys:
+            if key in claims:
+                agent.add_custom_parameter(key, str(claims[key]))
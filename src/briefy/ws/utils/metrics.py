@@ -0,0 +1,319 @@
+"""In-process metrics for briefy.ws.
+
+Counters, gauges and histograms with labels, kept in a registry and exposed in the
+Prometheus text exposition format. Metrics are per process and safe to update from the
+threads of a multi-threaded server.
+"""
+import math
+import threading
+import typing as t
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+"""Content type of the text exposition format."""
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Default histogram buckets, in seconds."""
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value."""
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: t.Any) -> str:
+    """Escape a label value."""
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names: t.Sequence[str], values: t.Sequence[t.Any]) -> str:
+    """Format label names and values as {name="value",...}."""
+    if not names:
+        return ''
+    pairs = ','.join([f'{name}="{_escape(value)}"' for name, value in zip(names, values)])
+    return f'{{{pairs}}}'
+
+
+class Metric:
+    """Base class for a metric with a fixed set of label names."""
+
+    type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: t.Sequence[str]=()):
+        """Initialize the metric.
+
+        :param name: metric name.
+        :param documentation: help text.
+        :param labelnames: names of the labels of each sample.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        """Return the label values, in order, for the given labels.
+
+        :param labels: label names and values.
+        :return: tuple of label values.
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'Metric {self.name} expects labels: {", ".join(self.labelnames)}')
+        return tuple([str(labels[name]) for name in self.labelnames])
+
+    def value(self, **labels) -> t.Any:
+        """Return the current value for the given labels."""
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def clear(self):
+        """Remove all samples."""
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> t.List[t.Tuple[str, str, float]]:
+        """Return a list of (name, labels, value) samples."""
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            (self.name, _format_labels(self.labelnames, key), value) for key, value in items
+        ]
+
+    def expose(self) -> str:
+        """Return the metric in text exposition format."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    type = 'counter'
+
+    def inc(self, amount: float=1, **labels):
+        """Increment the counter.
+
+        :param amount: value to be added, must not be negative.
+        :param labels: label names and values.
+        """
+        if amount < 0:
+            raise ValueError('Counters can only be incremented.')
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type = 'gauge'
+
+    def set(self, value: float, **labels):
+        """Set the gauge value.
+
+        :param value: new value.
+        :param labels: label names and values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float=1, **labels):
+        """Increment the gauge.
+
+        :param amount: value to be added.
+        :param labels: label names and values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float=1, **labels):
+        """Decrement the gauge.
+
+        :param amount: value to be subtracted.
+        :param labels: label names and values.
+        """
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: t.Sequence[str]=(),
+            buckets: t.Sequence[float]=DEFAULT_BUCKETS
+    ):
+        """Initialize the histogram.
+
+        :param name: metric name.
+        :param documentation: help text.
+        :param labelnames: names of the labels of each sample.
+        :param buckets: upper bounds of the buckets, +Inf is always added.
+        """
+        super().__init__(name, documentation, labelnames)
+        buckets = sorted(buckets)
+        if not buckets or buckets[-1] != math.inf:
+            buckets.append(math.inf)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        """Add an observation.
+
+        :param value: observed value.
+        :param labels: label names and values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = entry[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def value(self, **labels) -> t.Optional[dict]:
+        """Return the count and sum of observations for the given labels."""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return {'count': entry[2], 'sum': entry[1]} if entry else None
+
+    def samples(self) -> t.List[t.Tuple[str, str, float]]:
+        """Return a list of (name, labels, value) samples for buckets, sum and count."""
+        with self._lock:
+            items = sorted([(key, (list(e[0]), e[1], e[2])) for key, e in self._values.items()])
+        samples = []
+        labelnames = self.labelnames + ('le', )
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(labelnames, key + (_format_value(bound), ))
+                samples.append((f'{self.name}_bucket', labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f'{self.name}_sum', labels, total))
+            samples.append((f'{self.name}_count', labels, count))
+        return samples
+
+
+class Registry:
+    """Collection of metrics, exposed together."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, klass: type, name: str, *args, **kwargs) -> Metric:
+        """Return the metric registered with this name, creating it if needed."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = klass(name, *args, **kwargs)
+            elif not isinstance(metric, klass):
+                raise ValueError(f'Metric {name} is already registered as a {metric.type}.')
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: t.Sequence[str]=()) -> Counter:
+        """Return a counter, registering it if needed."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: t.Sequence[str]=()) -> Gauge:
+        """Return a gauge, registering it if needed."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: t.Sequence[str]=(),
+            buckets: t.Sequence[float]=DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Return a histogram, registering it if needed."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name: str) -> t.Optional[Metric]:
+        """Return a registered metric."""
+        return self._metrics.get(name)
+
+    def clear(self):
+        """Remove all samples of all metrics, metrics stay registered."""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def expose(self) -> str:
+        """Return all metrics in text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return ''.join([f'{metric.expose()}\n' for metric in metrics])
+
+
+registry = Registry()
+"""Metrics of this process."""
+
+REQUEST_DURATION = registry.histogram(
+    'briefy_ws_request_duration_seconds',
+    'Request latency by resource, method and status.',
+    ('resource', 'method', 'status')
+)
+
+DB_STATEMENT_DURATION = registry.histogram(
+    'briefy_ws_db_statement_duration_seconds',
+    'Duration of SQL statements, by resource.',
+    ('resource', )
+)
+
+DB_POOL_WAIT = registry.histogram(
+    'briefy_ws_db_pool_wait_seconds',
+    'Time waiting to check out a connection from the pool.',
+    ('pool', ),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+)
+
+DB_POOL_CHECKED_OUT = registry.gauge(
+    'briefy_ws_db_pool_checked_out',
+    'Connections checked out from the pool.',
+    ('pool', )
+)
+
+CACHE_REQUESTS = registry.counter(
+    'briefy_ws_cache_requests_total',
+    'Cache lookups by cache and result (hit or miss).',
+    ('cache', 'result')
+)
+
+EVENTS_IN_FLIGHT = registry.gauge(
+    'briefy_ws_events_in_flight',
+    'Events being notified and dispatched to the queue.',
+)
+
+EVENTS = registry.counter(
+    'briefy_ws_events_total',
+    'Events notified, by event class.',
+    ('event', )
+)
+
+USER_SERVICE_DURATION = registry.histogram(
+    'briefy_ws_user_service_duration_seconds',
+    'Latency of calls to the user service, by outcome.',
+    ('outcome', )
+)
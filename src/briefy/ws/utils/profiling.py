@@ -0,0 +1,85 @@
+"""Request profiling utilities for briefy.ws."""
+from collections import deque
+from collections import OrderedDict
+from contextlib import contextmanager
+from pyramid.request import Request
+
+import threading
+import time
+import typing as t
+
+
+PROFILE_HEADER = 'X-Briefy-Profile'
+"""Request header asking for the request to be profiled."""
+
+PROFILE_ID_HEADER = 'X-Briefy-Profile-Id'
+"""Response header with the id of the stored profile."""
+
+
+def enable_phases(request: Request) -> OrderedDict:
+    """Start recording the time spent in each phase of the request.
+
+    :param request: pyramid request object.
+    :return: dictionary with phase names and time spent, in seconds.
+    """
+    phases = request._briefy_phases = OrderedDict()
+    return phases
+
+
+def get_phases(request: Request) -> t.Optional[OrderedDict]:
+    """Return the time spent in each phase of the request, if phases are recorded."""
+    return getattr(request, '_briefy_phases', None)
+
+
+@contextmanager
+def phase(request: Request, name: str):
+    """Account the time spent inside this block to a phase of the request.
+
+    Does nothing unless :func:`enable_phases` was called for this request.
+
+    :param request: pyramid request object.
+    :param name: phase name (e.g. ``query``).
+    """
+    phases = getattr(request, '_briefy_phases', None)
+    if phases is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+class ProfileStore:
+    """Bounded store of the latest request profiles."""
+
+    def __init__(self, maxlen: int):
+        """Initialize the store.
+
+        :param maxlen: maximum number of profiles kept.
+        """
+        self._profiles = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict):
+        """Add a profile to the store.
+
+        :param profile: dictionary with, at least, an id.
+        """
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> t.Optional[dict]:
+        """Return a profile by id."""
+        with self._lock:
+            for profile in self._profiles:
+                if profile['id'] == profile_id:
+                    return profile
+        return None
+
+    def summary(self) -> t.List[dict]:
+        """Return all profiles, without stats, the most recent first."""
+        with self._lock:
+            profiles = list(reversed(self._profiles))
+        return [{k: v for k, v in item.items() if k != 'stats'} for item in profiles]
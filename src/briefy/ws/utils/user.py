@@ -2,32 +2,78 @@
 from briefy.common.utils.cache import timeout_cache
 from briefy.ws import logger
 from briefy.ws.config import USER_SERVICE_BASE
+from briefy.ws.config import USER_SERVICE_CIRCUIT_RESET
+from briefy.ws.config import USER_SERVICE_CIRCUIT_THRESHOLD
 from briefy.ws.config import USER_SERVICE_TIMEOUT
+from briefy.ws.renderer import msgpack
+from briefy.ws.renderer import msgpack_loads
+from briefy.ws.renderer import MSGPACK_TYPES
+from briefy.ws.utils import metrics
+from briefy.ws.utils.circuit import CircuitBreaker
 
 import requests
+import time
 import transaction
 import typing as t
 
 
+user_service_circuit = CircuitBreaker(
+    'user_service',
+    int(USER_SERVICE_CIRCUIT_THRESHOLD),
+    float(USER_SERVICE_CIRCUIT_RESET)
+)
+"""Circuit breaker of calls to the user service."""
+
+ACCEPT = 'application/msgpack, application/json;q=0.9' if msgpack else 'application/json'
+"""Accept header of calls to internal services, MessagePack is used when installed."""
+
+
+def _decode(resp: requests.Response) -> t.Any:
+    """Decode the payload of an internal service response, MessagePack or JSON.
+
+    :param resp: response of an internal service.
+    :return: decoded payload.
+    """
+    content_type = resp.headers.get('Content-Type', '').split(';')[0].strip()
+    if msgpack and content_type in MSGPACK_TYPES:
+        return msgpack_loads(resp.content)
+    return resp.json()
+
+
 def _get_user_info_from_service(user_id: str) -> dict:
     """Retrieve user information from briefy.rolleiflex.
 
+    Calls are skipped while the user service circuit is open.
+
     :param user_id: Id for the user we want to query.
     :return: Dictionary with user information.
     """
     data = {}
+    if not user_service_circuit.allow():
+        logger.info('User service circuit is open, not getting user info.')
+        return data
     endpoint = f'{USER_SERVICE_BASE}/users/{user_id}'
     # TODO: improve this to user current user locale
-    headers = {'X-Locale': 'en_GB'}
+    headers = {'X-Locale': 'en_GB', 'Accept': ACCEPT}
     savepoint = transaction.savepoint()
+    start_time = time.perf_counter()
     try:
         resp = requests.get(endpoint, headers=headers)
     except requests.ConnectionError as exc:
+        metrics.USER_SERVICE_DURATION.observe(time.perf_counter() - start_time, outcome='error')
+        user_service_circuit.record_failure()
         logger.warn(f'Failure connecting to internal user service. Exception: {exc}')
         savepoint.rollback()
     else:
+        metrics.USER_SERVICE_DURATION.observe(
+            time.perf_counter() - start_time, outcome=resp.status_code
+        )
+        if resp.status_code >= 500:
+            user_service_circuit.record_failure()
+        else:
+            user_service_circuit.record_success()
         if resp.status_code == 200:
-            raw_data = resp.json()
+            raw_data = _decode(resp)
             data = raw_data['data'] if 'data' in raw_data else data
         else:
             status_code = resp.status_code
@@ -0,0 +1,148 @@
+"""Heartbeat view.
+
+Check the dependencies of this web head: the database, its connection pool, the user
+service and the events being dispatched.
+ref: https://github.com/mozilla-services/cliquet/blob/master/cliquet/views/heartbeat.py
+"""
+from briefy.ws.config import HEARTBEAT_CACHE_TTL
+from briefy.ws.config import HEARTBEAT_DB_TIMEOUT
+from briefy.ws.config import HEARTBEAT_POOL_THRESHOLD
+from briefy.ws.utils import metrics
+from briefy.ws.utils.user import user_service_circuit
+from cornice import Service
+from pyramid.request import Request
+from pyramid.security import NO_PERMISSION_REQUIRED
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+import sqlalchemy as sa
+import threading
+import time
+import typing as t
+
+
+OK = 'ok'
+DEGRADED = 'degraded'
+
+_cache = {'expires_at': 0, 'result': None}
+_lock = threading.Lock()
+
+
+heartbeat = Service(
+    name='heartbeat',
+    path='/__heartbeat__',
+    description='Web head and dependencies health'
+)
+
+
+def get_engine(request: Request) -> t.Optional[Engine]:
+    """Return the engine used by the application session, if any."""
+    session_factory = request.registry.get('db_session_factory')
+    if session_factory is None:
+        return None
+    return session_factory().get_bind()
+
+
+def check_database(engine: Engine, timeout: float) -> dict:
+    """Execute a SELECT 1, waiting at most timeout seconds for it to finish.
+
+    The statement runs in a separate thread, so a connection checkout blocked by an
+    exhausted pool or an unresponsive database does not block the heartbeat.
+
+    :param engine: database engine.
+    :param timeout: seconds to wait for the check.
+    :return: dictionary with the check result and its latency in ms.
+    """
+    result = {}
+
+    def ping():
+        start_time = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(sa.text('SELECT 1'))
+        except Exception as exc:
+            result['error'] = f'{exc.__class__.__name__}: {exc}'
+        result['latency'] = round((time.perf_counter() - start_time) * 1000, 2)
+
+    thread = threading.Thread(target=ping, name='briefy-heartbeat', daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        return {'ok': False, 'error': f'Timeout after {timeout}s'}
+    result['ok'] = 'error' not in result
+    return result
+
+
+def check_pool(engine: Engine, threshold: float) -> dict:
+    """Report the utilization of the connection pool.
+
+    :param engine: database engine.
+    :param threshold: utilization, from 0 to 1, from which the pool is degraded.
+    :return: dictionary with the pool status.
+    """
+    pool = engine.pool
+    result = {'ok': True, 'class': pool.__class__.__name__}
+    if isinstance(pool, QueuePool):
+        size = pool.size()
+        checked_out = pool.checkedout()
+        max_overflow = pool._max_overflow
+        result.update({
+            'size': size,
+            'checked_out': checked_out,
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': max_overflow,
+        })
+        # a negative max_overflow means the pool is unbounded
+        if max_overflow >= 0:
+            utilization = checked_out / (size + max_overflow)
+            result['utilization'] = round(utilization, 2)
+            result['ok'] = utilization < threshold
+    return result
+
+
+def check_health(request: Request) -> dict:
+    """Run all checks.
+
+    Only the database and its connection pool degrade the web head: user information
+    falls back to empty values while the user service circuit is open.
+
+    :param request: pyramid request object.
+    :return: dictionary with the status and the result of each check.
+    """
+    checks = {
+        'user_service': user_service_circuit.info(),
+        'events': {'in_flight': metrics.EVENTS_IN_FLIGHT.value() or 0},
+    }
+    engine = get_engine(request)
+    if engine is not None:
+        checks['database'] = check_database(engine, float(HEARTBEAT_DB_TIMEOUT))
+        checks['pool'] = check_pool(engine, float(HEARTBEAT_POOL_THRESHOLD))
+    degraded = not all([check.get('ok', True) for check in checks.values()])
+    return {'status': DEGRADED if degraded else OK, 'checks': checks}
+
+
+def get_health(request: Request) -> dict:
+    """Return the result of the checks, running them at most once per HEARTBEAT_CACHE_TTL.
+
+    :param request: pyramid request object.
+    :return: dictionary with the status and the result of each check.
+    """
+    with _lock:
+        now = time.monotonic()
+        if _cache['result'] is None or now >= _cache['expires_at']:
+            _cache['result'] = check_health(request)
+            _cache['expires_at'] = now + float(HEARTBEAT_CACHE_TTL)
+        return _cache['result']
+
+
+@heartbeat.get(permission=NO_PERMISSION_REQUIRED)
+def get_heartbeat(request: Request) -> dict:
+    """Return the health of this web head and its dependencies.
+
+    The response status is 503 when the web head is degraded, so the load-balancer can
+    drop it from rotation.
+    """
+    health = get_health(request)
+    if health['status'] != OK:
+        request.response.status_code = 503
+    return health
@@ -0,0 +1,26 @@
+"""Index advisor view.
+
+Report fields used to filter and sort resource listings that are not indexed.
+"""
+from briefy.ws.db import indexes
+from briefy.ws.resources.factory import DevopsFactory
+from cornice import Service
+from pyramid.request import Request
+
+
+index_advisor = Service(
+    name='indexes',
+    path='/__indexes__',
+    description='Index advisor for resource listings',
+    factory=DevopsFactory
+)
+
+
+@index_advisor.get(permission='devops')
+def get_indexes(request: Request) -> dict:
+    """Return the index report with field usage observed by this process.
+
+    The usage counters are also returned, to be loaded by briefy-ws-index-advisor --usage.
+    """
+    reports = indexes.report()
+    return {'data': reports, 'total': len(reports), 'usage': indexes.field_usage.dump()}
@@ -0,0 +1,55 @@
+"""Metrics view.
+
+Expose the metrics of this process in the Prometheus text exposition format.
+
+Scrapers cannot send a briefy JWT, so the view requires no permission, like
+/__lbheartbeat__. Set METRICS_TOKEN to require a static bearer token, configured as
+``bearer_token`` in the Prometheus scrape job, or leave it empty and restrict access to
+/__metrics__ at the network or ingress level.
+"""
+from briefy.ws.config import METRICS_TOKEN
+from briefy.ws.utils.metrics import CONTENT_TYPE
+from briefy.ws.utils.metrics import registry
+from cornice import Service
+from pyramid.httpexceptions import HTTPUnauthorized as Unauthorized
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.security import NO_PERMISSION_REQUIRED
+
+import hmac
+
+
+metrics = Service(
+    name='metrics',
+    path='/__metrics__',
+    description='Process metrics'
+)
+
+
+def is_authorized(request: Request, token: str) -> bool:
+    """Check the bearer token sent by the scraper.
+
+    :param request: pyramid request object.
+    :param token: expected token, empty to allow all requests.
+    :return: True if the request can read the metrics.
+    """
+    if not token:
+        return True
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer':
+        return False
+    return hmac.compare_digest(credentials.strip().encode('utf-8'), token.encode('utf-8'))
+
+
+@metrics.get(permission=NO_PERMISSION_REQUIRED)
+def get_metrics(request: Request) -> Response:
+    """Return all metrics of this process.
+
+    Each process keeps its own metrics, so every worker has to be scraped.
+    """
+    if not is_authorized(request, METRICS_TOKEN):
+        raise Unauthorized('Invalid metrics token.')
+    response = request.response
+    response.headers['Content-Type'] = CONTENT_TYPE
+    response.text = registry.expose()
+    return response
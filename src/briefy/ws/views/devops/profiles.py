@@ -0,0 +1,41 @@
+"""Request profiles views.
+
+List and retrieve profiles of requests sent with the X-Briefy-Profile header.
+"""
+from briefy.ws.resources.factory import DevopsFactory
+from briefy.ws.tweens.profiler import profiles
+from cornice import Service
+from pyramid.httpexceptions import HTTPNotFound as NotFound
+from pyramid.request import Request
+
+
+profile_list = Service(
+    name='profiles',
+    path='/__profiles__',
+    description='Latest request profiles',
+    factory=DevopsFactory
+)
+
+profile_detail = Service(
+    name='profile',
+    path='/__profiles__/{id}',
+    description='Request profile',
+    factory=DevopsFactory
+)
+
+
+@profile_list.get(permission='devops')
+def get_profiles(request: Request) -> dict:
+    """Return the latest profiles of this process, without the profiler stats."""
+    data = profiles.summary()
+    return {'data': data, 'total': len(data)}
+
+
+@profile_detail.get(permission='devops')
+def get_profile(request: Request) -> dict:
+    """Return a profile, including the profiler stats."""
+    profile_id = request.matchdict['id']
+    profile = profiles.get(profile_id)
+    if not profile:
+        raise NotFound(f'Profile with id: {profile_id} not found.')
+    return profile
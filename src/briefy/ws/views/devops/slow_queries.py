@@ -0,0 +1,28 @@
+"""Slow queries view.
+
+List the latest slow statements executed by resource listings.
+"""
+from briefy.ws.db.slowlog import slow_queries
+from briefy.ws.resources.factory import DevopsFactory
+from cornice import Service
+from pyramid.request import Request
+
+
+slowqueries = Service(
+    name='slowqueries',
+    path='/__slowqueries__',
+    description='Slow queries executed by resource listings',
+    factory=DevopsFactory
+)
+
+
+@slowqueries.get(permission='devops')
+def get_slow_queries(request: Request) -> dict:
+    """Return the slow query log of this process, the most recent first."""
+    entries = slow_queries.entries()
+    return {
+        'threshold': slow_queries.threshold,
+        'explain': slow_queries.explain,
+        'data': entries,
+        'total': len(entries),
+    }
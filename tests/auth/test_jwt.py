@@ -32,3 +32,29 @@ class TestSecureResource:
         result = response.json
         assert result.get('status') == 401
         assert result.get('message') == 'Unauthorized'
+
+    def test_claims_cached_per_token(self):
+        """Verified claims are reused for requests with the same token."""
+        from pyramid.interfaces import IAuthenticationPolicy
+
+        policy = self.app.app.registry.queryUtility(IAuthenticationPolicy)
+        claims_cache = policy.claims_cache
+        claims_cache.clear()
+        headers = self.get_auth_header()
+        self.app.get('/protected', headers=headers, status=200)
+        assert len(claims_cache) == 1
+        hits = claims_cache.hits
+        self.app.get('/protected', headers=headers, status=200)
+        assert len(claims_cache) == 1
+        assert claims_cache.hits == hits + 1
+
+    def test_invalid_token_not_cached(self):
+        """Invalid tokens are never cached."""
+        from pyramid.interfaces import IAuthenticationPolicy
+
+        policy = self.app.app.registry.queryUtility(IAuthenticationPolicy)
+        claims_cache = policy.claims_cache
+        claims_cache.clear()
+        headers = {'Authorization': 'JWT invalid'}
+        self.app.get('/protected', headers=headers, status=401)
+        assert len(claims_cache) == 0
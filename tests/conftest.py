@@ -2,6 +2,8 @@
 from briefy import common
 from briefy.common.db import Base
 from briefy.ws.auth import AuthenticatedUser
+from briefy.ws.resources import RESTService
+from cornice.errors import Errors
 from pyramid.testing import DummyRequest
 from sqlalchemy import create_engine
 from sqlalchemy import orm
@@ -12,6 +14,7 @@ from zope.sqlalchemy import ZopeTransactionExtension
 
 import collections
 import pytest
+import sqlalchemy as sa
 import uuid
 
 
@@ -193,6 +196,25 @@ def context():
     return ContextMock()
 
 
+class ListingModel(Base):
+    """Model listed by the collection_get fixture."""
+
+    __tablename__ = 'listing_model'
+
+    __raw_acl__ = (
+        ('list', ('g:briefy',)),
+        ('view', ('g:briefy',)),
+    )
+
+    id = sa.Column(sa.String, nullable=False, primary_key=True)
+    title = sa.Column(sa.String, nullable=True)
+    description = sa.Column(sa.String, nullable=True)
+    state = sa.Column(sa.String, nullable=True)
+    country = sa.Column(sa.String, nullable=True)
+    price = sa.Column(sa.Integer, nullable=True)
+    created_at = sa.Column(sa.DateTime, nullable=True)
+
+
 @pytest.fixture('function')
 def model_class():
     """Return a model class."""
@@ -271,3 +293,23 @@ def login(request, testapp):
         cls.user = user
         cls.app = testapp
     return AuthenticatedUser(user.get('id'), user)
+
+
+@pytest.fixture('function')
+def collection_get(login, web_request, context, database):
+    """Return a function listing ListingModel objects with RESTService.collection_get.
+
+    The function receives the rows to be added to the database, as dictionaries, the
+    query parameters and, optionally, the service class to be used.
+    """
+    def run(rows: list, service_class=RESTService, **params):
+        ListingModel.__session__ = database
+        database.add_all([ListingModel(**row) for row in rows])
+        database.flush()
+        web_request.errors = Errors()
+        web_request.GET.update(params)
+        service = service_class(context, web_request)
+        service.model = ListingModel
+        return service.collection_get()
+
+    return run
@@ -0,0 +1,29 @@
+"""Test engine creation and pool instrumentation."""
+from briefy.ws.db import engine as engine_module
+from briefy.ws.utils import metrics
+from sqlalchemy.pool import QueuePool
+
+
+def test_create_engine_sqlite():
+    """Pool settings are not used for SQLite."""
+    engine = engine_module.create_engine_from_config('sqlite://')
+    assert not isinstance(engine.pool, QueuePool)
+    assert engine.execute('SELECT 1').scalar() == 1
+
+
+def test_pool_wait_metrics():
+    """Connection checkouts are recorded in the pool metrics."""
+    metrics.registry.clear()
+    engine = engine_module.create_engine_from_config(
+        'sqlite://', name='test', poolclass=engine_module.InstrumentedQueuePool
+    )
+    assert engine.pool.metrics_name == 'test'
+
+    conn = engine.connect()
+    assert metrics.DB_POOL_CHECKED_OUT.value(pool='test') == 1
+    conn.close()
+    assert metrics.DB_POOL_CHECKED_OUT.value(pool='test') == 0
+    assert metrics.DB_POOL_WAIT.value(pool='test')['count'] == 1
+
+    engine.dispose()
+    assert engine.pool.metrics_name == 'test'
@@ -0,0 +1,81 @@
+"""Test SQL functions compiled per dialect."""
+from briefy.ws.db import functions
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+
+import pytest
+import sqlalchemy as sa
+
+
+table = sa.Table(
+    'items', sa.MetaData(),
+    sa.Column('title', sa.String),
+    sa.Column('created_at', sa.DateTime),
+)
+
+
+def compile_sql(clause, dialect) -> str:
+    """Compile a clause, with its parameters rendered inline."""
+    return str(clause.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+
+def test_escape_like():
+    """Wildcards and the escape character are escaped."""
+    assert functions.escape_like('50%_off\\') == '50\\%\\_off\\\\'
+
+
+def test_date_bucket():
+    """date_trunc on PostgreSQL, strftime on SQLite."""
+    bucket = functions.date_bucket(table.c.created_at, 'month')
+    assert compile_sql(bucket, postgresql.dialect()) == "date_trunc('month', items.created_at)"
+    assert compile_sql(bucket, sqlite.dialect()) == "strftime('%Y-%m', items.created_at)"
+    with pytest.raises(ValueError):
+        functions.date_bucket(table.c.created_at, 'hour')
+
+
+def test_text_search_postgresql():
+    """Full-text match using the text search configuration as a literal."""
+    clause = functions.text_search(table.c.title, 'red car', 'english')
+    sql = compile_sql(clause, postgresql.dialect())
+    assert sql == (
+        "to_tsvector('english'::regconfig, items.title) @@ "
+        "plainto_tsquery('english'::regconfig, 'red car')"
+    )
+    rank = compile_sql(functions.text_rank(table.c.title, 'car'), postgresql.dialect())
+    assert rank.startswith("ts_rank(to_tsvector('simple'::regconfig, items.title)")
+
+
+def test_text_search_fallback():
+    """Other databases match each term with LIKE."""
+    clause = functions.text_search(table.c.title, 'Red 50%')
+    sql = compile_sql(clause, sqlite.dialect())
+    assert "lower(items.title) LIKE '%red%'" in sql
+    assert "lower(items.title) LIKE '%50\\%%'" in sql
+    assert compile_sql(functions.text_rank(table.c.title, 'car'), sqlite.dialect()) == '0'
+    with pytest.raises(ValueError):
+        functions.text_search(table.c.title, 'car', "simple'; --")
+
+
+def test_in_values_postgresql():
+    """A single array parameter, whatever the number of values."""
+    clause = functions.in_values(table.c.title, ['a', 'b'])
+    sql = str(clause.compile(dialect=postgresql.dialect()))
+    assert sql.startswith('items.title = ANY (CAST(%(in_values')
+    assert sql.endswith('AS VARCHAR[]))')
+
+    clause = functions.in_values(table.c.title, ['a'], negate=True)
+    assert '!= ALL (CAST(' in str(clause.compile(dialect=postgresql.dialect()))
+
+
+def test_in_values_sqlite():
+    """An expanding IN parameter."""
+    engine = sa.create_engine('sqlite://')
+    table.create(engine)
+    engine.execute(table.insert(), [{'title': 'a'}, {'title': 'b'}, {'title': 'c'}])
+    statement = sa.select([table.c.title]).order_by(table.c.title)
+    rows = engine.execute(statement.where(functions.in_values(table.c.title, {'a', 'c'})))
+    assert [row.title for row in rows] == ['a', 'c']
+    rows = engine.execute(
+        statement.where(functions.in_values(table.c.title, {'a', 'c'}, negate=True))
+    )
+    assert [row.title for row in rows] == ['b']
@@ -0,0 +1,85 @@
+"""Test index advisor."""
+from briefy.ws.db import indexes
+from briefy.ws.resources import RESTService
+from sqlalchemy.ext.declarative import declarative_base
+
+import json
+import pytest
+import sqlalchemy as sa
+
+
+IndexBase = declarative_base()
+
+
+class IndexedModel(IndexBase):
+    """Model with some indexes."""
+
+    __tablename__ = 'indexed_model'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    slug = sa.Column(sa.String, unique=True)
+    _state = sa.Column('state', sa.String, index=True)
+    country = sa.Column(sa.String)
+    city = sa.Column(sa.String)
+    updated_at = sa.Column(sa.DateTime)
+
+
+class IndexedResource(RESTService):
+    """Resource for IndexedModel."""
+
+    model = IndexedModel
+
+
+@pytest.fixture
+def field_usage():
+    """Return field usage with some filters and sorting."""
+    usage = indexes.field_usage
+    usage.clear()
+    for field in ('country', 'country', 'state', 'city'):
+        usage.record(IndexedModel, indexes.FILTER, field)
+    usage.record(IndexedModel, indexes.SORT, 'updated_at')
+    yield usage
+    usage.clear()
+
+
+def test_registered_resources():
+    """Resource subclasses are registered."""
+    assert IndexedResource in RESTService.registered_resources()
+
+
+def test_resource_report(field_usage):
+    """Unindexed filter fields are suggested with the default order by."""
+    report = indexes.resource_report(IndexedResource)
+    assert report['table'] == 'indexed_model'
+    fields = {item['field']: item for item in report['fields']}
+    assert fields['state']['indexed'] is True
+    assert fields['state']['filters'] == 1
+    assert fields['country']['indexed'] is False
+    assert fields['country']['filters'] == 2
+    assert fields['updated_at']['sorts'] == 1
+    assert report['suggestions'] == [
+        'CREATE INDEX ix_indexed_model_updated_at ON indexed_model (updated_at)',
+        'CREATE INDEX ix_indexed_model_country_updated_at ON indexed_model (country, updated_at)',
+        'CREATE INDEX ix_indexed_model_city_updated_at ON indexed_model (city, updated_at)',
+    ]
+    assert 'NOT INDEXED' in indexes.format_report([report])
+
+
+def test_field_usage_dump_load(field_usage):
+    """Usage dumped by a web head is loaded by the command line."""
+    dump = field_usage.dump()
+    assert {'model': f'{__name__}.IndexedModel', 'kind': 'filter', 'field': 'country',
+            'count': 2} in dump
+    field_usage.clear()
+    field_usage.load(dump + [{'model': 'foo.Bar', 'kind': 'filter', 'field': 'x', 'count': 1}],
+                     [IndexedModel])
+    assert field_usage.get(IndexedModel, indexes.FILTER) == {'country': 2, 'state': 1, 'city': 1}
+
+
+def test_main_usage(field_usage, tmpdir, capsys):
+    """The command line reports usage read from a saved /__indexes__ response."""
+    path = tmpdir.join('indexes.json')
+    path.write(json.dumps({'data': [], 'usage': field_usage.dump()}))
+    field_usage.clear()
+    indexes.main(['--usage', str(path), __name__])
+    assert 'filters: 2' in capsys.readouterr().out
@@ -0,0 +1,90 @@
+"""Test read replica routing."""
+from briefy.ws.db import routing
+from pyramid import testing
+from pyramid.response import Response
+from sqlalchemy import create_engine
+from sqlalchemy import orm
+
+import pytest
+import sqlalchemy as sa
+import time
+
+
+class UserMock:
+    """User mock object."""
+
+    id = 'fbda5789-2e32-44c4-b9dc-d0d217454a2a'
+
+
+def make_engine(name):
+    """Return an engine with a marker table holding its name."""
+    engine = create_engine('sqlite://')
+    engine.execute('CREATE TABLE marker (name VARCHAR)')
+    engine.execute(f"INSERT INTO marker VALUES ('{name}')")
+    return engine
+
+
+@pytest.fixture
+def session(request):
+    """Return a routing session bound to the primary, with a replica installed."""
+    routing.install(make_engine('replica'))
+    factory = orm.sessionmaker(class_=routing.RoutingSession, bind=make_engine('primary'))
+    request.addfinalizer(lambda: routing.install(None))
+    return factory()
+
+
+def read(session, method='GET', enabled=True, **kwargs):
+    """Return the engine used to read in a request."""
+    request = testing.DummyRequest(method=method, **kwargs)
+    request.user = UserMock()
+    routing.use_read_replica(request, enabled)
+    with testing.testConfig(request=request):
+        return session.execute('SELECT name FROM marker').scalar()
+
+
+def test_routing(session):
+    """Only safe requests with the replica enabled read from the replica."""
+    assert read(session) == 'replica'
+    assert read(session, method='HEAD') == 'replica'
+    assert read(session, method='POST') == 'primary'
+    assert read(session, enabled=False) == 'primary'
+    # outside a request
+    assert session.execute('SELECT name FROM marker').scalar() == 'primary'
+
+
+def write(session, statement=None) -> Response:
+    """Write in a request and return its response, with the response callbacks applied."""
+    request = testing.DummyRequest(method='POST')
+    request.user = UserMock()
+    routing.use_read_replica(request)
+    with testing.testConfig(request=request):
+        if statement is None:
+            routing.after_flush(session, None)
+        else:
+            session.execute(statement)
+    response = Response()
+    request._process_response_callbacks(response)
+    return response
+
+
+def test_routing_sticky(session):
+    """Clients sending the last write cookie or header read from the primary."""
+    response = write(session)
+    written_at = response.headers[routing.LAST_WRITE_HEADER]
+    assert f'{routing.LAST_WRITE_COOKIE}={written_at}' in response.headers['Set-Cookie']
+
+    cookies = {routing.LAST_WRITE_COOKIE: written_at}
+    assert read(session, cookies=cookies) == 'primary'
+    assert read(session, headers={routing.LAST_WRITE_HEADER: written_at}) == 'primary'
+    # other clients and expired writes use the replica
+    assert read(session) == 'replica'
+    expired = str(time.time() - 3600)
+    assert read(session, cookies={routing.LAST_WRITE_COOKIE: expired}) == 'replica'
+    assert read(session, cookies={routing.LAST_WRITE_COOKIE: 'foo'}) == 'replica'
+
+
+def test_routing_sticky_statement(session):
+    """Update statements executed by the session also mark the client."""
+    marker = sa.table('marker', sa.column('name'))
+    response = write(session, marker.update().values(name='primary'))
+    assert routing.LAST_WRITE_HEADER in response.headers
@@ -0,0 +1,53 @@
+"""Test slow query log."""
+from briefy.ws.db import slowlog
+from sqlalchemy import create_engine
+
+import pytest
+
+
+@pytest.fixture
+def slow_queries(monkeypatch):
+    """Slow query log recording every statement."""
+    log = slowlog.SlowQueryLog(maxlen=2, threshold=0, explain=True)
+    monkeypatch.setattr(slowlog, 'slow_queries', log)
+    slowlog.install()
+    yield log
+    slowlog.stats.statement_observers.remove(log.observe)
+
+
+test_data = [
+    ('SELECT a\n  FROM t WHERE a = ?', 'SELECT a FROM t WHERE a = ?'),
+    ('SELECT a FROM t WHERE a IN (?, ?, ?)', 'SELECT a FROM t WHERE a IN (...)'),
+    ('SELECT a FROM t WHERE a IN (%(a_1)s, %(a_2)s)', 'SELECT a FROM t WHERE a IN (...)'),
+    ('SELECT count(*) FROM (SELECT a FROM t) AS b', 'SELECT count(*) FROM (SELECT a FROM t) AS b'),
+]
+
+
+@pytest.mark.parametrize('statement,expected', test_data)
+def test_normalize(statement, expected):
+    """Test normalize statements."""
+    assert slowlog.normalize(statement) == expected
+
+
+def test_slow_query_log(slow_queries):
+    """Only statements inside a capture block are recorded."""
+    engine = create_engine('sqlite://')
+    engine.execute('CREATE TABLE t (a INTEGER)')
+    with slowlog.capture('tests:Resource', {'in_a': '1,2'}):
+        engine.execute('SELECT a FROM t WHERE a IN (?, ?)', (1, 2))
+    engine.execute('SELECT a FROM t')
+
+    entries = slow_queries.entries()
+    assert len(entries) == 1
+    entry = entries[0]
+    assert entry['resource'] == 'tests:Resource'
+    assert entry['statement'] == 'SELECT a FROM t WHERE a IN (...)'
+    assert entry['params'] == {'in_a': '1,2'}
+    assert 'SCAN' in entry['plan']
+
+
+def test_slow_query_log_bounded(slow_queries):
+    """Only the latest entries are kept."""
+    for i in range(3):
+        slow_queries.record({'statement': i})
+    assert [entry['statement'] for entry in slow_queries.entries()] == [2, 1]
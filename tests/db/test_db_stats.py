@@ -0,0 +1,24 @@
+"""Test SQL statements statistics."""
+from briefy.ws.db import stats
+from sqlalchemy import create_engine
+
+
+def test_sql_stats():
+    """Statements are accounted only while collecting statistics."""
+    stats.install()
+    stats.install()
+    engine = create_engine('sqlite://')
+    engine.execute('SELECT 1')
+    assert stats.current() is None
+
+    sql = stats.start()
+    engine.execute('SELECT 1')
+    engine.execute('SELECT 2')
+    assert stats.stop() is sql
+    engine.execute('SELECT 3')
+
+    assert stats.current() is None
+    assert sql.statements == 2
+    assert sql.duration > 0
+    assert sql.server_timing().startswith('db;dur=')
+    assert 'desc="2 statements, 0 rows"' in sql.server_timing()
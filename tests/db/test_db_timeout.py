@@ -0,0 +1,58 @@
+"""Test statement timeout."""
+from briefy.ws.db import timeout
+from briefy.ws.errors import StatementTimeoutError
+from sqlalchemy import create_engine
+from sqlalchemy import orm
+from sqlalchemy.exc import DBAPIError
+from unittest.mock import Mock
+
+import pytest
+
+
+class QueryCanceled(Exception):
+    """psycopg2 QueryCanceledError mock."""
+
+    pgcode = timeout.QUERY_CANCELED
+
+
+def postgresql_session():
+    """Return a session mock using PostgreSQL."""
+    session = Mock()
+    session.get_bind.return_value.dialect.name = 'postgresql'
+    session.execute.return_value.scalar.return_value = '0'
+    return session
+
+
+def test_statement_timeout_sqlite():
+    """Statement timeout is a no-op for other databases."""
+    session = orm.sessionmaker(bind=create_engine('sqlite://'))()
+    with timeout.statement_timeout(session, 100):
+        assert session.execute('SELECT 1').scalar() == 1
+
+
+def test_statement_timeout():
+    """Timeout is set inside a savepoint and restored."""
+    session = postgresql_session()
+    with timeout.statement_timeout(session, 100):
+        pass
+    first, second = session.execute.call_args_list
+    assert first[0][1] == {'value': '100ms'}
+    assert second[0][1] == {'value': '0'}
+    session.begin_nested.return_value.commit.assert_called_once_with()
+
+
+def test_statement_timeout_cancelled():
+    """Cancelled statements roll back the savepoint and raise StatementTimeoutError."""
+    session = postgresql_session()
+    with pytest.raises(StatementTimeoutError):
+        with timeout.statement_timeout(session, 100):
+            raise DBAPIError('SELECT 1', {}, QueryCanceled())
+    session.begin_nested.return_value.rollback.assert_called_once_with()
+
+
+def test_statement_timeout_disabled():
+    """A zero timeout does not touch the session."""
+    session = postgresql_session()
+    with timeout.statement_timeout(session, 0):
+        pass
+    assert not session.begin_nested.called
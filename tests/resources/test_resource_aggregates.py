@@ -0,0 +1,50 @@
+"""Test aggregates of RESTService."""
+from datetime import datetime
+
+import pytest
+
+
+ROWS = [
+    {'id': '1', 'state': 'created', 'price': 10, 'created_at': datetime(2017, 1, 2)},
+    {'id': '2', 'state': 'created', 'price': 20, 'created_at': datetime(2017, 1, 20)},
+    {'id': '3', 'state': 'published', 'price': 30, 'created_at': datetime(2017, 2, 1)},
+]
+
+
+def test_aggregates(collection_get):
+    """Aggregates of the filtered listing are returned, without the objects."""
+    response = collection_get(ROWS, _aggregate='sum:price,max:price', state='created')
+    assert response == {'aggregates': [{'count': 2, 'sum_price': 30, 'max_price': 20}]}
+
+
+def test_aggregates_group_by(collection_get):
+    """Aggregates are computed per value of the group by field."""
+    response = collection_get(ROWS, _aggregate='sum:price', _group_by='state')
+    assert response['aggregates'] == [
+        {'group': 'created', 'count': 2, 'sum_price': 30},
+        {'group': 'published', 'count': 1, 'sum_price': 30},
+    ]
+
+
+def test_aggregates_group_by_date_bucket(collection_get):
+    """Date fields are grouped by a date bucket."""
+    response = collection_get(ROWS, _aggregate='min:price', _group_by='created_at:month')
+    assert response['aggregates'] == [
+        {'group': '2017-01', 'count': 2, 'min_price': 10},
+        {'group': '2017-02', 'count': 1, 'min_price': 30},
+    ]
+
+
+@pytest.mark.parametrize('params', [
+    {'_aggregate': 'median:price'},
+    {'_aggregate': 'sum:foo'},
+    {'_aggregate': 'sum:state'},
+    {'_aggregate': 'sum:price', '_group_by': 'foo'},
+    {'_aggregate': 'sum:price', '_group_by': 'state:month'},
+    {'_aggregate': 'sum:price', '_group_by': 'created_at:hour'},
+])
+def test_aggregates_invalid(collection_get, web_request, params):
+    """Unknown functions, fields and buckets are validation errors."""
+    response = collection_get(ROWS, **params)
+    assert response.status_code == 400
+    assert web_request.errors[0]['name'] in ('_aggregate', '_group_by')
@@ -0,0 +1,89 @@
+"""Test changes feed of RESTService."""
+from briefy.common.db import Base
+from briefy.ws.resources import RESTService
+from cornice.errors import Errors
+from datetime import datetime
+
+import sqlalchemy as sa
+
+
+class ChangesModel(Base):
+    """A Model with a modification date and a state."""
+
+    __tablename__ = 'changes_model'
+
+    __raw_acl__ = (
+        ('list', ('g:briefy',)),
+        ('view', ('g:briefy',)),
+    )
+
+    id = sa.Column(sa.String, nullable=False, primary_key=True)
+    updated_at = sa.Column(sa.DateTime, nullable=False)
+    state = sa.Column(sa.String, nullable=False, default='created')
+
+
+class ChangesService(RESTService):
+    """Service hiding deleted objects."""
+
+    model = ChangesModel
+
+    def default_filters(self, query):
+        """Do not list deleted objects."""
+        return query.filter(ChangesModel.state != 'deleted')
+
+
+def add_objects(database):
+    """Add objects, two of them with the same modification date."""
+    ChangesModel.__session__ = database
+    database.add_all([
+        ChangesModel(id='b', updated_at=datetime(2017, 11, 1), state='created'),
+        ChangesModel(id='a', updated_at=datetime(2017, 11, 1), state='deleted'),
+        ChangesModel(id='c', updated_at=datetime(2017, 11, 2), state='created'),
+    ])
+    database.flush()
+
+
+def get_changes(web_request, context, cursor=''):
+    """Return a page of two changes after cursor."""
+    web_request.GET['_items_per_page'] = '2'
+    web_request.GET['_changes'] = cursor
+    return ChangesService(context, web_request).collection_get()
+
+
+def test_changes(login, web_request, context, database):
+    """Changes are returned in order, with tombstones, and can be resumed."""
+    add_objects(database)
+
+    response = get_changes(web_request, context)
+    assert [item['id'] for item in response['data']] == ['a', 'b']
+    assert response['data'][0]['_deleted'] is True
+    assert response['has_more'] is True
+
+    cursor = response['cursor']
+    response = get_changes(web_request, context, cursor)
+    assert [item['id'] for item in response['data']] == ['c']
+    assert response['has_more'] is False
+
+    cursor = response['cursor']
+    response = get_changes(web_request, context, cursor)
+    assert response['data'] == []
+    assert response['cursor'] == cursor
+
+
+def test_changes_invalid_cursor(login, web_request, context, database):
+    """Invalid cursors are validation errors."""
+    web_request.errors = Errors()
+    get_changes(web_request, context, 'invalid')
+    assert web_request.errors[0]['name'] == '_changes'
+
+
+def test_changes_max_limit(login, web_request, context, database):
+    """The page size is limited by changes_max_limit."""
+    add_objects(database)
+    web_request.GET['_items_per_page'] = '1000'
+    web_request.GET['_changes'] = ''
+    service = ChangesService(context, web_request)
+    service.changes_max_limit = 1
+    response = service.collection_get()
+    assert [item['id'] for item in response['data']] == ['a']
+    assert response['has_more'] is True
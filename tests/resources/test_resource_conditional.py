@@ -0,0 +1,84 @@
+"""Test conditional GET requests of RESTService."""
+from briefy.common.db import Base
+from briefy.ws.resources import RESTService
+from datetime import datetime
+from pyramid.httpexceptions import HTTPNotModified
+
+import sqlalchemy as sa
+
+
+class ConditionalModel(Base):
+    """A Model with a modification date."""
+
+    __tablename__ = 'conditional_model'
+
+    __raw_acl__ = (
+        ('list', ('g:briefy',)),
+        ('view', ('g:briefy',)),
+    )
+
+    id = sa.Column(sa.String, nullable=False, primary_key=True)
+    name = sa.Column(sa.String, nullable=False)
+    updated_at = sa.Column(sa.DateTime, nullable=False)
+
+
+def add_object(database):
+    """Add a ConditionalModel object to the database."""
+    ConditionalModel.__session__ = database
+    database.add(ConditionalModel(id='1', name='A', updated_at=datetime(2017, 11, 1, 10)))
+    database.flush()
+
+
+def get_service(web_request, context):
+    """Return a service for ConditionalModel."""
+    web_request.registry.settings = {'project_version': '1.0.0'}
+    service = RESTService(context, web_request)
+    service.model = ConditionalModel
+    return service
+
+
+def test_get_etag(login, web_request, context, database):
+    """Items have an ETag and a Last-Modified header."""
+    add_object(database)
+    service = get_service(web_request, context)
+    web_request.matchdict = {'id': '1'}
+    response = service.get()
+    assert isinstance(response, ConditionalModel)
+    headers = web_request.response.headers
+    assert headers['ETag']
+    assert headers['Last-Modified'] == 'Wed, 01 Nov 2017 10:00:00 GMT'
+
+    web_request.headers['If-None-Match'] = headers['ETag']
+    response = service.get()
+    assert isinstance(response, HTTPNotModified)
+
+    database.query(ConditionalModel).update({'updated_at': datetime(2017, 11, 2)})
+    response = service.get()
+    assert isinstance(response, ConditionalModel)
+
+
+def test_get_if_modified_since(login, web_request, context, database):
+    """Items not modified since the given date return 304."""
+    add_object(database)
+    service = get_service(web_request, context)
+    web_request.matchdict = {'id': '1'}
+    web_request.headers['If-Modified-Since'] = 'Wed, 01 Nov 2017 10:00:00 GMT'
+    response = service.get()
+    assert isinstance(response, HTTPNotModified)
+
+
+def test_collection_get_etag(login, web_request, context, database):
+    """Listings have an ETag depending on the query string and the matching objects."""
+    add_object(database)
+    service = get_service(web_request, context)
+    response = service.collection_get()
+    assert response['total'] == 1
+    etag = web_request.response.headers['ETag']
+
+    web_request.headers['If-None-Match'] = etag
+    response = get_service(web_request, context).collection_get()
+    assert isinstance(response, HTTPNotModified)
+
+    web_request.GET['name'] = 'B'
+    response = get_service(web_request, context).collection_get()
+    assert response['total'] == 0
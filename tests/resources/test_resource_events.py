@@ -1,6 +1,8 @@
 from briefy.common.db import Base
+from briefy.ws.errors import StatementTimeoutError
 from briefy.ws.resources import events
 from briefy.ws.resources import RESTService
+from cornice.errors import Errors
 
 import sqlalchemy as sa
 
@@ -72,3 +74,121 @@ def test_base_resource_delete(login, web_request, context, model_class):
     response = service.delete()
     assert isinstance(response, model_class) is True
     assert isinstance(web_request.registry.notifications[0], events.ObjectDeletedEvent)
+
+
+def test_base_resource_patch(login, web_request, context, model_class):
+    service = RESTService(context, web_request)
+    service.model = model_class
+    response = service.patch()
+    assert isinstance(response, model_class) is True
+    assert isinstance(web_request.registry.notifications[0], events.ObjectUpdatedEvent)
+
+
+def test_base_resource_collection_patch(login, web_request, context, database):
+    """Test collection_patch method of rest resource."""
+    TestModel.__session__ = database
+    for id_, name in (('1', 'Foo'), ('2', 'Bar')):
+        database.add(TestModel(id=id_, name=name))
+    database.flush()
+
+    service = RESTService(context, web_request)
+    service.model = TestModel
+    web_request.validated = {'data': [{'id': '1', 'name': 'Baz'}, {'id': '2', 'guid': 'x'}]}
+    response = service.collection_patch()
+    assert response['total'] == 2
+    assert database.query(TestModel).get('1').name == 'Baz'
+    assert database.query(TestModel).get('2').guid == 'x'
+    assert len(web_request.registry.notifications) == 2
+    for event in web_request.registry.notifications:
+        assert isinstance(event, events.ObjectUpdatedEvent)
+
+
+def test_base_resource_collection_patch_keeps_id(login, web_request, context, database,
+                                                 monkeypatch):
+    """Test collection_patch does not pass the id, only used for lookup, to update."""
+    TestModel.__session__ = database
+    database.add(TestModel(id='1', name='Foo'))
+    database.flush()
+    payloads = []
+    update = TestModel.update
+
+    def spy(obj, values):
+        payloads.append(values)
+        return update(obj, values)
+
+    monkeypatch.setattr(TestModel, 'update', spy)
+    service = RESTService(context, web_request)
+    service.model = TestModel
+    web_request.validated = {'data': [{'id': '1', 'name': 'Baz'}]}
+    service.collection_patch()
+    assert payloads == [{'name': 'Baz'}]
+
+
+def test_base_resource_collection_patch_not_found(login, web_request, context, database):
+    """Test collection_patch method of rest resource with an unknown id."""
+    TestModel.__session__ = database
+    web_request.errors = Errors()
+    service = RESTService(context, web_request)
+    service.model = TestModel
+    web_request.validated = {'data': [{'id': '3', 'name': 'Baz'}]}
+    response = service.collection_patch()
+    assert response.status_code == 400
+    assert len(web_request.registry.notifications) == 0
+
+
+def test_base_resource_collection_patch_duplicate_id(login, web_request, context, database):
+    """Test collection_patch method of rest resource with the same id twice."""
+    TestModel.__session__ = database
+    database.add(TestModel(id='1', name='Foo'))
+    database.flush()
+    web_request.errors = Errors()
+    service = RESTService(context, web_request)
+    service.model = TestModel
+    web_request.validated = {'data': [{'id': '1', 'name': 'Bar'}, {'id': '1', 'name': 'Baz'}]}
+    response = service.collection_patch()
+    assert response.status_code == 400
+    assert database.query(TestModel).get('1').name == 'Foo'
+    assert len(web_request.registry.notifications) == 0
+
+
+def test_base_resource_partial_schema_cache(login, web_request, context):
+    """Cached partial schemas are kept per model."""
+
+    class OtherModel(Base):
+        """Another Model."""
+
+        __tablename__ = 'other_test_model'
+
+        id = sa.Column(sa.String, nullable=False, primary_key=True)
+        title = sa.Column(sa.String, nullable=False)
+
+    class CachedService(RESTService):
+        """Service caching its write schemas."""
+
+        cache_write_schema = True
+
+    assert RESTService.cache_write_schema is False
+    names = []
+    for model in (TestModel, OtherModel):
+        service = CachedService(context, web_request)
+        service.model = model
+        names.append({child.name for child in service._partial_schema('PUT').children})
+    assert 'name' in names[0] and 'name' not in names[1]
+    assert 'title' in names[1]
+
+
+def test_base_resource_collection_head_timeout(login, web_request, context, model_class):
+    """Listings cancelled by the statement timeout return 503."""
+
+    class TimeoutService(RESTService):
+
+        def count_records(self, query=None):
+            """Count records exceeding the statement timeout."""
+            raise StatementTimeoutError('Query cancelled after 100ms.')
+
+    web_request.errors = Errors()
+    service = TimeoutService(context, web_request)
+    service.model = model_class
+    response = service.collection_head()
+    assert response.status_int == 503
+    assert web_request.errors[0]['location'] == 'querystring'
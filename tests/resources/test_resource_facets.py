@@ -0,0 +1,41 @@
+"""Test facets of RESTService."""
+
+
+ROWS = [
+    {'id': '1', 'state': 'created', 'country': 'DE'},
+    {'id': '2', 'state': 'created', 'country': 'DE'},
+    {'id': '3', 'state': 'created', 'country': None},
+    {'id': '4', 'state': 'published', 'country': 'FR'},
+]
+
+
+def test_facets(collection_get):
+    """Counts per value of each field are returned, most frequent first."""
+    response = collection_get(ROWS, _facets='state, country')
+    assert response['facets'] == {
+        'state': [
+            {'value': 'created', 'count': 3},
+            {'value': 'published', 'count': 1},
+        ],
+        'country': [
+            {'value': 'DE', 'count': 2},
+            {'value': None, 'count': 1},
+            {'value': 'FR', 'count': 1},
+        ],
+    }
+
+
+def test_facets_filtered(collection_get):
+    """Facets are computed for the filtered listing."""
+    response = collection_get(ROWS, _facets='country', state='created')
+    assert response['facets']['country'] == [
+        {'value': 'DE', 'count': 2},
+        {'value': None, 'count': 1},
+    ]
+
+
+def test_facets_unknown_field(collection_get, web_request):
+    """Unknown facet fields are validation errors."""
+    response = collection_get(ROWS, _facets='foo')
+    assert response.status_code == 400
+    assert web_request.errors[0]['name'] == '_facets'
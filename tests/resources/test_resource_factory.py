@@ -122,3 +122,35 @@ test_data = [
 def test_has_global_permissions(factory, permission, roles, check):
     """Test has_global_permissions."""
     assert factory.has_global_permissions(permission, roles) is check
+
+
+def test_factory_context_object_cached(factory):
+    """Test the context object is loaded once per request."""
+    obj = factory.context_object
+    assert isinstance(obj, DummyModel)
+    assert factory.context_object is obj
+
+    other = BaseFactory(factory.request)
+    other.model = DummyModel
+    assert other.context_object is obj
+
+
+def test_factory_context_object_collection(factory):
+    """Test there is no context object without an id in the route."""
+    factory.request.matchdict = {}
+    assert factory.context_object is None
+
+
+def test_factory_acl_memoized(factory):
+    """Test the ACL is computed only once per factory."""
+    assert factory.__acl__ is factory.__acl__
+
+
+def test_get_model_acl():
+    """Test get_model_acl computes the indexes once per model."""
+    from briefy.ws.resources.factory import get_model_acl
+
+    model_acl = get_model_acl(DummyModel)
+    assert get_model_acl(DummyModel) is model_acl
+    assert model_acl.roles['delete'] == frozenset(['g:briefy_finance', 'g:system'])
+    assert ('Allow', 'g:system', ['create', 'list', 'view', 'edit', 'delete']) in model_acl.acl
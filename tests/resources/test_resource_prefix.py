@@ -0,0 +1,33 @@
+"""Test prefix filters of RESTService."""
+
+
+ROWS = [
+    {'id': '1', 'title': '50% off'},
+    {'id': '2', 'title': '500 items'},
+    {'id': '3', 'title': 'Sale: 50% off'},
+    {'id': '4', 'title': 'Summer_sale'},
+    {'id': '5', 'title': 'Summer sale'},
+]
+
+
+def list_ids(response) -> list:
+    """Return the ids of the objects in a listing response."""
+    return [item['id'] for item in response['data']]
+
+
+def test_startswith(collection_get):
+    """Only values starting with the prefix match, % is a literal."""
+    response = collection_get(ROWS, startswith_title='50%', _sort='id')
+    assert list_ids(response) == ['1']
+
+
+def test_startswith_underscore(collection_get):
+    """_ is a literal."""
+    response = collection_get(ROWS, startswith_title='Summer_', _sort='id')
+    assert list_ids(response) == ['4']
+
+
+def test_istartswith(collection_get):
+    """Case-insensitive prefix match."""
+    response = collection_get(ROWS, istartswith_title='SUMMER', _sort='id')
+    assert list_ids(response) == ['4', '5']
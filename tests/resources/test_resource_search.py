@@ -0,0 +1,45 @@
+"""Test full-text search of RESTService."""
+from briefy.ws.resources import RESTService
+
+
+ROWS = [
+    {'id': '1', 'title': 'Red car', 'description': 'A fast car'},
+    {'id': '2', 'title': 'Blue bike', 'description': 'Not a car'},
+    {'id': '3', 'title': 'Red bike', 'description': None},
+]
+
+
+class SearchService(RESTService):
+    """Service with full-text search on title and description."""
+
+    search_fields = ('title', 'description')
+
+
+def search(collection_get, **params) -> dict:
+    """Return the response of a listing with search parameters."""
+    return collection_get(ROWS, service_class=SearchService, **params)
+
+
+def test_search_all_fields(collection_get):
+    """_q matches all terms in any of the search fields."""
+    response = search(collection_get, _q='car', _sort='id')
+    assert [item['id'] for item in response['data']] == ['1', '2']
+
+
+def test_search_all_terms(collection_get):
+    """All terms must match, ignoring case."""
+    response = search(collection_get, _q='RED car')
+    assert [item['id'] for item in response['data']] == ['1']
+
+
+def test_search_field(collection_get):
+    """search_<field> matches only the given field."""
+    response = search(collection_get, search_title='bike', _sort='id')
+    assert [item['id'] for item in response['data']] == ['2', '3']
+
+
+def test_search_field_not_searchable(collection_get, web_request):
+    """Fields not in search_fields cannot be searched."""
+    response = search(collection_get, search_id='1')
+    assert response.status_code == 400
+    assert web_request.errors[0]['name'] == 'search_id'
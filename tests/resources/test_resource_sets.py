@@ -0,0 +1,27 @@
+"""Test set and range filters of RESTService."""
+
+
+ROWS = [{'id': str(price), 'price': price} for price in range(1, 6)]
+
+
+def list_ids(response) -> list:
+    """Return the ids of the objects in a listing response."""
+    return [item['id'] for item in response['data']]
+
+
+def test_in(collection_get):
+    """Objects with any of the values."""
+    response = collection_get(ROWS, in_id='1,3,9', _sort='id')
+    assert list_ids(response) == ['1', '3']
+
+
+def test_exclude(collection_get):
+    """Objects with none of the values."""
+    response = collection_get(ROWS, exclude_id='1,3', _sort='id')
+    assert list_ids(response) == ['2', '4', '5']
+
+
+def test_between(collection_get):
+    """Objects in an inclusive range."""
+    response = collection_get(ROWS, between_price='2,4', _sort='id')
+    assert list_ids(response) == ['2', '3', '4']
@@ -0,0 +1,111 @@
+"""Test sqlalchemy listeners."""
+from briefy.ws import listeners
+from pyramid import testing
+from sqlalchemy import create_engine
+from sqlalchemy import orm
+from sqlalchemy.ext.declarative import declarative_base
+
+import pytest
+import sqlalchemy as sa
+
+
+ListenerBase = declarative_base()
+
+
+class ContextModel(ListenerBase):
+    """Model with plain request and workflow_context attributes."""
+
+    __tablename__ = 'listener_context_model'
+
+    request = None
+    workflow_context = None
+
+    id = sa.Column(sa.Integer, primary_key=True)
+
+
+class PropertyModel(ListenerBase):
+    """Model with workflow_context as a property."""
+
+    __tablename__ = 'listener_property_model'
+
+    _context = None
+
+    id = sa.Column(sa.Integer, primary_key=True)
+
+    @property
+    def workflow_context(self):
+        return self._context
+
+    @workflow_context.setter
+    def workflow_context(self, value):
+        self._context = value
+
+
+listeners.register_workflow_context_listeners([ContextModel, PropertyModel])
+
+
+class UserMock:
+    """User mock object."""
+
+    id = 'fbda5789-2e32-44c4-b9dc-d0d217454a2a'
+
+
+@pytest.fixture
+def session():
+    """Return a session with some instances of the test models."""
+    engine = create_engine('sqlite://')
+    ListenerBase.metadata.create_all(engine)
+    session = orm.sessionmaker(bind=engine)()
+    session.add_all([ContextModel(id=1), PropertyModel(id=1)])
+    session.commit()
+    session.expunge_all()
+    yield session
+    session.close()
+
+
+def test_plain_attributes_resolved_lazily(session):
+    """Plain attributes are replaced by descriptors resolving the current request."""
+    assert isinstance(ContextModel.__dict__['request'], listeners.RequestAttribute)
+    obj = session.query(ContextModel).one()
+    assert obj.request is None
+    assert obj.workflow_context is None
+
+    request = testing.DummyRequest()
+    request.user = UserMock()
+    testing.setUp(request=request)
+    try:
+        obj = session.query(ContextModel).one()
+        assert 'workflow_context' not in obj.__dict__
+        assert obj.request is request
+        assert obj.workflow_context is request.user
+    finally:
+        testing.tearDown()
+    # once resolved, the value is kept in the instance
+    assert obj.workflow_context is request.user
+
+
+def test_descriptors_set_on_load(session):
+    """Attributes that are descriptors are set by the load listener."""
+    assert isinstance(PropertyModel.__dict__['workflow_context'], property)
+    request = testing.DummyRequest()
+    request.user = UserMock()
+    testing.setUp(request=request)
+    try:
+        obj = session.query(PropertyModel).one()
+        assert obj._context is request.user
+    finally:
+        testing.tearDown()
+
+
+def test_deprecated_load_listener(session):
+    """The former module level load listener still sets request and workflow_context."""
+    obj = session.query(PropertyModel).one()
+    request = testing.DummyRequest()
+    request.user = UserMock()
+    testing.setUp(request=request)
+    try:
+        with pytest.warns(DeprecationWarning):
+            listeners.base_receive_load_workflow_context(obj, None)
+        assert obj._context is request.user
+    finally:
+        testing.tearDown()
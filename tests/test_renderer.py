@@ -0,0 +1,47 @@
+"""Test JSONRenderer content negotiation."""
+from briefy.ws import renderer
+from datetime import datetime
+from pyramid.testing import DummyRequest
+
+import json
+import pytest
+
+
+msgpack = pytest.importorskip('msgpack')
+
+
+test_data = [
+    ('', False),
+    ('application/json', False),
+    ('application/msgpack', True),
+    ('application/x-msgpack', True),
+    ('application/msgpack, application/json;q=0.9', True),
+    ('application/msgpack;q=0.5, application/json', False),
+    ('application/msgpack;q=0.5, */*;q=0.1', True),
+    ('application/msgpack;q=0', False),
+]
+
+
+@pytest.mark.parametrize('accept,expected', test_data)
+def test_accepts_msgpack(accept, expected):
+    """MessagePack is used when preferred to JSON."""
+    request = DummyRequest(headers={'Accept': accept})
+    assert renderer.accepts_msgpack(request) is expected
+
+
+def render(accept):
+    """Render a value with the given Accept header."""
+    request = DummyRequest(headers={'Accept': accept})
+    render = renderer.JSONRenderer()(None)
+    value = {'id': '1', 'created_at': datetime(2017, 11, 1)}
+    return request.response, render(value, {'request': request})
+
+
+def test_render_msgpack():
+    """Values are encoded with the JSON type mapping."""
+    response, result = render('application/msgpack')
+    assert response.content_type == renderer.MSGPACK_TYPE
+    assert 'Accept' in response.vary
+    json_response, json_result = render('application/json')
+    assert json_response.content_type == renderer.JSON_TYPE
+    assert renderer.msgpack_loads(result) == json.loads(json_result)
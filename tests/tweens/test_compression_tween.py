@@ -0,0 +1,66 @@
+"""Test compression tween."""
+from briefy.ws.tweens import compression
+from pyramid import testing
+from pyramid.response import Response
+
+import gzip
+import pytest
+import zlib
+
+
+BODY = b'{"data": []}' * 200
+
+
+def handler(request):
+    """Return a JSON response."""
+    response = Response(BODY, content_type='application/json')
+    response.etag = 'abc'
+    return response
+
+
+test_data = [
+    ('gzip, deflate', ('gzip', 'deflate'), 'gzip'),
+    ('deflate', ('gzip', 'deflate'), 'deflate'),
+    ('gzip;q=0.5, deflate', ('gzip', 'deflate'), 'deflate'),
+    ('gzip;q=0, *', ('gzip', 'deflate'), 'deflate'),
+    ('identity', ('gzip', 'deflate'), None),
+    ('*;q=0', ('gzip', 'deflate'), None),
+    ('br, gzip', ('br', 'gzip'), 'br'),
+    ('gzip;foo=1;q=0, deflate', ('gzip', 'deflate'), 'deflate'),
+    ('gzip; foo=1; Q=0', ('gzip', 'deflate'), None),
+]
+
+
+@pytest.mark.parametrize('header,available,expected', test_data)
+def test_choose_encoding(header, available, expected):
+    """The accepted content coding with the highest quality is chosen."""
+    assert compression.choose_encoding(header, available) == expected
+
+
+def test_compression_tween():
+    """Responses are compressed with the negotiated content coding."""
+    tween = compression.compression_tween_factory(handler, None)
+    response = tween(testing.DummyRequest(headers={'Accept-Encoding': 'gzip'}))
+    assert response.content_encoding == 'gzip'
+    assert gzip.decompress(response.body) == BODY
+    assert response.headers['ETag'] == 'W/"abc"'
+    assert 'Accept-Encoding' in response.vary
+
+    response = tween(testing.DummyRequest(headers={'Accept-Encoding': 'deflate'}))
+    assert zlib.decompress(response.body) == BODY
+
+
+def test_compression_tween_skip():
+    """Small responses and clients not accepting compression get the original body."""
+    tween = compression.compression_tween_factory(handler, None)
+    response = tween(testing.DummyRequest())
+    assert response.content_encoding is None
+    assert response.body == BODY
+    assert 'Accept-Encoding' in response.vary
+
+    def small_handler(request):
+        return Response(b'{}', content_type='application/json')
+
+    tween = compression.compression_tween_factory(small_handler, None)
+    response = tween(testing.DummyRequest(headers={'Accept-Encoding': 'gzip'}))
+    assert response.content_encoding is None
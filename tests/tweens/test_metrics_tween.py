@@ -0,0 +1,52 @@
+"""Test metrics tween."""
+from briefy.ws.tweens.metrics import metrics_tween_factory
+from briefy.ws.utils import metrics
+from pyramid import testing
+from pyramid.response import Response
+from sqlalchemy import create_engine
+
+import pytest
+
+
+class RouteMock:
+    """Route mock object."""
+
+    name = 'collection_customers'
+
+
+def test_metrics_tween():
+    """Request latency and statements duration are recorded per resource."""
+    engine = create_engine('sqlite://')
+    metrics.registry.clear()
+
+    def handler(request):
+        request.matched_route = RouteMock()
+        engine.execute('SELECT 1')
+        return Response('ok')
+
+    request = testing.DummyRequest()
+    tween = metrics_tween_factory(handler, None)
+    with testing.testConfig(request=request):
+        tween(request)
+
+    latency = metrics.REQUEST_DURATION.value(
+        resource='collection_customers', method='GET', status=200
+    )
+    assert latency['count'] == 1
+    statements = metrics.DB_STATEMENT_DURATION.value(resource='collection_customers')
+    assert statements['count'] == 1
+
+
+def test_metrics_tween_error():
+    """Requests raising an exception are recorded with status 500."""
+    metrics.registry.clear()
+
+    def handler(request):
+        raise ValueError('error')
+
+    tween = metrics_tween_factory(handler, None)
+    with pytest.raises(ValueError):
+        tween(testing.DummyRequest())
+
+    latency = metrics.REQUEST_DURATION.value(resource='unmatched', method='GET', status=500)
+    assert latency['count'] == 1
@@ -0,0 +1,50 @@
+"""Test profiler tween."""
+from briefy.ws.tweens import profiler
+from briefy.ws.utils import profiling
+from pyramid import testing
+from pyramid.response import Response
+
+import pytest
+
+
+class UserMock:
+    """User mock object."""
+
+    id = 'fbda5789-2e32-44c4-b9dc-d0d217454a2a'
+    groups = ['g:briefy']
+
+
+def handler(request):
+    """Handler with a query phase."""
+    with profiling.phase(request, 'query'):
+        sum(range(1000))
+    return Response('ok')
+
+
+def make_request(groups, headers):
+    """Return a request with a user in groups."""
+    request = testing.DummyRequest(headers=headers)
+    request.user = UserMock()
+    request.user.groups = groups
+    return request
+
+
+test_data = [
+    (['g:briefy'], {}, False),
+    (['g:customers'], {profiling.PROFILE_HEADER: '1'}, False),
+    (['g:briefy'], {profiling.PROFILE_HEADER: '1'}, True),
+]
+
+
+@pytest.mark.parametrize('groups,headers,profiled', test_data)
+def test_profiler_tween(groups, headers, profiled):
+    """Only requests from briefy admins with the profile header are profiled."""
+    tween = profiler.profiler_tween_factory(handler, None)
+    response = tween(make_request(groups, headers))
+    profile_id = response.headers.get(profiling.PROFILE_ID_HEADER)
+    assert bool(profile_id) is profiled
+    if profiled:
+        profile = profiler.profiles.get(profile_id)
+        assert 'query' in profile['phases']
+        assert 'function calls' in profile['stats']
+        assert response.headers['Server-Timing'].startswith('query;dur=')
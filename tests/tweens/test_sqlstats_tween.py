@@ -0,0 +1,21 @@
+"""Test SQL statistics tween."""
+from briefy.ws.tweens.sqlstats import sqlstats_tween_factory
+from pyramid import testing
+from pyramid.response import Response
+from sqlalchemy import create_engine
+
+
+def test_sqlstats_tween():
+    """Server-Timing headers are added to the response."""
+    engine = create_engine('sqlite://')
+
+    def handler(request):
+        engine.execute('SELECT 1')
+        return Response('ok')
+
+    tween = sqlstats_tween_factory(handler, None)
+    response = tween(testing.DummyRequest())
+    timings = response.headers.getall('Server-Timing')
+    assert len(timings) == 2
+    assert 'desc="1 statements, 0 rows"' in timings[0]
+    assert timings[1].startswith('app;dur=')
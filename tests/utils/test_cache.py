@@ -0,0 +1,42 @@
+"""Test cache utilities."""
+from briefy.ws.utils import cache
+from pyramid.testing import DummyRequest
+
+import time
+
+
+def test_request_cache():
+    """Test request_cache returns the same dictionary per request and namespace."""
+    request = DummyRequest()
+    objects = cache.request_cache(request, cache.OBJECTS)
+    assert objects == {}
+
+    objects['foo'] = 'bar'
+    assert cache.request_cache(request, cache.OBJECTS) is objects
+    assert cache.request_cache(request, 'other') == {}
+    assert cache.request_cache(DummyRequest(), cache.OBJECTS) == {}
+
+
+def test_timeout_lru_cache_maxsize():
+    """Test TimeoutLRUCache discards the least recently used entry."""
+    lru = cache.TimeoutLRUCache(maxsize=2, ttl=60)
+    lru.set('a', 1)
+    lru.set('b', 2)
+    assert lru.get('a') == 1
+    lru.set('c', 3)
+    assert len(lru) == 2
+    assert lru.get('b') is None
+    assert lru.get('a') == 1
+    assert lru.get('c') == 3
+    assert lru.hits == 3
+    assert lru.misses == 1
+
+
+def test_timeout_lru_cache_expiration():
+    """Test TimeoutLRUCache respects the expiration of each entry."""
+    lru = cache.TimeoutLRUCache(maxsize=10, ttl=60)
+    lru.set('expired', 1, expires_at=time.time() - 1)
+    lru.set('valid', 2, expires_at=time.time() + 10)
+    assert lru.get('expired', 'default') == 'default'
+    assert lru.get('valid') == 2
+    assert len(lru) == 1
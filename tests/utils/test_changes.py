@@ -0,0 +1,23 @@
+"""Test changes feed utilities."""
+from briefy.ws.utils import changes
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+
+def test_cursor():
+    """Cursors keep the modification date, with microseconds, and the id."""
+    updated_at = datetime(2017, 11, 1, 10, 30, 15, 123456)
+    cursor = changes.encode_cursor(updated_at, 'f2d0ee68-d3b4-4cb1-8d8e-9a4b7e4c5d2a')
+    assert '=' not in cursor
+    date, id = changes.decode_cursor(cursor)
+    assert date == updated_at.replace(tzinfo=timezone.utc)
+    assert id == 'f2d0ee68-d3b4-4cb1-8d8e-9a4b7e4c5d2a'
+
+
+@pytest.mark.parametrize('cursor', ['invalid', 'MTIz', '', 'YWJjOmRlZg'])
+def test_invalid_cursor(cursor):
+    """Invalid cursors raise ValueError."""
+    with pytest.raises(ValueError):
+        changes.decode_cursor(cursor)
@@ -0,0 +1,22 @@
+"""Test circuit breaker."""
+from briefy.ws.utils import circuit
+
+
+def test_circuit_breaker():
+    """Circuit opens after consecutive failures and allows a trial call after a timeout."""
+    breaker = circuit.CircuitBreaker('service', failure_threshold=2, reset_timeout=60)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == circuit.CLOSED
+    breaker.record_failure()
+    assert breaker.state == circuit.OPEN
+    assert not breaker.allow()
+
+    breaker.opened_at -= 60
+    assert breaker.state == circuit.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.info() == {'state': circuit.CLOSED, 'failures': 0}
+    assert breaker.allow()
@@ -0,0 +1,50 @@
+"""Test conditional requests utilities."""
+from briefy.ws.utils import conditional
+from datetime import datetime
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.testing import DummyRequest
+
+import pytest
+
+
+test_data = [
+    ({}, False),
+    ({'If-None-Match': '"abc"'}, True),
+    ({'If-None-Match': 'W/"abc"'}, True),
+    ({'If-None-Match': '"xyz", "abc"'}, True),
+    ({'If-None-Match': '*'}, True),
+    ({'If-None-Match': '"xyz"'}, False),
+    ({'If-None-Match': '"xyz"', 'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'}, False),
+    ({'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'}, True),
+    ({'If-Modified-Since': 'Wed, 21 Oct 2015 07:27:59 GMT'}, False),
+    ({'If-Modified-Since': 'invalid'}, False),
+]
+
+
+@pytest.mark.parametrize('headers,expected', test_data)
+def test_is_not_modified(headers, expected):
+    """If-None-Match takes precedence over If-Modified-Since."""
+    request = DummyRequest(headers=headers)
+    last_modified = datetime(2015, 10, 21, 7, 28, 0, 500)
+    assert conditional.is_not_modified(request, 'abc', last_modified) is expected
+
+
+def test_is_not_modified_post():
+    """Only GET and HEAD requests are conditional."""
+    request = DummyRequest(headers={'If-None-Match': '*'}, post={})
+    assert conditional.is_not_modified(request, 'abc') is False
+
+
+def test_not_modified():
+    """Not modified responses have the current validators."""
+    response = conditional.not_modified('abc', datetime(2015, 10, 21, 7, 28, 0))
+    assert isinstance(response, HTTPNotModified)
+    assert response.headers['ETag'] == '"abc"'
+    assert response.headers['Last-Modified'] == 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert 'Authorization' in response.vary
+
+
+def test_make_etag():
+    """Entity tags depend on all parts."""
+    assert conditional.make_etag('a', 1) == conditional.make_etag('a', 1)
+    assert conditional.make_etag('a', 1) != conditional.make_etag('a', 2)
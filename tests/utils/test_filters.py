@@ -226,3 +226,107 @@ class TestFilterFromQueryParams:
             func(query_params=query_params, allowed_fields=self.allowed_fields)
 
         assert """Unknown filter field 'foobar'""" in str(excinfo.value.message)
+
+    def test_one_field_search(self):
+        """Search terms are kept as they are, empty searches are ignored."""
+        query_params = {'search_name': ' red car ', 'search_id': ''}
+        func = filter.create_filter_from_query_params
+        result = func(query_params=query_params, allowed_fields=self.allowed_fields)
+
+        assert len(result) == 1
+        assert result[0].field == 'name'
+        assert result[0].operator.value == 'search'
+        assert result[0].value == 'red car'
+
+    def test_one_field_startswith(self):
+        """Prefix patterns have wildcards escaped and only a trailing %."""
+        query_params = {'startswith_name': '50%_Off'}
+        func = filter.create_filter_from_query_params
+        result = func(query_params=query_params, allowed_fields=self.allowed_fields)
+
+        assert len(result) == 1
+        assert result[0].field == 'name'
+        assert result[0].operator.value == 'startswith'
+        assert result[0].value == '50\\%\\_Off%'
+
+    def test_one_field_istartswith(self):
+        """Case-insensitive prefix patterns are lower case."""
+        query_params = {'istartswith_name': 'True'}
+        func = filter.create_filter_from_query_params
+        result = func(query_params=query_params, allowed_fields=self.allowed_fields)
+
+        assert result[0].operator.value == 'istartswith'
+        assert result[0].value == 'true%'
+
+    def test_in_max_values(self, monkeypatch):
+        """Lists with more values than FILTER_MAX_VALUES are rejected."""
+        monkeypatch.setattr(filter, 'FILTER_MAX_VALUES', '2')
+        func = filter.create_filter_from_query_params
+        result = func(query_params={'in_id': '1,2,2'}, allowed_fields=self.allowed_fields)
+        assert result[0].value == {'1', '2'}
+
+        with pytest.raises(ValidationError) as excinfo:
+            func(query_params={'exclude_id': '1,2,3'}, allowed_fields=self.allowed_fields)
+
+        assert 'accepts at most 2 values' in str(excinfo.value.message)
+
+    def test_one_field_between(self):
+        """Between takes exactly two values."""
+        func = filter.create_filter_from_query_params
+        query_params = {'between_created_at': '2017-01-01, 2017-02-01'}
+        result = func(query_params=query_params, allowed_fields=self.allowed_fields)
+
+        assert result[0].field == 'created_at'
+        assert result[0].operator.value == 'between'
+        assert result[0].value == ('2017-01-01', '2017-02-01')
+
+        with pytest.raises(ValidationError) as excinfo:
+            func(query_params={'between_id': '1'}, allowed_fields=self.allowed_fields)
+
+        assert 'requires two comma separated values' in str(excinfo.value.message)
+
+
+class TestParseQueryParams:
+    """Test parse_query_params."""
+
+    allowed_fields = ['id', 'name', 'updated_at', 'created_at']
+
+    def test_single_pass(self):
+        """Filters, sorting and pagination are returned together."""
+        query_params = {
+            'name': 'foo',
+            'in_id': '1,2',
+            '_since': '1481544732',
+            '_sort': '-created_at,id',
+            '_page': '3',
+            '_items_per_page': 'all',
+            '_other': 'ignored',
+        }
+        result = filter.parse_query_params(query_params, self.allowed_fields, 'updated_at')
+
+        assert [(f.field, f.operator.value) for f in result.filters] == [
+            ('name', 'eq'), ('id', 'in_'), ('updated_at', 'gt'),
+        ]
+        assert result.sorting == [('created_at', -1), ('id', 1)]
+        assert result.pagination == {'page': 3, 'items_per_page': 25}
+
+    def test_defaults(self):
+        """Default sorting and items per page."""
+        result = filter.parse_query_params({}, self.allowed_fields, 'updated_at', -1, 10)
+
+        assert result.filters == []
+        assert result.sorting == [('updated_at', -1)]
+        assert result.pagination == {'page': 1, 'items_per_page': 10}
+
+    def test_invalid_fields(self):
+        """Unknown filter and sort fields are validation errors."""
+        func = filter.parse_query_params
+        with pytest.raises(ValidationError) as excinfo:
+            func({'min_foo': '1'}, self.allowed_fields)
+
+        assert """Unknown filter field 'foo'""" in str(excinfo.value.message)
+
+        with pytest.raises(ValidationError) as excinfo:
+            func({'_sort': 'foo'}, self.allowed_fields)
+
+        assert """Unknown sort field 'foo'""" in str(excinfo.value.message)
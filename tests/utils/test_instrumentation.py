@@ -0,0 +1,61 @@
+"""Test New Relic instrumentation utilities."""
+from briefy.ws.utils import instrumentation
+
+import pytest
+
+
+class AgentMock:
+    """Mock of newrelic.agent."""
+
+    def __init__(self):
+        self.parameters = {}
+        self.transaction = None
+
+    def add_custom_parameter(self, key, value):
+        self.parameters[key] = value
+
+    def set_transaction_name(self, name, group):
+        self.transaction = (name, group)
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """Replace the New Relic agent by a mock."""
+    agent = AgentMock()
+    monkeypatch.setattr(instrumentation, 'agent', agent)
+    monkeypatch.setattr(instrumentation, 'USER_CLAIMS', ('email', 'groups'))
+    return agent
+
+
+claims = {'email': 'person@gmail.com', 'groups': ['g:briefy'], 'locale': 'en_GB'}
+
+test_data = [
+    ('off', {}),
+    ('minimal', {'user_id': '1'}),
+    ('full', {'user_id': '1', 'email': 'person@gmail.com', 'groups': "['g:briefy']"}),
+]
+
+
+@pytest.mark.parametrize('level,expected', test_data)
+def test_record_user(agent, monkeypatch, level, expected):
+    """Test record_user honors the instrumentation level and the claims whitelist."""
+    monkeypatch.setattr(instrumentation, 'LEVEL', level)
+    instrumentation.record_user('1', claims)
+    assert agent.parameters == expected
+
+
+def test_set_transaction_name(agent, monkeypatch):
+    """Test set_transaction_name."""
+    monkeypatch.setattr(instrumentation, 'LEVEL', 'off')
+    instrumentation.set_transaction_name('foo')
+    assert agent.transaction is None
+
+    monkeypatch.setattr(instrumentation, 'LEVEL', 'minimal')
+    instrumentation.set_transaction_name('foo')
+    assert agent.transaction == ('foo', 'WebService')
+
+
+def test_get_level(agent):
+    """Test invalid levels fallback to minimal."""
+    assert instrumentation._get_level(' FULL ') == 'full'
+    assert instrumentation._get_level('verbose') == 'minimal'
@@ -0,0 +1,82 @@
+"""Test metrics registry."""
+from briefy.ws.utils import metrics
+
+import pytest
+import threading
+
+
+def test_counter():
+    """Counters are incremented per label values."""
+    counter = metrics.Counter('requests_total', 'Requests.', ('method', ))
+    counter.inc(method='GET')
+    counter.inc(2, method='GET')
+    counter.inc(method='POST')
+    assert counter.value(method='GET') == 3
+    assert counter.expose() == (
+        '# HELP requests_total Requests.\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{method="GET"} 3\n'
+        'requests_total{method="POST"} 1'
+    )
+    with pytest.raises(ValueError):
+        counter.inc(-1, method='GET')
+    with pytest.raises(ValueError):
+        counter.inc(status='200')
+
+
+def test_gauge():
+    """Gauges go up and down."""
+    gauge = metrics.Gauge('in_flight', 'In flight.')
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.value() == 1
+    gauge.set(0.5)
+    assert gauge.expose().endswith('\nin_flight 0.5')
+
+
+def test_histogram():
+    """Histograms expose cumulative buckets, sum and count."""
+    histogram = metrics.Histogram('latency', 'Latency.', ('resource', ), buckets=(0.1, 1))
+    histogram.observe(0.05, resource='a"b')
+    histogram.observe(0.5, resource='a"b')
+    histogram.observe(5, resource='a"b')
+    assert histogram.value(resource='a"b') == {'count': 3, 'sum': 5.55}
+    lines = histogram.expose().split('\n')[2:]
+    assert lines == [
+        'latency_bucket{resource="a\\"b",le="0.1"} 1',
+        'latency_bucket{resource="a\\"b",le="1"} 2',
+        'latency_bucket{resource="a\\"b",le="+Inf"} 3',
+        'latency_sum{resource="a\\"b"} 5.55',
+        'latency_count{resource="a\\"b"} 3',
+    ]
+
+
+def test_registry():
+    """Metrics are registered once per name."""
+    registry = metrics.Registry()
+    counter = registry.counter('b_total', 'B.')
+    assert registry.counter('b_total', 'B.') is counter
+    with pytest.raises(ValueError):
+        registry.gauge('b_total', 'B.')
+    registry.gauge('a', 'A.').set(1)
+    counter.inc()
+    assert registry.expose().index('# HELP a ') < registry.expose().index('# HELP b_total')
+    registry.clear()
+    assert counter.value() is None
+
+
+def test_counter_threads():
+    """Counters can be updated from several threads."""
+    counter = metrics.Counter('threads_total', 'Threads.')
+
+    def work():
+        for i in range(1000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value() == 8000
@@ -0,0 +1,35 @@
+"""Test profiling utilities."""
+from briefy.ws.utils import profiling
+from pyramid.testing import DummyRequest
+
+
+def test_phase_disabled():
+    """Phases are not recorded unless enabled for the request."""
+    request = DummyRequest()
+    with profiling.phase(request, 'query'):
+        pass
+    assert profiling.get_phases(request) is None
+
+
+def test_phase():
+    """Time spent in a phase is accumulated."""
+    request = DummyRequest()
+    phases = profiling.enable_phases(request)
+    with profiling.phase(request, 'query'):
+        pass
+    with profiling.phase(request, 'query'):
+        pass
+    with profiling.phase(request, 'events'):
+        pass
+    assert list(phases) == ['query', 'events']
+    assert profiling.get_phases(request) is phases
+
+
+def test_profile_store():
+    """Only the latest profiles are kept."""
+    store = profiling.ProfileStore(maxlen=2)
+    for i in range(3):
+        store.add({'id': str(i), 'stats': 'stats'})
+    assert store.get('0') is None
+    assert store.get('2')['stats'] == 'stats'
+    assert store.summary() == [{'id': '2'}, {'id': '1'}]
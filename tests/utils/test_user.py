@@ -3,6 +3,7 @@ from briefy.ws.utils import user
 
 import httmock
 import os
+import pytest
 
 
 @httmock.urlmatch(netloc=r'briefy-rolleiflex')
@@ -155,3 +156,26 @@ def test_add_user_info_to_state_history(testapp):
     assert data[1]['actor']['first_name'] == 'Sebastião'
     assert data[1]['actor']['last_name'] == 'Salgado'
     assert data[1]['actor']['fullname'] == 'Sebastião Salgado'
+
+
+@httmock.urlmatch(netloc=r'briefy-rolleiflex')
+def mock_rolleiflex_msgpack(url, request):
+    """Mock request to briefy-rolleiflex returning MessagePack."""
+    from briefy.ws.renderer import msgpack_dumps
+
+    headers = {
+        'content-type': 'application/msgpack',
+    }
+    data = msgpack_dumps({'data': {'id': url.path.split('/')[-1], 'first_name': 'Jane'}})
+    return httmock.response(200, data, headers, None, 5, request)
+
+
+def test__get_user_info_from_service_msgpack(testapp):
+    """Test _get_user_info_from_service function with a MessagePack response."""
+    pytest.importorskip('msgpack')
+
+    user_id = 'b9f1e623-775c-4607-9380-506b570ad0ee'
+    with httmock.HTTMock(mock_rolleiflex_msgpack):
+        data = user._get_user_info_from_service(user_id)
+
+    assert data == {'id': user_id, 'first_name': 'Jane'}
@@ -1,4 +1,6 @@
 """Test devops views."""
+from briefy.ws.views.devops import metrics as metrics_view
+from pyramid.interfaces import IAuthenticationPolicy
 
 
 def test_lb_heartbeat(testapp):
@@ -8,3 +10,44 @@ def test_lb_heartbeat(testapp):
     r = app.get('/__lbheartbeat__', status=200)
     assert 'application/json' == r.content_type
     assert r.json == {}
+
+
+def test_slow_queries_forbidden(testapp):
+    """Slow queries view is only available to briefy admins."""
+    app = testapp
+
+    r = app.get('/__slowqueries__', status=403)
+    assert 'application/json' == r.content_type
+
+
+def test_slow_queries(testapp):
+    """Test slow queries view with a briefy admin token."""
+    app = testapp
+    token = app.app.registry.queryUtility(IAuthenticationPolicy).create_token(
+        'fbda5789-2e32-44c4-b9dc-d0d217454a2a', groups=['g:briefy']
+    )
+    headers = {'Authorization': f'JWT {token}'}
+
+    r = app.get('/__slowqueries__', headers=headers, status=200)
+    assert 'application/json' == r.content_type
+    assert r.json['total'] == len(r.json['data'])
+
+
+def test_metrics(testapp):
+    """Test metrics view, available to scrapers without a JWT."""
+    app = testapp
+
+    r = app.get('/__metrics__', status=200)
+    assert 'text/plain' == r.content_type
+    assert '# TYPE briefy_ws_request_duration_seconds histogram' in r.text
+
+
+def test_metrics_token(testapp, monkeypatch):
+    """Test metrics view with METRICS_TOKEN set."""
+    monkeypatch.setattr(metrics_view, 'METRICS_TOKEN', 's3cr3t')
+    app = testapp
+
+    app.get('/__metrics__', status=401)
+    app.get('/__metrics__', headers={'Authorization': 'Bearer wrong'}, status=401)
+    r = app.get('/__metrics__', headers={'Authorization': 'Bearer s3cr3t'}, status=200)
+    assert '# TYPE briefy_ws_request_duration_seconds histogram' in r.text
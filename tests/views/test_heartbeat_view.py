@@ -0,0 +1,43 @@
+"""Test heartbeat view."""
+from briefy.ws.views.devops import heartbeat
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+
+def test_heartbeat(testapp):
+    """Heartbeat reports the checks of this web head."""
+    app = testapp
+
+    r = app.get('/__heartbeat__', status=200)
+    assert 'application/json' == r.content_type
+    assert r.json['status'] == heartbeat.OK
+    assert r.json['checks']['user_service']['state'] == 'closed'
+    assert r.json['checks']['events'] == {'in_flight': 0}
+
+
+def test_check_database():
+    """Database check reports its latency."""
+    result = heartbeat.check_database(create_engine('sqlite://'), timeout=5)
+    assert result['ok'] is True
+    assert 'latency' in result
+
+
+def test_check_database_error():
+    """Database errors are reported."""
+    result = heartbeat.check_database(create_engine('sqlite:////nonexistent/db'), timeout=5)
+    assert result['ok'] is False
+    assert result['error'].startswith('OperationalError')
+
+
+def test_check_pool():
+    """An exhausted connection pool is degraded."""
+    engine = create_engine('sqlite://', poolclass=QueuePool, pool_size=1, max_overflow=0)
+    result = heartbeat.check_pool(engine, threshold=1)
+    assert result['ok'] is True
+    assert result['utilization'] == 0
+
+    conn = engine.connect()
+    result = heartbeat.check_pool(engine, threshold=1)
+    assert result['ok'] is False
+    assert result['checked_out'] == 1
+    conn.close()